@@ -1,17 +1,64 @@
 """Connector to triplestore."""
+import logging
 import os
+import threading
+from contextlib import contextmanager
 from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from rdflib import Graph
+from rdflib import plugin
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.sparql import Query, Update
 from rdflib.query import Result
+from rdflib.store import Store
 
 from pkg_api.core.namespaces import PKGPrefixes
 from pkg_api.core.pkg_types import URI
+from pkg_api.query_cache import CacheInfo, QueryResultCache
+from pkg_api.query_limits import execute_query_with_timeout
+from pkg_api.storage.atomic_file import atomic_write
+from pkg_api.storage.binary_snapshot import (
+    BINARY_SNAPSHOT_EXTENSION,
+    load_binary_snapshot,
+    write_binary_snapshot,
+)
+from pkg_api.storage.file_lock import (
+    DEFAULT_LOCK_TIMEOUT,
+    LOCK_FILE_EXTENSION,
+    FileLock,
+)
+from pkg_api.storage.tracked_graph import (
+    ADDED,
+    REMOVED,
+    Change,
+    TrackedGraph,
+    invert_changes,
+)
+from pkg_api.storage.write_ahead_log import (
+    PreservedBNodeLabels,
+    WriteAheadLog,
+)
 
 # Method to create/load the RDF graph
 # Method to execute the SPARQL query
 
 DEFAULT_STORE_PATH = "data/RDFStore"
+DEFAULT_WAL_COMPACTION_THRESHOLD = 10000
+# Maximum number of updates combined by a transaction, the cost of parsing
+# an update grows faster than linearly with its size.
+MAX_PENDING_UPDATES = 10
+# Name of the database file shared by the PKGs stored with SQLite.
+SQLITE_DATABASE_FILENAME = "pkg.sqlite"
 
 
 class RDFStore(Enum):
@@ -20,6 +67,55 @@ class RDFStore(Enum):
     MEMORY = "Memory"
     BERKELEYDB = "BerkeleyDB"
     SPARQLUPDATESTORE = "SPARQLUpdateStore"
+    SQLITE = "SQLite"
+
+    @property
+    def is_persistent(self) -> bool:
+        """Whether the store persists the graph natively on disk.
+
+        The graph of a persistent store is neither loaded from nor saved
+        to a snapshot, changes are committed to the store incrementally.
+        """
+        return self in _PERSISTENT_RDF_STORES
+
+
+_PERSISTENT_RDF_STORES = {RDFStore.BERKELEYDB, RDFStore.SQLITE}
+
+plugin.register(
+    RDFStore.SQLITE.value,
+    Store,
+    "pkg_api.storage.sqlite_store",
+    "SQLiteStore",
+)
+
+
+class PersistenceMode(Enum):
+    """Enum for the different ways of persisting the graph to disk.
+
+    SNAPSHOT rewrites the whole graph as Turtle when it is saved.
+    WRITE_AHEAD_LOG appends the changes made by each update to a log,
+    which is periodically folded into a snapshot (see
+    pkg_api.storage.write_ahead_log).
+    """
+
+    SNAPSHOT = "Snapshot"
+    WRITE_AHEAD_LOG = "WriteAheadLog"
+
+
+class SnapshotFormat(Enum):
+    """Enum for the file formats of graph snapshots.
+
+    TURTLE is human readable but slow to parse and write. It is written
+    in the N-Triples subset of Turtle, which preserves the labels of
+    blank nodes, as the changes of other processes are merged by label
+    (see Connector.refresh). BINARY is a compact dictionary-encoded
+    format that is fast to load (see pkg_api.storage.binary_snapshot). A
+    binary snapshot, when present, is always preferred when loading the
+    graph.
+    """
+
+    TURTLE = "Turtle"
+    BINARY = "Binary"
 
 
 class Connector:
@@ -28,55 +124,707 @@ class Connector:
         owner: URI,
         rdf_store: RDFStore = RDFStore.MEMORY,
         rdf_store_path: str = DEFAULT_STORE_PATH,
+        persistence_mode: PersistenceMode = PersistenceMode.SNAPSHOT,
+        wal_compaction_threshold: int = DEFAULT_WAL_COMPACTION_THRESHOLD,
+        snapshot_format: SnapshotFormat = SnapshotFormat.TURTLE,
+        query_cache_size: int = 0,
+        flush_interval: Optional[float] = None,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
     ) -> None:
         """Initializes the connector to the triplestore.
 
+        Processes opening the same graph, other than from a persistent store,
+        coordinate through a reader/writer lock on a sidecar lock file, see
+        pkg_api.storage.file_lock. The files of the graph are read with the
+        shared lock and written with the exclusive lock, which is only held
+        for the duration of the read or write. Changes persisted by other
+        processes are loaded before the graph is changed, queried, or
+        written, and the changes that are not persisted yet are applied
+        again on top of them, such that they are not overwritten.
+
         Args:
             owner: Owner URI.
             rdf_store: Type of RDF store to use.
             rdf_store_path: Path to the RDF store.
+            persistence_mode: How the graph is persisted. Defaults to
+              PersistenceMode.SNAPSHOT.
+            wal_compaction_threshold: Number of logged changes after which the
+              write-ahead log is folded into a new snapshot. Only used with
+              PersistenceMode.WRITE_AHEAD_LOG. Defaults to
+              DEFAULT_WAL_COMPACTION_THRESHOLD.
+            snapshot_format: Format of the snapshots written when saving the
+              graph. With the write-ahead log, TURTLE snapshots are written as
+              N-Triples. Defaults to SnapshotFormat.TURTLE.
+            query_cache_size: Memory budget in bytes of the cache of query
+              results, see pkg_api.query_cache. Defaults to 0, i.e., results
+              are not cached.
+            flush_interval: Number of seconds after which a saved graph is
+              written to disk in the background, see save_graph. Defaults to
+              None, i.e., the graph is written when saved.
+            lock_timeout: Number of seconds to wait for the lock of the graph.
+              Defaults to DEFAULT_LOCK_TIMEOUT.
+
+        Raises:
+            ValueError: If the write-ahead log is used with a persistent store.
+            LockTimeoutError: If the graph is locked by another process past
+              the timeout.
         """
+        if (
+            rdf_store.is_persistent
+            and persistence_mode != PersistenceMode.SNAPSHOT
+        ):
+            raise ValueError(
+                f"{persistence_mode} is not supported by {rdf_store}."
+            )
         self._rdf_store_path = f"{rdf_store_path}.ttl"
-        self._graph = Graph(rdf_store.value, identifier=owner)
+        self._binary_snapshot_path = (
+            f"{rdf_store_path}.{BINARY_SNAPSHOT_EXTENSION}"
+        )
+        self._snapshot_format = snapshot_format
+        self._rdf_store = rdf_store
+        self._graph = TrackedGraph(rdf_store.value, identifier=owner)
+        self._wal: Optional[WriteAheadLog] = None
+        self._wal_compaction_threshold = wal_compaction_threshold
+        # Generation of the graph, bumped by every update.
+        self._generation = 0
+        self._query_cache = (
+            QueryResultCache(query_cache_size) if query_cache_size else None
+        )
+        self._change_listeners: List[Callable[[List[Change]], None]] = []
+        # Changes of the ongoing transaction, if any, and the updates it
+        # buffers, see transaction.
+        self._transaction_changes: Optional[List[Change]] = None
+        self._pending_updates: List[str] = []
+        self._save_requested = False
+        # Whether the graph has changes that are not persisted yet. Updates
+        # and background flushes are serialized by the lock.
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._flush_interval = flush_interval
+        self._flush_timer: Optional[threading.Timer] = None
+        # Lock shared with other processes, the state of the files of the
+        # graph when last loaded or written, see _get_disk_state, and the
+        # changes made since then.
+        self._file_lock: Optional[FileLock] = None
+        self._disk_state: Tuple[Optional[Tuple[int, int, int]], ...] = ()
+        self._unsaved_changes: List[Change] = []
+        if rdf_store.is_persistent:
+            self._open_persistent_store(rdf_store_path)
+            return
+
         self._bind_namespaces()
-        if os.path.exists(self._rdf_store_path):
-            self._graph.parse(self._rdf_store_path, format="turtle")
+        if persistence_mode == PersistenceMode.WRITE_AHEAD_LOG:
+            self._wal = WriteAheadLog(
+                rdf_store_path,
+                binary_snapshot=snapshot_format == SnapshotFormat.BINARY,
+            )
+        self._file_lock = FileLock(
+            f"{rdf_store_path}.{LOCK_FILE_EXTENSION}", lock_timeout
+        )
+        self._disk_state = self._get_disk_state()
+        if any(self._disk_state):
+            # Migrating to the write-ahead log writes a snapshot, and so does
+            # migrating a Turtle snapshot that does not preserve blank node
+            # labels.
+            migrate_turtle_snapshot = self._has_prefixed_turtle_snapshot()
+            with (
+                self._file_lock.exclusive()
+                if (self._wal is not None and not self._wal.has_snapshot())
+                or migrate_turtle_snapshot
+                else self._file_lock.shared()
+            ):
+                self._load(self._graph)
+                if migrate_turtle_snapshot:
+                    self._write_snapshot()
+                self._disk_state = self._get_disk_state()
         self._graph.open(rdf_store_path, create=True)
+        if persistence_mode == PersistenceMode.SNAPSHOT:
+            # The graph is saved if it has no snapshot in the configured
+            # format yet, or if it was loaded from the other format.
+            self._dirty = not os.path.exists(self._get_snapshot_path()) or (
+                snapshot_format == SnapshotFormat.TURTLE
+                and os.path.exists(self._binary_snapshot_path)
+            )
 
     def _bind_namespaces(self) -> None:
         """Binds namespaces to the graph."""
         for prefix, namespace in PKGPrefixes.__members__.items():
             self._graph.bind(prefix.lower(), namespace.value)
 
-    def execute_sparql_query(self, query: str) -> Result:
-        """Executes SPARQL query.
+    def _open_persistent_store(self, path: str) -> None:
+        """Opens the graph directly from a persistent store.
+
+        A PKG previously persisted as Turtle is migrated into the store the
+        first time it is opened, if the store is empty.
+
+        With SQLite, all the PKGs stored in the same directory share a single
+        database file, in which each PKG is a named graph.
+
+        Args:
+            path: Path to the store.
+        """
+        if self._rdf_store == RDFStore.SQLITE:
+            path = os.path.join(os.path.dirname(path), SQLITE_DATABASE_FILENAME)
+        self._graph.open(path, create=True)
+        self._bind_namespaces()
+        if len(self._graph) == 0 and os.path.exists(self._rdf_store_path):
+            self._graph.parse(self._rdf_store_path, format="turtle")
+        self._commit()
+
+    def _commit(self) -> None:
+        """Commits pending changes to a persistent store."""
+        self._graph.commit()
+        if self._rdf_store == RDFStore.BERKELEYDB:
+            # The BerkeleyDB store is not transactional, changes are flushed
+            # to disk with sync.
+            self._graph.store.sync()  # type: ignore[attr-defined]
+
+    def _load(self, graph: TrackedGraph) -> None:
+        """Loads the graph from its files.
+
+        Args:
+            graph: Graph to load the data into.
+        """
+        if self._wal is not None:
+            self._load_from_write_ahead_log(self._wal, graph)
+        elif os.path.exists(self._binary_snapshot_path):
+            load_binary_snapshot(graph, self._binary_snapshot_path)
+        elif self._has_prefixed_turtle_snapshot():
+            graph.parse(self._rdf_store_path, format="turtle")
+        elif os.path.exists(self._rdf_store_path):
+            graph.parse(
+                self._rdf_store_path,
+                format="nt",
+                bnode_context=PreservedBNodeLabels(),
+            )
+
+    def _has_prefixed_turtle_snapshot(self) -> bool:
+        """Checks whether the graph is loaded from a full Turtle snapshot.
+
+        Snapshots written by earlier versions use the full Turtle syntax,
+        e.g., prefixes and nested blank nodes, whose blank node labels are
+        not preserved by parsing. Snapshots in N-Triples syntax start with a
+        triple.
+
+        Returns:
+            True if the graph is loaded from a Turtle snapshot that is not in
+            N-Triples syntax.
+        """
+        if (
+            self._wal is not None
+            or os.path.exists(self._binary_snapshot_path)
+            or not os.path.exists(self._rdf_store_path)
+        ):
+            return False
+        with open(self._rdf_store_path, "r", encoding="utf-8") as ttl_file:
+            for line in ttl_file:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    return not line.startswith(("<", "_:"))
+        return False
+
+    def _load_from_write_ahead_log(
+        self, wal: WriteAheadLog, graph: TrackedGraph
+    ) -> None:
+        """Loads the graph from the last snapshot and the write-ahead log.
+
+        A PKG previously persisted as Turtle is migrated by writing its
+        first snapshot right away, since Turtle does not preserve the
+        blank node labels the log refers to.
+
+        Args:
+            wal: Write-ahead log of the graph.
+            graph: Graph to load the data into.
+        """
+        if not wal.has_snapshot() and os.path.exists(self._rdf_store_path):
+            graph.parse(self._rdf_store_path, format="turtle")
+            wal.compact(graph)
+            return
+        wal.load(graph)
+
+    def _get_disk_state(self) -> Tuple[Optional[Tuple[int, int, int]], ...]:
+        """Gets the state of the files the graph is loaded from.
+
+        Snapshots are replaced by renaming a new file over them and the log
+        grows with every change, hence any change to the files changes
+        their inode, modification time, or size.
+
+        Returns:
+            Inode, modification time, and size of each file, None for the
+            missing files.
+        """
+        paths = [self._rdf_store_path, self._binary_snapshot_path]
+        if self._wal is not None:
+            paths += [self._wal.nt_snapshot_path, self._wal.log_path]
+        state: List[Optional[Tuple[int, int, int]]] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                state.append(None)
+                continue
+            state.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        return tuple(state)
+
+    def refresh(self) -> None:
+        """Brings the graph up to date before it is read.
+
+        The updates buffered by a transaction are executed, and the
+        changes persisted by other processes since the graph was loaded
+        are loaded.
+        """
+        self.flush_pending_updates()
+        with self._lock:
+            if self._transaction_changes is not None or not self._is_stale():
+                return
+            with self._get_file_lock().shared():
+                self._reload()
+
+    def _get_file_lock(self) -> FileLock:
+        """Returns the lock of the files of a graph outside persistent stores.
+
+        Raises:
+            RuntimeError: If the graph is in a persistent store.
+        """
+        if self._file_lock is None:
+            raise RuntimeError(f"{self._rdf_store} is not locked by file.")
+        return self._file_lock
+
+    def _is_stale(self) -> bool:
+        """Checks whether other processes changed the files of the graph."""
+        return (
+            self._file_lock is not None
+            and self._get_disk_state() != self._disk_state
+        )
+
+    def _reload(self) -> None:
+        """Loads the changes persisted by other processes into the graph.
+
+        The graph is loaded anew from its files, the changes that are
+        not persisted yet are applied to it again, and it is compared to
+        the current one. The differences are applied as changes, of
+        which the change listeners are notified. The file lock must be
+        held by the caller.
+        """
+        graph = TrackedGraph()
+        self._load(graph)
+        self._disk_state = self._get_disk_state()
+        graph.apply_changes(self._unsaved_changes)
+        triples = set(self._graph)
+        new_triples = set(graph)
+        changes: List[Change] = [
+            (REMOVED, triple) for triple in triples - new_triples
+        ] + [(ADDED, triple) for triple in new_triples - triples]
+        try:
+            self._graph.apply_changes(changes)
+            for listener in self._change_listeners:
+                listener(changes)
+        finally:
+            self._generation += 1
+
+    def prepare_query(self, query: str) -> Query:
+        """Parses and compiles a SPARQL query.
+
+        The prefixes bound in the graph are available to the query, as when
+        the query is executed as a string.
 
         Args:
             query: SPARQL query.
+
+        Raises:
+            ValueError: If the query is invalid.
+
+        Returns:
+            Prepared query.
+        """
+        try:
+            return prepareQuery(query, initNs=dict(self._graph.namespaces()))
+        except Exception as e:
+            raise ValueError(f"Invalid SPARQL query: {e}") from e
+
+    def execute_sparql_query(
+        self,
+        query: Union[str, Query],
+        bindings: Optional[Dict[str, Any]] = None,
+        cache: bool = True,
+        timeout: Optional[float] = None,
+    ) -> Result:
+        """Executes SPARQL query.
+
+        With the query cache, the result is reused as long as the graph is
+        not updated.
+
+        Args:
+            query: SPARQL query, either as a string or prepared.
+            bindings: Values bound to the variables of the query. Defaults to
+              None.
+            cache: Whether to use the query cache. One-off queries are not
+              worth caching, and caching materializes their result. Defaults
+              to True.
+            timeout: Number of seconds after which the query is cancelled,
+              see pkg_api.query_limits.execute_query_with_timeout. Defaults to
+              None, i.e., no timeout.
+
+        Raises:
+            QueryTimeoutError: If the query does not complete within the
+              timeout.
         """
-        return self._graph.query(query)
+        self.refresh()
+        if self._query_cache is None or not cache:
+            return self._query(query, bindings, timeout)
+
+        key = QueryResultCache.key(query, bindings)
+        generation = self._generation
+        result = self._query_cache.get(key, generation)
+        if result is None:
+            result = self._query(query, bindings, timeout)
+            self._query_cache.put(key, result, generation)
+        return result
+
+    def _query(
+        self,
+        query: Union[str, Query],
+        bindings: Optional[Dict[str, Any]],
+        timeout: Optional[float],
+    ) -> Result:
+        """Evaluates SPARQL query on the graph, within the timeout if any.
+
+        Args:
+            query: SPARQL query, either as a string or prepared.
+            bindings: Values bound to the variables of the query.
+            timeout: Number of seconds after which the query is cancelled, if
+              any.
 
-    def execute_sparql_update(self, query: str) -> None:
+        Raises:
+            QueryTimeoutError: If the query does not complete within the
+              timeout.
+        """
+        if timeout is None:
+            return self._graph.query(query, initBindings=bindings)
+        return execute_query_with_timeout(self._graph, query, bindings, timeout)
+
+    @property
+    def generation(self) -> int:
+        """Returns the generation of the graph, bumped by every change."""
+        return self._generation
+
+    def query_cache_info(self) -> Optional[CacheInfo]:
+        """Returns the statistics of the query cache, if enabled."""
+        if self._query_cache is None:
+            return None
+        return self._query_cache.info()
+
+    def execute_sparql_update(
+        self,
+        query: Union[str, Update],
+        bindings: Optional[Dict[str, Any]] = None,
+    ) -> None:
         """Executes SPARQL update.
 
+        The changes made by the update are persisted, see _apply. Within a
+        transaction, updates given as strings are buffered, see transaction.
+
         Args:
-            query: SPARQL update.
+            query: SPARQL update, either as a string or prepared.
+            bindings: Values bound to the variables of the update. Defaults to
+              None.
         """
-        self._graph.update(query)
+        if (
+            self._transaction_changes is not None
+            and isinstance(query, str)
+            and not bindings
+        ):
+            if query:
+                self._pending_updates.append(query)
+            if len(self._pending_updates) >= MAX_PENDING_UPDATES:
+                self.flush_pending_updates()
+            return
+        self._apply(lambda: self._graph.update(query, initBindings=bindings))
+
+    def flush_pending_updates(self) -> None:
+        """Executes the updates buffered by the transaction as one update.
+
+        See MAX_PENDING_UPDATES.
+        """
+        if not self._pending_updates:
+            return
+        query = " ; ".join(self._pending_updates)
+        self._pending_updates = []
+        self._apply(lambda: self._graph.update(query))
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Groups the changes made within the context.
+
+        The changes are made to the graph as they come, such that they are
+        seen by queries within the context, and the change listeners are
+        notified right away. They are only persisted on exit, at once, e.g.,
+        appended to the write-ahead log or committed to a persistent store,
+        and saving the graph is deferred until then. Updates given as strings
+        are buffered and executed as combined updates of up to
+        MAX_PENDING_UPDATES updates before the next query or change, or on
+        exit.
+
+        If an exception is raised within the context, the changes are
+        reverted, the change listeners are notified of the reverting changes,
+        and nothing is persisted. A transaction opened within another one is
+        part of it.
+
+        Yields:
+            None.
+        """
+        if self._transaction_changes is not None:
+            yield
+            return
+
+        self.refresh()
+        dirty = self._dirty
+        num_unsaved_changes = len(self._unsaved_changes)
+        try:
+            with self._graph.track_changes() as changes:
+                self._transaction_changes = changes
+                yield
+                self.flush_pending_updates()
+        except BaseException:
+            self._transaction_changes = None
+            self._pending_updates = []
+            self._save_requested = False
+            self._revert(changes)
+            del self._unsaved_changes[num_unsaved_changes:]
+            self._dirty = dirty
+            raise
+
+        self._transaction_changes = None
+        with self._lock:
+            self._persist(changes)
+        if self._save_requested:
+            self._save_requested = False
+            self.save_graph()
+
+    def _revert(self, changes: List[Change]) -> None:
+        """Reverts the changes of a transaction.
+
+        Args:
+            changes: Changes made by the transaction.
+        """
+        inverse_changes = invert_changes(changes)
+        try:
+            with self._lock:
+                self._graph.apply_changes(inverse_changes)
+            if self._rdf_store.is_persistent:
+                # Ends the pending transaction of the store, which has no
+                # net changes.
+                with self._lock:
+                    self._commit()
+            for listener in self._change_listeners:
+                listener(inverse_changes)
+        finally:
+            self._generation += 1
+
+    def add_triples(self, triples: Iterable[Tuple[Any, Any, Any]]) -> None:
+        """Adds triples directly to the graph, bypassing SPARQL.
+
+        The triples are persisted in the same way as the changes made by a
+        SPARQL update.
+
+        Args:
+            triples: Triples to add.
+        """
+        self._apply(
+            lambda: self._graph.addN(
+                (s, p, o, self._graph) for s, p, o in triples
+            )
+        )
+
+    def add_change_listener(
+        self, listener: Callable[[List[Change]], None]
+    ) -> None:
+        """Registers a function called with the changes of every update.
+
+        The changes made through the connector are tracked once a listener
+        is registered, which has a cost for each added or removed triple.
+
+        Args:
+            listener: Function called with the changes made to the graph,
+              after they are persisted.
+        """
+        self._change_listeners.append(listener)
+
+    def _apply(self, change: Callable[[], Any]) -> None:
+        """Changes the graph and persists the changes.
+
+        The changes are persisted, see _persist, unless they are part of a
+        transaction. The change listeners are then notified.
+
+        Args:
+            change: Function changing the graph.
+        """
+        self.flush_pending_updates()
+        try:
+            changes: List[Change] = []
+            with self._lock:
+                if self._transaction_changes is None and self._is_stale():
+                    with self._get_file_lock().shared():
+                        self._reload()
+                if (
+                    self._file_lock is None
+                    and not self._change_listeners
+                    and self._transaction_changes is None
+                ):
+                    change()
+                    self._dirty = True
+                else:
+                    with self._graph.track_changes() as changes:
+                        change()
+                    self._dirty = self._dirty or bool(changes)
+                if self._file_lock is not None:
+                    self._unsaved_changes.extend(changes)
+
+                if self._transaction_changes is None:
+                    self._persist(changes)
+
+            for listener in self._change_listeners:
+                listener(changes)
+        finally:
+            # Bumped after the change, such that results computed while the
+            # graph is being changed are not reused.
+            self._generation += 1
+
+    def _persist(self, changes: List[Change]) -> None:
+        """Persists changes made to the graph.
+
+        With the write-ahead log, the changes are appended to the log. With a
+        persistent store, they are committed. Otherwise, they are persisted
+        when the graph is saved.
+
+        The changes appended by other processes in the meantime are loaded
+        first, such that the log holds the changes in the order they are
+        made.
+
+        Args:
+            changes: Changes made to the graph.
+        """
+        if self._wal is not None:
+            with self._get_file_lock().exclusive():
+                if self._is_stale():
+                    self._reload()
+                self._wal.append(changes)
+                if len(self._wal) >= self._wal_compaction_threshold:
+                    self._wal.compact(self._graph)
+                self._disk_state = self._get_disk_state()
+            self._unsaved_changes = []
+            self._dirty = False
+        elif self._rdf_store.is_persistent:
+            self._commit()
+            self._dirty = False
 
     def close(self) -> None:
-        """Closes the connection to the triplestore."""
-        self.save_graph()
-        self._graph.close()
+        """Closes the connection to the triplestore.
+
+        The graph is saved if it has changes that are not persisted yet.
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        try:
+            self.flush()
+        finally:
+            if self._file_lock is not None:
+                self._file_lock.close()
+        if self._wal is not None:
+            self._wal.close()
+        self._graph.close(
+            commit_pending_transaction=self._rdf_store.is_persistent
+        )
 
     def save_graph(self) -> None:
         """Saves the graph to a file.
 
+        Nothing is written if the graph has no changes since it was last
+        persisted. With the write-ahead log or a persistent store, changes
+        are persisted as they are made. Within a transaction, the graph is
+        saved when the transaction ends.
+
+        With a flush interval, the graph is written in the background once
+        the interval has elapsed, such that the graph is written once for
+        all the saves made in the meantime.
+
         Raises:
             FileNotFoundError: If the directory to store the graph does not
               exist.
         """
-        directory = os.path.dirname(self._rdf_store_path)
-        if not os.path.exists(directory):
-            raise FileNotFoundError(f"Directory {directory} does not exist.")
-        self._graph.serialize(self._rdf_store_path, format="turtle")
+        if self._transaction_changes is not None:
+            self._save_requested = True
+            return
+        if not self._rdf_store.is_persistent:
+            directory = os.path.dirname(self._rdf_store_path)
+            if not os.path.exists(directory):
+                raise FileNotFoundError(
+                    f"Directory {directory} does not exist."
+                )
+        if self._flush_interval is None:
+            self.flush()
+            return
+        with self._lock:
+            if self._dirty and self._flush_timer is None:
+                self._flush_timer = threading.Timer(
+                    self._flush_interval, self._flush_in_background
+                )
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Writes the changes of the graph to disk, if any."""
+        with self._lock:
+            self._flush_timer = None
+            if self._transaction_changes is not None:
+                self._save_requested = True
+                return
+            if not self._dirty:
+                return
+            if self._rdf_store.is_persistent:
+                self._commit()
+            elif self._wal is not None:
+                # The changes are persisted by the log as they are made.
+                pass
+            else:
+                with self._get_file_lock().exclusive():
+                    if self._is_stale():
+                        self._reload()
+                    self._write_snapshot()
+                    self._disk_state = self._get_disk_state()
+                self._unsaved_changes = []
+            self._dirty = False
+
+    def _write_snapshot(self) -> None:
+        """Writes a snapshot of the graph in the configured format."""
+        if self._snapshot_format == SnapshotFormat.BINARY:
+            write_binary_snapshot(self._graph, self._binary_snapshot_path)
+            return
+        with atomic_write(self._rdf_store_path) as snapshot_file:
+            self._graph.serialize(snapshot_file, format="nt")
+        # Remove the binary snapshot, it would shadow the Turtle one.
+        if os.path.exists(self._binary_snapshot_path):
+            os.remove(self._binary_snapshot_path)
+
+    def _flush_in_background(self) -> None:
+        """Writes the graph to disk from the thread of the flush timer."""
+        try:
+            self.flush()
+        except Exception:
+            logging.exception(f"Failed to write {self._graph.identifier}.")
+
+    def _get_snapshot_path(self) -> str:
+        """Returns the path to the snapshot written when saving the graph."""
+        if self._snapshot_format == SnapshotFormat.BINARY:
+            return self._binary_snapshot_path
+        return self._rdf_store_path
+
+    def export_graph(self, path: str, rdf_format: str = "turtle") -> None:
+        """Exports the graph to a file, independently of its persistence.
+
+        Args:
+            path: Path to the exported file.
+            rdf_format: RDF serialization format supported by RDFLib. Defaults
+              to "turtle".
+        """
+        self._graph.serialize(path, format=rdf_format)
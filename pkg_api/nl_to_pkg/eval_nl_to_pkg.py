@@ -3,9 +3,6 @@
 import csv
 from typing import Any, Dict, List, Tuple
 
-from sklearn.metrics import f1_score
-from tqdm import tqdm
-
 from pkg_api.core.intents import Intent
 from pkg_api.core.pkg_types import PKGData
 from pkg_api.nl_to_pkg.annotators.three_step_annotator import (
@@ -42,6 +39,9 @@ def eval_annotations(
     Returns:
         Dictionary containing the evaluation metrics.
     """
+    # Imported on use, as it is only needed for the evaluation.
+    from tqdm import tqdm
+
     annotator = ThreeStepStatementAnnotator(prompt_paths, config_path)
     annotations = [annotator.get_annotations(row[0]) for row in tqdm(data)]
 
@@ -71,6 +71,9 @@ def get_intent_f1_scores(
     Returns:
         Tuple of macro and micro F1 scores for the intents.
     """
+    # Imported on use, as it is slow to import.
+    from sklearn.metrics import f1_score
+
     true_intents = []
     predicted_intents = []
     for (_, true_intent, _, _, _, _), (pred_intent, _) in zip(
@@ -95,6 +98,9 @@ def get_preference_f1_scores(
     Returns:
         Tuple of macro and micro F1 scores for the preferences.
     """
+    # Imported on use, as it is slow to import.
+    from sklearn.metrics import f1_score
+
     true_preferences = []
     predicted_preferences = []
     for (_, _, _, _, _, true_pref), (_, pkg_data) in zip(
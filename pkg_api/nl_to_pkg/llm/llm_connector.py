@@ -3,7 +3,6 @@ import os
 from typing import Any, Dict
 
 import yaml
-from ollama import Client, Options
 
 _DEFAULT_CONFIG_PATH = "pkg_api/nl_to_pkg/llm/configs/llm_config_mistral.yaml"
 
@@ -31,6 +30,9 @@ class LLMConnector:
             )
         if "host" not in self._config:
             raise ValueError("No host specified in the config.")
+        # Imported on use, as it is slow to import.
+        from ollama import Client
+
         self._client = Client(host=self._config.get("host"))
         self._model = self._config.get("model")
         self._stream = self._config.get("stream", False)
@@ -78,4 +80,7 @@ class LLMConnector:
 
     def _get_llm_config(self) -> Dict[str, Any]:
         """Returns the config for the request."""
+        # Imported on use, as it is slow to import.
+        from ollama import Options
+
         return Options(self._config.get("options", {}))
@@ -8,27 +8,88 @@ in the PKG vocabulary. The PKG vocabulary and an example of a statement
 can be found here: https://github.com/iai-group/pkg-vocabulary
 """
 
-import io
-import logging
+import hashlib
+import itertools
+import os
+import threading
 import uuid
-from collections import defaultdict
-from typing import Any, DefaultDict, Dict, List, Optional, Tuple, Union
-
-import pydotplus
-from IPython.display import display
-from rdflib import BNode, Literal, URIRef
-from rdflib.namespace import NamespaceManager
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from rdflib import RDF, Graph, Namespace, URIRef
+from rdflib.plugins.sparql.sparql import Query
 from rdflib.query import Result
 from rdflib.term import Variable
-from rdflib.tools.rdf2dot import rdf2dot
 
+import pkg_api.triple_builder as triple_builder
 import pkg_api.utils as utils
-from pkg_api.connector import Connector, RDFStore
+from pkg_api.connector import (
+    Connector,
+    PersistenceMode,
+    RDFStore,
+    SnapshotFormat,
+)
 from pkg_api.core.namespaces import PKGPrefixes
-from pkg_api.core.pkg_types import URI, Concept, PKGData, Triple, TripleElement
-from pkg_api.mapping_vocab import MappingVocab
+from pkg_api.core.pkg_types import URI, Concept, PKGData
+from pkg_api.preference_index import PreferenceIndex
+from pkg_api.statement_decoder import StatementDecoder
+from pkg_api.storage.file_lock import DEFAULT_LOCK_TIMEOUT
+from pkg_api.visualization import (
+    DEFAULT_MAX_VISUALIZED_NODES,
+    DEFAULT_VISUALIZATION_DEPTH,
+    ImageFormat,
+    get_content_digest,
+    get_neighborhood,
+    render_graph,
+    render_serialized_graph,
+)
 
 DEFAULT_VISUALIZATION_PATH = "data/pkg_visualizations"
+# Parsing is the main cost of a SPARQL update, and it grows faster than
+# linearly with the size of the update.
+DEFAULT_BATCH_SIZE = 10
+# Number of statements retrieved at once when iterating over statements.
+STATEMENT_PAGE_SIZE = 1000
+
+_PAV = Namespace(PKGPrefixes.PAV.value)
+
+
+class WriteEngine(Enum):
+    """Enum for the different ways of writing statements to the graph.
+
+    SPARQL writes statements with SPARQL updates (see pkg_api.utils),
+    while DIRECT adds their triples to the graph without going through
+    SPARQL (see pkg_api.triple_builder). Both produce the same triples.
+    """
+
+    SPARQL = "SPARQL"
+    DIRECT = "Direct"
+
+
+class ConceptNodes(Enum):
+    """Enum for the different ways of naming the nodes of concepts.
+
+    BLANK gives a new blank node to each concept of a statement, while
+    CONTENT_ADDRESSED names concepts with IRIs derived from their
+    content (see pkg_api.utils.get_concept_node_id). Identical concepts
+    are then stored once and shared by the statements referring to them;
+    a shared concept is removed with the last statement referring to it.
+    """
+
+    BLANK = "Blank"
+    CONTENT_ADDRESSED = "Content-addressed"
 
 
 class PKG:
@@ -38,6 +99,13 @@ class PKG:
         rdf_store: RDFStore,
         rdf_path: str,
         visualization_path: str = DEFAULT_VISUALIZATION_PATH,
+        persistence_mode: PersistenceMode = PersistenceMode.SNAPSHOT,
+        snapshot_format: SnapshotFormat = SnapshotFormat.TURTLE,
+        query_cache_size: int = 0,
+        write_engine: WriteEngine = WriteEngine.SPARQL,
+        concept_nodes: ConceptNodes = ConceptNodes.BLANK,
+        flush_interval: Optional[float] = None,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
     ) -> None:
         """Initializes PKG of a given user.
 
@@ -47,10 +115,48 @@ class PKG:
             rdf_path: Path to the RDF store.
             visualization_path: Path to the visualization of PKG. Defaults to
               DEFAULT_VISUALIZATION_PATH.
+            persistence_mode: How the PKG is persisted. Defaults to
+              PersistenceMode.SNAPSHOT.
+            snapshot_format: Format of the snapshots of the PKG. Defaults to
+              SnapshotFormat.TURTLE.
+            query_cache_size: Memory budget in bytes of the cache of query
+              results. Defaults to 0, i.e., results are not cached.
+            write_engine: How statements are written to the graph. Defaults
+              to WriteEngine.SPARQL.
+            concept_nodes: How the nodes of concepts are named. Defaults to
+              ConceptNodes.BLANK.
+            flush_interval: Number of seconds after which a saved PKG is
+              written to disk in the background, see
+              Connector.save_graph. Defaults to None, i.e., the PKG is
+              written when saved.
+            lock_timeout: Number of seconds to wait for the lock of the PKG
+              held by other processes. Defaults to DEFAULT_LOCK_TIMEOUT.
         """
         self._owner_uri = owner
-        self._connector = Connector(owner, rdf_store, rdf_path)
+        self._connector = Connector(
+            owner,
+            rdf_store,
+            rdf_path,
+            persistence_mode=persistence_mode,
+            snapshot_format=snapshot_format,
+            query_cache_size=query_cache_size,
+            flush_interval=flush_interval,
+            lock_timeout=lock_timeout,
+        )
         self._visualization_path = visualization_path
+        self._write_engine = write_engine
+        self._content_addressed_concepts = (
+            concept_nodes == ConceptNodes.CONTENT_ADDRESSED
+        )
+        self._statement_decoder = StatementDecoder(self._connector._graph)
+        self._preference_index: Optional[PreferenceIndex] = None
+        # Generation of the PKG and digest of the graph visualized when each
+        # image was rendered, by path.
+        self._rendered_visualizations: Dict[str, Tuple[int, str]] = {}
+        # Digest of the graph visualized and future of the images being
+        # rendered in the background, by path.
+        self._pending_visualizations: Dict[str, Tuple[str, "Future[str]"]] = {}
+        self._visualization_lock = threading.Lock()
 
     @property
     def owner_uri(self) -> URI:
@@ -58,9 +164,33 @@ class PKG:
         return self._owner_uri
 
     def close(self) -> None:
-        """Closes the connection to the connector."""
+        """Closes the connection to the connector.
+
+        The PKG is written to disk only if it has unsaved changes.
+        """
         self._connector.close()
 
+    def save(self) -> None:
+        """Persists the PKG while keeping the connection open."""
+        self._connector.save_graph()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Groups the changes made to the PKG within the context.
+
+        The changes are visible within the context, and persisted and saved
+        at once on exit. Statements are added with a single combined SPARQL
+        update, executed before the next retrieval or other change, or on
+        exit. If an exception is raised, the changes are rolled back. See
+        Connector.transaction.
+
+        Yields:
+            None.
+        """
+        with self._connector.transaction():
+            yield
+            self.save()
+
     def get_owner_preference(self, object: URI) -> float:
         """Gets preference for a given object.
 
@@ -83,9 +213,15 @@ class PKG:
         """
         return self.get_preferences(self._owner_uri, rdf_class)
 
-    def get_preference(self, who: URI, object: URI) -> Optional[float]:
+    def get_preference(
+        self, who: URI, object: Union[URI, Concept]
+    ) -> Optional[float]:
         """Gets the preference for a given object.
 
+        Preferences for URIs are looked up in the preference index (see
+        pkg_api.preference_index). Preferences for concepts are retrieved with
+        a SPARQL query.
+
         Bindings that are returned after executing a query in RDFLib are
         iterable. By design, we should have up to one binding returned when
         querying for preferences (there is a preference set or not). If more
@@ -97,16 +233,22 @@ class PKG:
             object: Object of the preference.
 
         Raises:
-            Exception: If multiple bindings are returned after executing the
-            query.
+            Exception: If multiple preferences are found.
 
         Returns:
             Preference value. If no preference is found, returns None.
         """
-        query = utils.get_query_for_conditioned_get_preference(who, object)
+        if not isinstance(object, Concept):
+            return self._get_preference_index().get_weight(
+                URIRef(who), URIRef(object)
+            )
+
+        query = utils.get_prepared_query_for_conditioned_get_preference(
+            who, object
+        )
         bindings = [
             binding
-            for binding in self._connector.execute_sparql_query(query).bindings
+            for binding in self._connector.execute_sparql_query(*query).bindings
         ]
         if len(bindings) > 1:
             raise Exception(
@@ -114,7 +256,7 @@ class PKG:
                 f"{bindings}"
             )
         return (
-            float(bindings[0].get(Variable("pref")))
+            float(bindings[0].get(Variable("weight")))
             if len(bindings) == 1
             else None
         )
@@ -122,6 +264,12 @@ class PKG:
     def get_preferences(self, who: URI, rdf_class: URI) -> Dict[URI, float]:
         """Gets preferences for a given class.
 
+        The class of a preference is the class of its topic, i.e., the
+        preferences returned are the ones for URIs of type rdf_class. URIs
+        with multiple preferences are skipped, as are content-addressed
+        concepts, which are concepts rather than URIs despite being named by
+        IRIs (see get_preference for the preferences for concepts).
+
         Args:
             who: Subject of the preference.
             rdf_class: Class of the preference.
@@ -129,56 +277,314 @@ class PKG:
         Returns:
             Dictionary of preferences.
         """
-        pass
+        weights = self._get_preference_index().get_weights_by_class(
+            URIRef(who), URIRef(rdf_class)
+        )
+        return {
+            URI(str(topic)): weight
+            for topic, weight in weights.items()
+            if isinstance(topic, URIRef) and not utils.is_concept_node(topic)
+        }
+
+    def _get_preference_index(self) -> PreferenceIndex:
+        """Returns the preference index, building it on first use.
+
+        Once built, the index is updated with the changes made to the
+        PKG.
+        """
+        self._connector.refresh()
+        if self._preference_index is None:
+            self._preference_index = PreferenceIndex(self._connector._graph)
+            self._connector.add_change_listener(
+                self._preference_index.apply_changes
+            )
+        return self._preference_index
 
     def add_statement(self, pkg_data: PKGData) -> None:
         """Adds a statement to the PKG.
 
-        Note that if a preference is provided, it will be added with a separate
-        query.
+        The statement and the preference derived from it, if any, are written
+        at once with the removal of the previous preferences of its subject
+        for the same topic, which the preference replaces, see _add_batch.
 
         Args:
             pkg_data: PKG data associated to a statement.
         """
-        query = utils.get_query_for_add_statement(pkg_data)
+        self._add_batch([pkg_data])
+
+    def add_statements(
+        self,
+        statements: Iterable[PKGData],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """Adds statements to the PKG in batches.
+
+        Each batch is added with a single SPARQL update, or a single addition
+        of triples with WriteEngine.DIRECT, which is persisted at once, e.g.,
+        appended to the write-ahead log or committed to a persistent store. As
+        with add_statement, the preferences derived from the statements are
+        added with them, together with the removal of the preferences they
+        replace, the latest statement winning if several of them express a
+        preference of a subject for the same topic.
+
+        Args:
+            statements: PKG data associated to the statements.
+            batch_size: Number of statements per update. Defaults to
+              DEFAULT_BATCH_SIZE.
+
+        Raises:
+            ValueError: If the batch size is not strictly positive.
+        """
+        if batch_size < 1:
+            raise ValueError("The batch size must be strictly positive.")
+        statements = iter(statements)
+        while True:
+            batch = list(itertools.islice(statements, batch_size))
+            if not batch:
+                break
+            self._add_batch(batch)
+
+    def _add_batch(self, batch: List[PKGData]) -> None:
+        """Adds a batch of statements with their preferences, if any.
+
+        The preferences replaced by the ones of the statements are removed by
+        the same SPARQL update, or by an update within the same transaction
+        as the addition of triples with WriteEngine.DIRECT, see
+        utils.get_query_for_replace_preference. Within a batch, the update is
+        buffered, see Connector.transaction.
+
+        Args:
+            batch: PKG data associated to the statements, in the order they
+              are added.
+        """
+        # A subject has a single preference for a topic, the latest one. The
+        # replaced preferences are removed in reverse order, such that the
+        # removals of earlier preferences match nothing once these are
+        # removed by later ones.
+        replace_query = " ; ".join(
+            utils.get_query_for_replace_preference(pkg_data)
+            for pkg_data in reversed(batch)
+            if pkg_data.preference is not None
+        )
+        if self._write_engine == WriteEngine.DIRECT:
+            with self._connector.transaction():
+                self._connector.add_triples(
+                    itertools.chain.from_iterable(
+                        triple_builder.get_triples_for_add_statement(
+                            pkg_data,
+                            include_preference=True,
+                            content_addressed_concepts=(
+                                self._content_addressed_concepts
+                            ),
+                        )
+                        for pkg_data in batch
+                    )
+                )
+                if replace_query:
+                    self._connector.execute_sparql_update(replace_query)
+            return
+
+        query = utils.get_query_for_add_statements(
+            batch,
+            include_preference=True,
+            content_addressed_concepts=self._content_addressed_concepts,
+        )
+        if replace_query:
+            query += " ; " + replace_query
         self._connector.execute_sparql_update(query)
 
-    def execute_sparql_query(self, query: str) -> Result:
-        """Executes a SPARQL query.
+    def prepare_query(self, query: str) -> Query:
+        """Parses and compiles a SPARQL query.
 
         Args:
             query: SPARQL query.
 
+        Raises:
+            ValueError: If the query is invalid.
+
+        Returns:
+            Prepared query.
+        """
+        return self._connector.prepare_query(query)
+
+    def execute_sparql_query(
+        self, query: Union[str, Query], timeout: Optional[float] = None
+    ) -> Result:
+        """Executes a SPARQL query.
+
+        Prepared queries are one-off, e.g., limited with
+        pkg_api.query_limits.limit_query, hence their results are not cached.
+
+        Args:
+            query: SPARQL query, either as a string or prepared.
+            timeout: Number of seconds after which the query is cancelled.
+              Defaults to None, i.e., no timeout.
+
+        Raises:
+            QueryTimeoutError: If the query does not complete within the
+              timeout.
+
         Returns:
             Result of the SPARQL query.
         """
-        return self._connector.execute_sparql_query(query)
+        return self._connector.execute_sparql_query(
+            query, cache=isinstance(query, str), timeout=timeout
+        )
 
-    def visualize_graph(self) -> str:
+    def visualize_graph(
+        self,
+        focus: Optional[URI] = None,
+        depth: int = DEFAULT_VISUALIZATION_DEPTH,
+        max_nodes: int = DEFAULT_MAX_VISUALIZED_NODES,
+        image_format: ImageFormat = ImageFormat.PNG,
+    ) -> str:
         """Visualizes the PKG.
 
-        https://stackoverflow.com/questions/39274216/visualize-an-rdflib-graph-in-python # noqa: E501
+        The graph visualized is the neighborhood of a focus node, see
+        pkg_api.visualization.get_neighborhood. An image is only rendered
+        again if the graph visualized changed since it was last rendered.
+
+        Args:
+            focus: URI of the focus node. Defaults to None, i.e., no focus
+              node.
+            depth: Maximum number of hops from the focus node. Defaults to
+              DEFAULT_VISUALIZATION_DEPTH.
+            max_nodes: Maximum number of nodes. Defaults to
+              DEFAULT_MAX_VISUALIZED_NODES.
+            image_format: Format of the image. Defaults to ImageFormat.PNG.
+
+        Raises:
+            ValueError: If the depth is negative or the maximum number of nodes
+              is not strictly positive.
 
         Returns:
             The path to the image visualizing the PKG.
         """
-        stream = io.StringIO()
-        rdf2dot(self._connector._graph, stream, opts={display})
-        dg = pydotplus.graph_from_dot_data(stream.getvalue())
-        png = dg.create_png()
+        path, subgraph, digest = self._get_visualization(
+            focus, depth, max_nodes, image_format
+        )
+        if subgraph is not None:
+            generation = self._connector.generation
+            render_graph(subgraph, path, image_format)
+            self._rendered_visualizations[path] = (generation, digest)
+        return path
 
-        owner_name = ""
+    def submit_visualization(
+        self,
+        executor: Executor,
+        focus: Optional[URI] = None,
+        depth: int = DEFAULT_VISUALIZATION_DEPTH,
+        max_nodes: int = DEFAULT_MAX_VISUALIZED_NODES,
+        image_format: ImageFormat = ImageFormat.PNG,
+    ) -> "Future[str]":
+        """Visualizes the PKG in the background.
+
+        Same as visualize_graph, but the image is rendered by an executor,
+        e.g., a process pool. The graph visualized is extracted beforehand and
+        sent serialized to the executor. A visualization requested while an
+        identical one is being rendered shares its future.
 
-        for _, namespace in PKGPrefixes.__members__.items():
-            if namespace.value in str(self._owner_uri):
-                owner_name = self._owner_uri.replace(str(namespace.value), "")
+        Args:
+            executor: Executor rendering the image.
+            focus: URI of the focus node. Defaults to None, i.e., no focus
+              node.
+            depth: Maximum number of hops from the focus node. Defaults to
+              DEFAULT_VISUALIZATION_DEPTH.
+            max_nodes: Maximum number of nodes. Defaults to
+              DEFAULT_MAX_VISUALIZED_NODES.
+            image_format: Format of the image. Defaults to ImageFormat.PNG.
+
+        Raises:
+            ValueError: If the depth is negative or the maximum number of nodes
+              is not strictly positive.
 
-        path = self._visualization_path + "/" + owner_name + ".png"
+        Returns:
+            Future resolved with the path to the image visualizing the PKG.
+        """
+        with self._visualization_lock:
+            path, subgraph, digest = self._get_visualization(
+                focus, depth, max_nodes, image_format
+            )
+            future: "Future[str]"
+            if subgraph is None:
+                future = Future()
+                future.set_result(path)
+                return future
+            pending = self._pending_visualizations.get(path)
+            if pending is not None and pending[0] == digest:
+                return pending[1]
+
+            generation = self._connector.generation
+            future = executor.submit(
+                render_serialized_graph,
+                subgraph.serialize(format="turtle"),
+                path,
+                image_format,
+            )
+            self._pending_visualizations[path] = (digest, future)
 
-        with open(path, "wb") as test_png:
-            test_png.write(png)
+        def on_rendered(future: "Future[str]") -> None:
+            """Records the rendered image once the render is over."""
+            with self._visualization_lock:
+                if self._pending_visualizations.get(path) == (digest, future):
+                    del self._pending_visualizations[path]
+                if not future.cancelled() and future.exception() is None:
+                    self._rendered_visualizations[path] = (generation, digest)
 
-        return path
+        future.add_done_callback(on_rendered)
+        return future
+
+    def _get_visualization(
+        self,
+        focus: Optional[URI],
+        depth: int,
+        max_nodes: int,
+        image_format: ImageFormat,
+    ) -> Tuple[str, Optional[Graph], str]:
+        """Gets the graph to visualize, unless its image is up to date.
+
+        The image is up to date if the PKG is unchanged since it was rendered,
+        or if the graph visualized is.
+
+        Args:
+            focus: URI of the focus node, if any.
+            depth: Maximum number of hops from the focus node.
+            max_nodes: Maximum number of nodes.
+            image_format: Format of the image.
+
+        Returns:
+            The path to the image, the graph to visualize, or None if its image
+            is up to date, and the digest of the graph visualized.
+        """
+        owner_name = ""
+        for _, namespace in PKGPrefixes.__members__.items():
+            if namespace.value in str(self._owner_uri):
+                owner_name = self._owner_uri.replace(str(namespace.value), "")
+        if focus is not None or max_nodes != DEFAULT_MAX_VISUALIZED_NODES:
+            # Images of other views of the PKG are named after the view.
+            view = hashlib.sha256(f"{focus} {depth} {max_nodes}".encode())
+            owner_name += f"-{view.hexdigest()[:16]}"
+        path = f"{self._visualization_path}/{owner_name}.{image_format.value}"
+
+        self._connector.refresh()
+        generation = self._connector.generation
+        rendered = self._rendered_visualizations.get(path)
+        if rendered is None or not os.path.exists(path):
+            rendered = None
+        elif rendered[0] == generation:
+            return path, None, rendered[1]
+
+        subgraph = get_neighborhood(
+            self._connector._graph,
+            URIRef(focus) if focus is not None else None,
+            depth,
+            max_nodes,
+        )
+        digest = get_content_digest(subgraph)
+        if rendered is not None and rendered[1] == digest:
+            self._rendered_visualizations[path] = (generation, digest)
+            return path, None, digest
+        return path, subgraph, digest
 
     def get_statements(
         self, pkg_data: PKGData, triple_conditioned: bool = True
@@ -193,174 +599,234 @@ class PKG:
         Returns:
             Statements matching the conditions.
         """
-        if triple_conditioned and pkg_data.triple is not None:
-            query = utils.get_query_for_conditional_get_statements(
-                pkg_data.triple
-            )
-        else:
-            query = utils.get_query_for_get_statements(pkg_data)
-        results = list(self._connector.execute_sparql_query(query).bindings)
+        results = self._get_statement_bindings(pkg_data, triple_conditioned)
         return self._parse_statements(results)
 
-    def _parse_statements(self, results: List[Any]) -> List[PKGData]:
-        """Parses a list of statements.
+    def iter_statements(
+        self,
+        pkg_data: PKGData,
+        triple_conditioned: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        cursor: Optional[uuid.UUID] = None,
+    ) -> Iterator[PKGData]:
+        """Iterates over statements from the PKG given conditions.
+
+        Unlike get_statements, the statements are ordered by ID and decoded
+        one at a time as the iterator is consumed. They are retrieved by pages
+        of at most STATEMENT_PAGE_SIZE statements, the ordering, cursor,
+        limit, and offset being evaluated by the SPARQL queries. The cursor is
+        the ID of the last statement of a previous page: iterating from it
+        resumes after that statement, even if statements were added or
+        removed in between. Statements without a description are skipped.
 
         Args:
-            results: List of results from the SPARQL query.
+            pkg_data: PKG data associated to wanted statements.
+            triple_conditioned: Whether to condition the query with the triple
+              data. Defaults to True.
+            limit: Maximum number of statements. Defaults to None, i.e., no
+              limit.
+            offset: Number of statements to skip. Defaults to 0.
+            cursor: ID of the statement to start after. Defaults to None, i.e.,
+              start with the first statement.
 
-        Returns:
-            List of PKG data associated to the retrieved statements.
+        Raises:
+            ValueError: If the limit or the offset is negative.
+
+        Yields:
+            Statements matching the conditions.
         """
-        statements: List[PKGData] = []
-        for row in results:
-            statement_bnode = row.get(Variable("statement"))
-            statement_node_id = statement_bnode.n3(
-                self._connector._graph.namespace_manager
-            ).split(":")[1]
-            triples = list(
-                self._connector._graph.triples((statement_bnode, None, None))
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ValueError("The limit and the offset must be positive.")
+        cursor_node: Optional[Any] = (
+            triple_builder.get_statement_node_for_id(cursor)
+            if cursor is not None
+            else None
+        )
+        # The statements are retrieved by pages, each page starting after the
+        # last statement of the previous one.
+        while limit is None or limit > 0:
+            page_size = (
+                STATEMENT_PAGE_SIZE
+                if limit is None
+                else min(limit, STATEMENT_PAGE_SIZE)
             )
-            statement = self._parse_statement_node(
-                triples,
-                self._connector._graph.namespace_manager,
-                statement_node_id,
+            query = utils.get_prepared_query_for_get_statements_page(
+                pkg_data, triple_conditioned, page_size, offset, cursor_node
             )
-            statements.append(statement)
-        return statements
-
-    def _parse_statement_node(
-        self,
-        triples: List[Tuple[Any, Any, Any]],
-        namespace_manager: NamespaceManager,
-        statement_node_id: Optional[str] = None,
-    ) -> Optional[PKGData]:
-        """Parses a statement node.
+            # Only the nodes of the page are held, the statements are decoded
+            # as they are consumed.
+            statement_nodes = [
+                row.get(Variable("statement"))
+                for row in self._connector.execute_sparql_query(*query).bindings
+            ]
+            for statement_node in statement_nodes:
+                statement = self._statement_decoder.decode_statement(
+                    statement_node
+                )
+                if statement is not None:
+                    yield statement
+            num_statements = len(statement_nodes)
+            if num_statements < page_size:
+                return
+            cursor_node = statement_nodes[-1]
+            offset = 0
+            if limit is not None:
+                limit -= num_statements
+
+    def _get_statement_bindings(
+        self, pkg_data: PKGData, triple_conditioned: bool
+    ) -> List[Any]:
+        """Gets the bindings of the statements matching conditions.
 
         Args:
-            triples: List of triples that form the statement.
-            namespace_manager: Namespace manager of the graph.
+            pkg_data: PKG data associated to wanted statements.
+            triple_conditioned: Whether to condition the query with the triple
+              data.
 
         Returns:
-            PKG data associated to the statement.
+            Bindings of the statement variable.
         """
-        statement_dict: DefaultDict[str, Any] = defaultdict(
-            lambda: defaultdict()
-        )
-
-        for _, p, o in triples:
-            # Parse the predicate URI to N3 format, i.e., prefix:property.
-            property = p.n3(namespace_manager)
-            pkg_data_field, field_property = MappingVocab.get_pkgdata_field(
-                property
+        if triple_conditioned and pkg_data.triple is not None:
+            query = utils.get_prepared_query_for_conditional_get_statements(
+                pkg_data.triple
             )
-            if pkg_data_field is None:
-                logging.warning(
-                    f"Statement parsing - Property {property} not supported."
-                )
-                continue
-            value = self._parse_rdf_triple_object(o)
-            if field_property is None:
-                statement_dict[pkg_data_field] = value
-            else:
-                statement_dict[pkg_data_field][field_property] = value
-
-        if not statement_dict.get("statement", None):
-            logging.warning("Statement parsing failed, not statement returned.")
-            return None
+        else:
+            query = (utils.get_query_for_get_statements(pkg_data), {})
+        return list(self._connector.execute_sparql_query(*query).bindings)
 
-        # Create a Triple object from the parsed triple (need to create
-        # TripleElement objects)
-        _triple = None
-        for k, v in statement_dict.get("triple", {}).items():
-            if _triple is None:
-                _triple = Triple()
-            if v is not None:
-                setattr(_triple, k, TripleElement.from_value(v))
-
-        return PKGData(
-            id=(
-                uuid.UUID(f"{{{statement_node_id}}}")
-                if statement_node_id
-                else uuid.uuid1()
-            ),
-            statement=statement_dict.get("statement"),
-            triple=_triple,
-            preference=None,
-            logging_data=dict(statement_dict.get("logging_data", {})),
-        )
+    def get_statement_by_id(self, statement_id: uuid.UUID) -> Optional[PKGData]:
+        """Gets a statement given its ID.
 
-    def _parse_rdf_triple_object(
-        self, object: Any
-    ) -> Optional[Union[URI, Concept, str]]:
-        """Parses a triple object retrieved with SPARQL.
+        As with get_statements, the preference of the statement is not
+        retrieved.
 
         Args:
-            object: Triple object retrieved with SPARQL.
+            statement_id: ID of the statement.
 
         Returns:
-            Value of the triple object as URI, Concept, or str.
+            PKG data associated to the statement, or None if the PKG has no
+            statement with this ID.
         """
-        if isinstance(object, URIRef):
-            return URI(str(object))
-        elif isinstance(object, Literal):
-            return str(object)
-        elif isinstance(object, BNode):
-            return self._retrieve_and_parse_concept(object)
-
-        logging.warning(
-            f"Object {object} of type {type(object)} not supported."
-        )
-        return None
+        statement_node = triple_builder.get_statement_node_for_id(statement_id)
+        if not self._has_statement_node(statement_node):
+            return None
+        return self._statement_decoder.decode_statement(statement_node)
 
-    def _retrieve_and_parse_concept(
-        self, concept_node: BNode
-    ) -> Optional[Concept]:
-        """Retrieves and parses a concept from the graph.
+    def _parse_statements(self, results: List[Any]) -> List[PKGData]:
+        """Parses a list of statements.
 
         Args:
-            concept_node: Node ID of the concept.
+            results: List of results from the SPARQL query.
 
         Returns:
-            Concept.
+            List of PKG data associated to the retrieved statements. The
+            statements without a description are skipped.
         """
-        concept_dict: DefaultDict[str, Any] = defaultdict()
-        namespace_manager = self._connector._graph.namespace_manager
-        for _, p, o in self._connector._graph.triples(
-            (concept_node, None, None)
-        ):
-            # According to rdflib documentation, all terms have a n3 method.
-            property = p.n3(namespace_manager)  # type: ignore[attr-defined]
-            concept_field = MappingVocab.CONCEPT_MAPPING.get(property, None)
-            if concept_field is None:
-                logging.warning(
-                    f"Concept parsing - Property {property} not supported."
-                )
-                continue
-
-            if concept_field == "description":
-                concept_dict[concept_field] = str(o)
-            else:
-                # Other fields of Concept are lists of URIs
-                concept_dict.setdefault(concept_field, []).append(URI(str(o)))
-
-        if not concept_dict.get("description", None):
-            logging.warning("Concept parsing failed, not description found.")
-            return None
-
-        return Concept(**concept_dict)
+        return [
+            statement
+            for statement in self._statement_decoder.decode_statements(
+                row.get(Variable("statement")) for row in results
+            )
+            if statement is not None
+        ]
 
     def remove_statement(self, pkg_data: PKGData) -> None:
         """Removes a statement from the PKG.
 
+        The concepts and weights of the statement and of the preferences
+        derived from it are also removed, unless they are referred to by other
+        nodes.
+
         Args:
             pkg_data: PKG data associated to the statement.
         """
-        # Remove preference derived from the statement, if any
-        query = utils.get_query_for_remove_preference(pkg_data)
-        self._connector.execute_sparql_update(query)
-        # Remove statement
-        query = utils.get_query_for_remove_statement(pkg_data)
-        self._connector.execute_sparql_update(query)
-        # Remove dangling concepts and scales
-        for query in utils.get_queries_for_remove_cleanup():
-            self._connector.execute_sparql_update(query)
+        query = utils.get_query_for_get_statements_to_remove(pkg_data)
+        statement_nodes = [
+            row.get(Variable("statement"))
+            for row in self._connector.execute_sparql_query(query).bindings
+        ]
+        self._remove_statement_nodes(statement_nodes)
+
+    def remove_statement_by_id(self, statement_id: uuid.UUID) -> None:
+        """Removes a statement given its ID.
+
+        The statement is removed as with remove_statement, but its node is
+        derived from the ID instead of being matched against the PKG data.
+
+        Args:
+            statement_id: ID of the statement.
+        """
+        statement_node = triple_builder.get_statement_node_for_id(statement_id)
+        if self._has_statement_node(statement_node):
+            self._remove_statement_nodes([statement_node])
+
+    def _remove_statement_nodes(self, statement_nodes: List[Any]) -> None:
+        """Removes statement nodes, and the nodes left dangling.
+
+        Args:
+            statement_nodes: Nodes of the statements.
+        """
+        # Nodes that may become dangling, e.g., concepts and weights
+        nodes: Set[Any] = set()
+        for statement_node in statement_nodes:
+            prepared_query = (
+                utils.get_prepared_query_for_get_statement_node_objects(
+                    statement_node
+                )
+            )
+            results = self._connector.execute_sparql_query(*prepared_query)
+            nodes.update(row.get(Variable("node")) for row in results.bindings)
+        # Remove the statements and the preferences derived from them, if any
+        for statement_node in statement_nodes:
+            self._connector.execute_sparql_update(
+                *utils.get_prepared_update_for_remove_statement_node(
+                    statement_node
+                )
+            )
+        # Remove the nodes left dangling
+        for node in nodes:
+            self._connector.execute_sparql_update(
+                *utils.get_prepared_update_for_remove_dangling_node(node)
+            )
+
+    def update_preference(self, statement_id: uuid.UUID, weight: float) -> bool:
+        """Updates the weight of the preference derived from a statement.
+
+        The weight is replaced in place, i.e., the preference is not removed
+        and added again.
+
+        Args:
+            statement_id: ID of the statement.
+            weight: New weight of the preference.
+
+        Returns:
+            True if a preference derived from the statement was updated,
+            False otherwise.
+        """
+        statement_node = triple_builder.get_statement_node_for_id(statement_id)
+        self._connector.refresh()
+        if (
+            self._connector._graph.value(
+                None,
+                _PAV.derivedFrom,
+                statement_node,
+            )
+            is None
+        ):
+            return False
+        self._connector.execute_sparql_update(
+            *utils.get_prepared_update_for_update_preference(
+                statement_node, weight
+            )
+        )
+        return True
+
+    def _has_statement_node(self, statement_node: URIRef) -> bool:
+        """Checks whether a node is a statement of the PKG."""
+        self._connector.refresh()
+        return (
+            statement_node,
+            RDF.type,
+            RDF.Statement,
+        ) in self._connector._graph
@@ -0,0 +1,262 @@
+"""In-memory index of the preferences of a PKG.
+
+A preference is represented in the PKG vocabulary by a node linking a
+subject to a topic and to a weight on the standard scale:
+
+    subject wi:preference [
+        wi:topic topic ;
+        wo:weight [ wo:weight_value weight ; wo:scale pkg:StandardScale ]
+    ] .
+
+The index maps pairs of subject and topic to weights, and groups the topics
+by class, i.e., by the rdf:type of the topics. It is built with a single scan
+of the graph and then kept up to date with the changes made to the graph,
+such that retrieving the preferences of a subject does not require
+evaluating SPARQL queries.
+"""
+
+import logging
+from collections import defaultdict
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from rdflib import RDF, Graph, Namespace
+
+from pkg_api.core.namespaces import PKGPrefixes
+from pkg_api.storage.tracked_graph import Change
+
+_PKG = Namespace(PKGPrefixes.PKG.value)
+_WI = Namespace(PKGPrefixes.WI.value)
+_WO = Namespace(PKGPrefixes.WO.value)
+
+# Properties of the weight of a preference.
+_WEIGHT_PROPERTIES = frozenset([_WO.weight_value, _WO.scale])
+
+
+class PreferenceIndex:
+    def __init__(self, graph: Graph) -> None:
+        """Initializes the index with the preferences in a graph.
+
+        Args:
+            graph: Graph holding the preferences.
+        """
+        self._graph = graph
+        # Subject, topic, and weight node of each indexed preference node.
+        self._preferences: Dict[Any, Tuple[Any, Any, Any]] = {}
+        self._weight_nodes: Dict[Any, Any] = {}
+        # Weights of the preference nodes of a subject, per topic.
+        self._weights: DefaultDict[
+            Any, DefaultDict[Any, Dict[Any, float]]
+        ] = defaultdict(lambda: defaultdict(dict))
+        # Classes of the topics of preferences, and the subjects having
+        # preferences for them.
+        self._topic_classes: Dict[Any, Set[Any]] = {}
+        self._topic_subjects: DefaultDict[Any, Set[Any]] = defaultdict(set)
+        # Topics of the preferences of a subject, per class.
+        self._class_topics: DefaultDict[
+            Tuple[Any, Any], Set[Any]
+        ] = defaultdict(set)
+
+        for preference_node in set(graph.objects(None, _WI.preference)):
+            self._index_preference(preference_node)
+
+    def get_weight(self, subject: Any, topic: Any) -> Optional[float]:
+        """Gets the weight of the preference of a subject for a topic.
+
+        Args:
+            subject: Subject of the preference.
+            topic: Topic of the preference.
+
+        Raises:
+            Exception: If the subject has multiple preferences for the topic.
+
+        Returns:
+            Weight of the preference, or None if there is no preference.
+        """
+        weights = self._weights.get(subject, {}).get(topic)
+        if not weights:
+            return None
+        if len(weights) > 1:
+            raise Exception(
+                f"Multiple preferences found for {subject} and {topic}: "
+                f"{list(weights.values())}"
+            )
+        return next(iter(weights.values()))
+
+    def get_preference_nodes(self, subject: Any, topic: Any) -> List[Any]:
+        """Gets the preference nodes of a subject for a topic.
+
+        Args:
+            subject: Subject of the preferences.
+            topic: Topic of the preferences.
+
+        Returns:
+            List of preference nodes.
+        """
+        return list(self._weights.get(subject, {}).get(topic, ()))
+
+    def get_subject_and_topic(
+        self, preference_node: Any
+    ) -> Optional[Tuple[Any, Any]]:
+        """Gets the subject and topic of a preference node.
+
+        Args:
+            preference_node: Preference node.
+
+        Returns:
+            Subject and topic of the preference, or None if the node is not
+            an indexed preference.
+        """
+        if preference_node not in self._preferences:
+            return None
+        subject, topic, _ = self._preferences[preference_node]
+        return subject, topic
+
+    def get_weights_by_class(
+        self, subject: Any, rdf_class: Any
+    ) -> Dict[Any, float]:
+        """Gets the weights of the preferences of a subject for a class.
+
+        The topics for which the subject has multiple preferences are
+        ambiguous, they are skipped with a warning instead of failing the
+        lookup of the whole class.
+
+        Args:
+            subject: Subject of the preferences.
+            rdf_class: Class of the topics of the preferences.
+
+        Returns:
+            Dictionary mapping the topics of the class to their weight.
+        """
+        subject_weights: Dict[Any, Dict[Any, float]] = self._weights.get(
+            subject, {}
+        )
+        weights_by_topic = {}
+        for topic in self._class_topics.get((subject, rdf_class), ()):
+            weights = list(subject_weights[topic].values())
+            if len(weights) > 1:
+                logging.warning(
+                    f"Skipping {topic}, multiple preferences found for "
+                    f"{subject}: {weights}"
+                )
+                continue
+            weights_by_topic[topic] = weights[0]
+        return weights_by_topic
+
+    def apply_changes(self, changes: Iterable[Change]) -> None:
+        """Updates the index with changes made to the graph.
+
+        The preferences affected by the changes are indexed again from the
+        graph, which holds the changes already.
+
+        Args:
+            changes: Changes made to the graph.
+        """
+        preference_nodes = set()
+        topics = set()
+        for _, (s, p, o) in changes:
+            if p == _WI.preference:
+                preference_nodes.add(o)
+            elif p in (_WI.topic, _WO.weight):
+                preference_nodes.add(s)
+            elif p in _WEIGHT_PROPERTIES:
+                preference_nodes.update(self._graph.subjects(_WO.weight, s))
+                if s in self._weight_nodes:
+                    preference_nodes.add(self._weight_nodes[s])
+            elif p == RDF.type:
+                topics.add(s)
+
+        for preference_node in preference_nodes:
+            self._unindex_preference(preference_node)
+            self._index_preference(preference_node)
+        for topic in topics:
+            if topic in self._topic_subjects:
+                self._classify_topic(topic)
+
+    def _index_preference(self, preference_node: Any) -> None:
+        """Indexes a preference node if it is a complete preference.
+
+        Args:
+            preference_node: Preference node.
+        """
+        subject = self._graph.value(None, _WI.preference, preference_node)
+        topic = self._graph.value(preference_node, _WI.topic)
+        if subject is None or topic is None:
+            return
+        for weight_node in self._graph.objects(preference_node, _WO.weight):
+            weight = self._graph.value(weight_node, _WO.weight_value)
+            if (
+                weight is not None
+                and (weight_node, _WO.scale, _PKG.StandardScale) in self._graph
+            ):
+                break
+        else:
+            return
+
+        self._preferences[preference_node] = (subject, topic, weight_node)
+        self._weight_nodes[weight_node] = preference_node
+        self._weights[subject][topic][preference_node] = float(str(weight))
+        if topic not in self._topic_classes:
+            self._topic_classes[topic] = set(
+                self._graph.objects(topic, RDF.type)
+            )
+        self._topic_subjects[topic].add(subject)
+        for rdf_class in self._topic_classes[topic]:
+            self._class_topics[(subject, rdf_class)].add(topic)
+
+    def _unindex_preference(self, preference_node: Any) -> None:
+        """Removes a preference node from the index.
+
+        Args:
+            preference_node: Preference node.
+        """
+        if preference_node not in self._preferences:
+            return
+        subject, topic, weight_node = self._preferences.pop(preference_node)
+        del self._weight_nodes[weight_node]
+        subject_weights = self._weights[subject]
+        del subject_weights[topic][preference_node]
+        if subject_weights[topic]:
+            return
+
+        # The subject has no preference left for the topic.
+        del subject_weights[topic]
+        if not subject_weights:
+            del self._weights[subject]
+        for rdf_class in self._topic_classes[topic]:
+            self._discard_class_topic(subject, rdf_class, topic)
+        self._topic_subjects[topic].discard(subject)
+        if not self._topic_subjects[topic]:
+            del self._topic_subjects[topic]
+            del self._topic_classes[topic]
+
+    def _classify_topic(self, topic: Any) -> None:
+        """Updates the classes of a topic of preferences from the graph.
+
+        Args:
+            topic: Topic of preferences.
+        """
+        classes = set(self._graph.objects(topic, RDF.type))
+        for subject in self._topic_subjects[topic]:
+            for rdf_class in self._topic_classes[topic] - classes:
+                self._discard_class_topic(subject, rdf_class, topic)
+            for rdf_class in classes:
+                self._class_topics[(subject, rdf_class)].add(topic)
+        self._topic_classes[topic] = classes
+
+    def _discard_class_topic(
+        self, subject: Any, rdf_class: Any, topic: Any
+    ) -> None:
+        """Removes a topic from the topics of a subject for a class."""
+        topics = self._class_topics[(subject, rdf_class)]
+        topics.discard(topic)
+        if not topics:
+            del self._class_topics[(subject, rdf_class)]
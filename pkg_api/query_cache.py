@@ -0,0 +1,167 @@
+"""Cache of SPARQL query results.
+
+Results are cached per query and bindings, and stamped with the
+generation of the graph they were computed on. The generation is bumped
+by every update of the graph, hence a cached result is only returned if
+the graph has not changed since it was computed. The cache is bounded by
+an estimate of the memory used by the results, least recently used
+results are evicted first.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from rdflib.query import Result
+
+# Estimated size of a result, excluding its rows.
+_RESULT_OVERHEAD = 256
+
+CacheKey = Tuple[Hashable, Tuple[Tuple[str, Any], ...]]
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of the cache."""
+
+    hits: int
+    misses: int
+    entries: int
+    size: int
+    max_size: int
+
+
+@dataclass
+class _CacheEntry:
+    """Cached result with the generation of the graph and its size."""
+
+    result: Result
+    generation: int
+    size: int
+
+
+def _estimate_size(result: Result) -> int:
+    """Estimates the memory used by a materialized result in bytes.
+
+    Args:
+        result: Result of a SELECT or ASK query.
+
+    Returns:
+        Estimated size in bytes.
+    """
+    size = _RESULT_OVERHEAD
+    if result.type == "SELECT":
+        for row in result.bindings:
+            size += sys.getsizeof(row)
+            size += sum(sys.getsizeof(value) for value in row.values())
+    return size
+
+
+class QueryResultCache:
+    def __init__(self, max_size: int) -> None:
+        """Initializes an LRU cache of query results.
+
+        Args:
+            max_size: Memory budget of the cache in bytes.
+
+        Raises:
+            ValueError: If the memory budget is not strictly positive.
+        """
+        if max_size < 1:
+            raise ValueError("The cache size must be strictly positive.")
+        self._max_size = max_size
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        query: Hashable, bindings: Optional[Dict[str, Any]] = None
+    ) -> CacheKey:
+        """Returns the key of a query with given bindings.
+
+        Args:
+            query: Query, either as a string or prepared.
+            bindings: Values bound to the variables of the query. Defaults to
+              None.
+
+        Returns:
+            Cache key.
+        """
+        return query, tuple(sorted((bindings or {}).items()))
+
+    def get(self, key: CacheKey, generation: int) -> Optional[Result]:
+        """Gets the result of a query computed on a given generation.
+
+        A result computed on another generation is discarded.
+
+        Args:
+            key: Key of the query.
+            generation: Current generation of the graph.
+
+        Returns:
+            Cached result, or None if there is none.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.generation != generation:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry.result
+
+    def put(self, key: CacheKey, result: Result, generation: int) -> None:
+        """Caches the result of a query.
+
+        Only the results of SELECT and ASK queries are cached. The result is
+        materialized such that it can be iterated over several times. Results
+        exceeding the memory budget on their own are not cached.
+
+        Args:
+            key: Key of the query.
+            result: Result of the query.
+            generation: Generation of the graph the result was computed on.
+        """
+        if result.type not in ("SELECT", "ASK"):
+            return
+        size = _estimate_size(result)
+        if size > self._max_size:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(result, generation, size)
+            self._size += size
+            while self._size > self._max_size:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Removes all the results from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def info(self) -> CacheInfo:
+        """Returns the statistics of the cache."""
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                len(self._entries),
+                self._size,
+                self._max_size,
+            )
+
+    def _remove(self, key: CacheKey) -> None:
+        """Removes a result from the cache.
+
+        The lock must be held by the caller.
+        """
+        self._size -= self._entries.pop(key).size
@@ -0,0 +1,332 @@
+"""Limits on the SPARQL queries run on behalf of users.
+
+Queries sent by users, e.g., to explore their PKG, are arbitrary. They
+are inspected and bounded on their parsed algebra rather than on their
+text, which may contain keywords in comments, literals, or URIs.
+
+Queries whose cost is unbounded by the size of the graph are rejected
+before they run, see check_query. As the cost of the other queries may
+still be high, they are evaluated by a worker thread that is cancelled past
+a wall-clock timeout, see execute_query_with_timeout. Cancelling is
+cooperative: the worker stops at the next triple it reads from the graph.
+Evaluation steps that read no triple, e.g., ordering, grouping, or
+filtering the solutions already read, keep running past the timeout. The
+number of worker threads, including the cancelled ones still running, is
+hence bounded by MAX_QUERY_THREADS per process.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from rdflib import BNode, Graph, Variable
+from rdflib.paths import (
+    AlternativePath,
+    InvPath,
+    MulPath,
+    OneOrMore,
+    SequencePath,
+    ZeroOrMore,
+)
+from rdflib.plugins.sparql.parser import parseUpdate
+from rdflib.plugins.sparql.parserutils import CompValue
+from rdflib.plugins.sparql.sparql import Query
+from rdflib.query import Result
+
+DEFAULT_MAX_ROWS = 10000
+DEFAULT_QUERY_TIMEOUT = 10.0
+MAX_QUERY_THREADS = 8
+
+# Parts of the algebra holding triple patterns, the patterns of EXISTS
+# filters being left untranslated by RDFLib until evaluated.
+_TRIPLE_PATTERNS = ("BGP", "TriplesBlock")
+# Parts of the algebra joining the solutions of their two operands.
+_JOINS = ("Join", "LeftJoin", "Minus")
+# Slots of the worker threads evaluating queries, released when the worker
+# ends rather than when the query times out.
+_query_threads = threading.BoundedSemaphore(MAX_QUERY_THREADS)
+
+
+class QueryRejectedError(ValueError):
+    """Raised when a query is rejected by the static check."""
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when a query does not complete within the timeout."""
+
+
+class QueryType(Enum):
+    """Enum for the types of SPARQL queries, named after their algebra."""
+
+    SELECT = "SelectQuery"
+    ASK = "AskQuery"
+    CONSTRUCT = "ConstructQuery"
+    DESCRIBE = "DescribeQuery"
+
+
+def get_query_type(query: Query) -> QueryType:
+    """Gets the type of a SPARQL query.
+
+    Args:
+        query: Prepared SPARQL query.
+
+    Returns:
+        Type of the query.
+    """
+    return QueryType(query.algebra.name)
+
+
+def is_update(query: str) -> bool:
+    """Checks whether a SPARQL request is an update rather than a query.
+
+    Args:
+        query: SPARQL request.
+
+    Returns:
+        True if the request is a valid SPARQL update.
+    """
+    try:
+        parseUpdate(query)
+    except Exception:
+        return False
+    return True
+
+
+def limit_query(query: Query, limit: int) -> Query:
+    """Limits the number of rows returned by a SPARQL SELECT query.
+
+    The LIMIT of the query is kept if it is lower. The query is not modified,
+    a limited copy is returned.
+
+    Args:
+        query: Prepared SPARQL SELECT query.
+        limit: Maximum number of rows.
+
+    Raises:
+        ValueError: If the query is not a SELECT query or the limit is not
+          strictly positive.
+
+    Returns:
+        Limited query.
+    """
+    if get_query_type(query) != QueryType.SELECT:
+        raise ValueError("Only SELECT queries can be limited.")
+    if limit < 1:
+        raise ValueError("The limit must be strictly positive.")
+
+    algebra = query.algebra
+    part = algebra.p
+    if part.name == "Slice":
+        length = limit if part.length is None else min(part.length, limit)
+        part = CompValue("Slice", p=part.p, start=part.start, length=length)
+    else:
+        part = CompValue("Slice", p=part, start=0, length=limit)
+    return Query(
+        query.prologue, CompValue(algebra.name, **{**algebra, "p": part})
+    )
+
+
+def check_query(query: Query) -> None:
+    """Rejects the SPARQL queries with unbounded joins.
+
+    A join is unbounded if its operands share no variable, i.e., it is a
+    cartesian product whose size is the product of the sizes of the
+    operands. This holds for triple patterns of a basic graph pattern that
+    are not connected by variables, and for group, optional, and minus
+    patterns. Operands without variables, e.g., VALUES, are bounded by the
+    query itself. Property paths of arbitrary length between two variables
+    are unbounded too, as they compute a transitive closure.
+
+    Args:
+        query: Prepared SPARQL query.
+
+    Raises:
+        QueryRejectedError: If the query has an unbounded join.
+    """
+    for part in _iter_parts(query.algebra):
+        if part.name in _TRIPLE_PATTERNS:
+            if _count_components(part.triples) > 1:
+                raise QueryRejectedError(
+                    "The query joins triple patterns without common "
+                    "variables, i.e., computes a cartesian product."
+                )
+            for s, p, o in part.triples:
+                if _is_variable(s) and _is_variable(o) and _is_unbounded(p):
+                    raise QueryRejectedError(
+                        "The query has a property path of arbitrary length "
+                        "between two variables."
+                    )
+        elif part.name in _JOINS:
+            variables_1 = part.p1._vars or set()
+            variables_2 = part.p2._vars or set()
+            if (
+                variables_1
+                and variables_2
+                and variables_1.isdisjoint(variables_2)
+            ):
+                raise QueryRejectedError(
+                    "The query joins patterns without common variables, "
+                    "i.e., computes a cartesian product."
+                )
+
+
+def _iter_parts(value: Any) -> Iterator[CompValue]:
+    """Iterates over the parts of an algebra, including nested ones.
+
+    Args:
+        value: Part of the algebra, or value of a part.
+
+    Yields:
+        Parts of the algebra.
+    """
+    if isinstance(value, CompValue):
+        yield value
+        values: Any = value.values()
+    elif isinstance(value, (list, tuple)):
+        values = value
+    else:
+        return
+    for nested_value in values:
+        yield from _iter_parts(nested_value)
+
+
+def _is_variable(term: Any) -> bool:
+    """Checks whether a term is bound by the query, i.e., is not constant."""
+    return isinstance(term, (Variable, BNode))
+
+
+def _is_unbounded(path: Any) -> bool:
+    """Checks whether a predicate is a path of arbitrary length."""
+    if isinstance(path, MulPath):
+        return path.mod in (ZeroOrMore, OneOrMore) or _is_unbounded(path.path)
+    if isinstance(path, (SequencePath, AlternativePath)):
+        return any(_is_unbounded(arg) for arg in path.args)
+    if isinstance(path, InvPath):
+        return _is_unbounded(path.arg)
+    return False
+
+
+def _count_components(triples: List[Any]) -> int:
+    """Counts the groups of triple patterns connected by variables.
+
+    Triple patterns without variables are left out, they do not multiply
+    the number of solutions.
+
+    Args:
+        triples: Triple patterns.
+
+    Returns:
+        Number of connected groups.
+    """
+    # Union-find over the variables, every triple pattern merging its own.
+    parents: Dict[Any, Any] = {}
+
+    def find(variable: Any) -> Any:
+        """Returns the representative of the group of a variable."""
+        while parents[variable] != variable:
+            parents[variable] = parents[parents[variable]]
+            variable = parents[variable]
+        return variable
+
+    for triple in triples:
+        variables = [term for term in triple if _is_variable(term)]
+        for variable in variables:
+            parents.setdefault(variable, variable)
+        for variable in variables[1:]:
+            parents[find(variable)] = find(variables[0])
+    return len({find(variable) for variable in parents})
+
+
+class _CancellableGraph(Graph):
+    def __init__(self, graph: Graph, cancelled: threading.Event) -> None:
+        """Initializes a view of a graph whose reads fail once cancelled.
+
+        Args:
+            graph: Graph viewed, sharing its store and namespaces.
+            cancelled: Event set to cancel the reads.
+        """
+        super().__init__(
+            store=graph.store,
+            identifier=graph.identifier,
+            namespace_manager=graph.namespace_manager,
+        )
+        self._cancelled = cancelled
+
+    def triples(self, triple: Any) -> Iterator[Any]:
+        """Iterates over the triples matching a pattern, until cancelled.
+
+        Raises:
+            QueryTimeoutError: If the reads are cancelled.
+        """
+        for matching_triple in super().triples(triple):
+            if self._cancelled.is_set():
+                raise QueryTimeoutError("The query was cancelled.")
+            yield matching_triple
+
+
+def execute_query_with_timeout(
+    graph: Graph,
+    query: Union[str, Query],
+    bindings: Optional[Dict[str, Any]],
+    timeout: float,
+) -> Result:
+    """Executes a SPARQL query, cancelling it past a timeout.
+
+    The query is fully evaluated by a worker thread, including the rows of
+    SELECT queries, which are otherwise evaluated lazily as they are read.
+    The worker waits for one of the MAX_QUERY_THREADS slots, which it holds
+    until it ends, possibly after the timeout, see _CancellableGraph. The
+    time waiting for a slot counts towards the timeout.
+
+    Args:
+        graph: Graph queried.
+        query: SPARQL query, either as a string or prepared.
+        bindings: Values bound to the variables of the query.
+        timeout: Number of seconds after which the query is cancelled.
+
+    Raises:
+        QueryTimeoutError: If the query does not complete within the
+          timeout, or no worker thread is available within the timeout.
+
+    Returns:
+        Result of the query.
+    """
+    deadline = time.monotonic() + timeout
+    if not _query_threads.acquire(timeout=timeout):
+        raise QueryTimeoutError(
+            "Too many queries are running, no query could be started within "
+            f"{timeout} seconds."
+        )
+    cancelled = threading.Event()
+    cancellable_graph = _CancellableGraph(graph, cancelled)
+    future: "Future[Result]" = Future()
+
+    def evaluate() -> None:
+        """Evaluates the query, resolving the future with its result."""
+        try:
+            result = cancellable_graph.query(query, initBindings=bindings)
+            if result.type == "SELECT":
+                result.bindings
+            future.set_result(result)
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            _query_threads.release()
+
+    try:
+        threading.Thread(
+            target=evaluate, name="sparql-query", daemon=True
+        ).start()
+    except BaseException:
+        _query_threads.release()
+        raise
+    try:
+        return future.result(max(deadline - time.monotonic(), 0.0))
+    except FutureTimeoutError:
+        cancelled.set()
+        raise QueryTimeoutError(
+            f"The query did not complete within {timeout} seconds."
+        )
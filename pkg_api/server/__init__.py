@@ -3,6 +3,7 @@
 Resources give access to HTTP methods related to a PKG API feature.
 """
 
+import atexit
 import importlib
 import os
 
@@ -18,8 +19,14 @@ from pkg_api.server.config import DevelopmentConfig, TestingConfig
 from pkg_api.server.facts_management import PersonalFactsResource
 from pkg_api.server.models import db
 from pkg_api.server.nl_processing import NLResource
-from pkg_api.server.pkg_exploration import PKGExplorationResource
+from pkg_api.server.pkg_cache import PKGCache
+from pkg_api.server.pkg_exploration import (
+    PKGExplorationResource,
+    PKGVisualizationJobResource,
+)
 from pkg_api.server.service_management import ServiceManagementResource
+from pkg_api.server.utils import release_pkgs
+from pkg_api.server.visualization_jobs import VisualizationJobs
 
 
 def create_app(testing: bool = False) -> Flask:
@@ -48,12 +55,31 @@ def create_app(testing: bool = False) -> Flask:
         # Create the database tables
         db.create_all()
 
+    # Keep PKGs open across requests and flush them when the process exits.
+    pkg_cache = PKGCache(
+        app.config["PKG_CACHE_SIZE"], app.config["PKG_CACHE_IDLE_TIMEOUT"]
+    )
+    app.extensions["pkg_cache"] = pkg_cache
+    app.teardown_appcontext(release_pkgs)
+    atexit.register(pkg_cache.clear)
+
+    # Render the PKG visualizations in the background.
+    visualization_jobs = VisualizationJobs(
+        app.config["VISUALIZATION_WORKERS"],
+        app.config["MAX_VISUALIZATION_JOBS"],
+    )
+    app.extensions["visualization_jobs"] = visualization_jobs
+    atexit.register(visualization_jobs.shutdown)
+
     api = Api(app)
 
     api.add_resource(AuthResource, "/auth")
     api.add_resource(ServiceManagementResource, "/service")
     api.add_resource(PersonalFactsResource, "/facts")
     api.add_resource(PKGExplorationResource, "/explore")
+    api.add_resource(
+        PKGVisualizationJobResource, "/explore/jobs/<string:job_id>"
+    )
     api.add_resource(
         NLResource,
         "/nl",
@@ -1,5 +1,6 @@
 """Define server configuration."""
 
+from pkg_api.connector import PersistenceMode, RDFStore, SnapshotFormat
 from pkg_api.nl_to_pkg.annotators.three_step_annotator import (
     _DEFAULT_CONFIG_PATH as DEFAULT_3_STEP_CONFIG_PATH,
 )
@@ -9,7 +10,14 @@ from pkg_api.nl_to_pkg.annotators.three_step_annotator import (
 from pkg_api.nl_to_pkg.entity_linking.rel_entity_linking import (
     _DEFAULT_API_URL,
 )
-from pkg_api.pkg import DEFAULT_VISUALIZATION_PATH
+from pkg_api.pkg import DEFAULT_VISUALIZATION_PATH, ConceptNodes, WriteEngine
+from pkg_api.query_limits import DEFAULT_MAX_ROWS, DEFAULT_QUERY_TIMEOUT
+from pkg_api.server.pkg_cache import DEFAULT_CACHE_SIZE, DEFAULT_IDLE_TIMEOUT
+from pkg_api.server.visualization_jobs import (
+    DEFAULT_MAX_VISUALIZATION_JOBS,
+    DEFAULT_VISUALIZATION_WORKERS,
+)
+from pkg_api.storage.file_lock import DEFAULT_LOCK_TIMEOUT
 
 
 class BaseConfig:
@@ -28,6 +36,47 @@ class BaseConfig:
         "kwargs": {"api_url": _DEFAULT_API_URL},
     }
 
+    # Cache of open PKGs, see pkg_api.server.pkg_cache.
+    PKG_CACHE_SIZE = DEFAULT_CACHE_SIZE
+    PKG_CACHE_IDLE_TIMEOUT = DEFAULT_IDLE_TIMEOUT
+
+    # Background rendering of the PKG visualizations, see
+    # pkg_api.server.visualization_jobs.
+    VISUALIZATION_WORKERS = DEFAULT_VISUALIZATION_WORKERS
+    MAX_VISUALIZATION_JOBS = DEFAULT_MAX_VISUALIZATION_JOBS
+
+    # Maximum number of rows returned by a SPARQL query sent to the
+    # exploration endpoint, and number of seconds after which it is
+    # cancelled, None disables the timeout. See pkg_api.query_limits.
+    MAX_QUERY_ROWS = DEFAULT_MAX_ROWS
+    QUERY_TIMEOUT = DEFAULT_QUERY_TIMEOUT
+
+    # Persistence of the PKGs, see pkg_api.connector.PersistenceMode. With
+    # RDFStore.SQLITE, all PKGs are stored in a single database file.
+    RDF_STORE = RDFStore.MEMORY
+    PERSISTENCE_MODE = PersistenceMode.SNAPSHOT
+    SNAPSHOT_FORMAT = SnapshotFormat.TURTLE
+    # Number of seconds after which a saved PKG is written to disk in the
+    # background, None writes it on every save. See
+    # pkg_api.connector.Connector.save_graph.
+    FLUSH_INTERVAL = None
+    # Number of seconds to wait for a PKG locked by another worker process,
+    # see pkg_api.storage.file_lock.
+    LOCK_TIMEOUT = DEFAULT_LOCK_TIMEOUT
+
+    # Memory budget in bytes of the query result cache of each open PKG, 0
+    # disables the cache. See pkg_api.query_cache.
+    QUERY_CACHE_SIZE = 0
+
+    # How statements are written to the PKGs, see pkg_api.pkg.WriteEngine.
+    WRITE_ENGINE = WriteEngine.SPARQL
+
+    # How the nodes of concepts are named, see pkg_api.pkg.ConceptNodes.
+    CONCEPT_NODES = ConceptNodes.BLANK
+
+    # Default number of statements per page returned by the NL endpoint.
+    PAGE_SIZE = 50
+
 
 class DevelopmentConfig(BaseConfig):
     """Development configuration for the server."""
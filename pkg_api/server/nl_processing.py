@@ -1,8 +1,9 @@
 """API Resource receiving NL input."""
 
+import uuid
 from typing import Any, Dict, Tuple
 
-from flask import request
+from flask import current_app, request
 from flask_restful import Resource
 
 from pkg_api.core.intents import Intent
@@ -23,7 +24,9 @@ class NLResource(Resource):
         """Processes the NL input to update the PKG.
 
         Note that the returned dictionary may contain additional fields based
-        on the frontend's needs.
+        on the frontend's needs. Retrieved statements are paged: the request
+        may give the maximum number of statements to return as "limit", and
+        the "next_cursor" of the previous page as "cursor".
 
         Raises:
             KeyError: if there is missing information to open the user's PKG.
@@ -45,23 +48,44 @@ class NLResource(Resource):
         intent, statement_data = self.nl_to_pkg.annotate(query)
         if intent == Intent.ADD:
             pkg.add_statement(statement_data)
-            pkg.close()
+            pkg.save()
             return {
                 "message": "Statement added to your PKG.",
                 "annotation": statement_data.as_dict(),
             }, 200
         elif intent == Intent.GET:
-            statements = pkg.get_statements(
-                statement_data, triple_conditioned=True
+            try:
+                limit = int(data.get("limit", current_app.config["PAGE_SIZE"]))
+                cursor = data.get("cursor", None)
+                cursor = uuid.UUID(cursor) if cursor else None
+            except (TypeError, ValueError):
+                return {"message": "Invalid limit or cursor."}, 400
+            if limit < 1:
+                return {"message": "Invalid limit or cursor."}, 400
+
+            # One more statement is retrieved to know if there is a next page.
+            statements = list(
+                pkg.iter_statements(
+                    statement_data,
+                    triple_conditioned=True,
+                    limit=limit + 1,
+                    cursor=cursor,
+                )
+            )
+            next_cursor = (
+                str(statements[limit - 1].id)
+                if len(statements) > limit
+                else None
             )
             return {
                 "message": "Statements retrieved from your PKG.",
-                "data": [s.as_dict() for s in statements],
+                "data": [s.as_dict() for s in statements[:limit]],
+                "next_cursor": next_cursor,
                 "annotation": statement_data.as_dict(),
             }, 200
         elif intent == Intent.DELETE:
             pkg.remove_statement(statement_data)
-            pkg.close()
+            pkg.save()
             return {
                 "message": "Statement was deleted if present.",
                 "annotation": statement_data.as_dict(),
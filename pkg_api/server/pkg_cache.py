@@ -0,0 +1,323 @@
+"""Process-level cache of open PKGs.
+
+Opening a PKG loads the whole graph of the user from disk, which
+dominates the latency of a request for large PKGs. The cache keeps the
+most recently used PKGs open, keyed by owner URI, so that subsequent
+requests from the same user reuse the already loaded graph. A PKG
+leaving the cache, either because the cache is full or because it has
+not been used for a while, is closed and thereby flushed to disk.
+
+PKGs are leased for the duration of a request. A leased PKG is never
+closed under the feet of its users: it is not evicted for lack of space or
+idleness, and one evicted explicitly is closed when its last lease ends.
+As the state of a PKG, e.g., its open transaction, is not thread-safe, a
+PKG is leased by one thread at a time: the requests for a leased PKG wait
+for its lease to end, while a thread may lease the same PKG again.
+PKGs are opened and closed outside the lock of the cache, such that a slow
+load or flush only delays the requests for that PKG. The requests for a
+PKG being opened wait for it, and opening a PKG waits for its previous
+instance, if any, to be closed.
+
+The PKGs that have not been used for a while are closed by a background
+thread, started on the first lease and stopped when the cache is cleared,
+such that idle PKGs are flushed even if no other request comes.
+
+Each worker process of the server has its own cache. An open PKG reloads
+the changes persisted by the other processes before it is read or changed
+(see pkg_api.connector.Connector.refresh), hence the PKG of a user may be
+cached by several workers at once.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from pkg_api.core.pkg_types import URI
+from pkg_api.pkg import PKG
+
+DEFAULT_CACHE_SIZE = 32
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+
+@dataclass
+class _CacheEntry:
+    """Entry of the cache holding a PKG, open or being opened."""
+
+    last_access: float
+    # Resolved with the PKG once opened, or with the exception raised.
+    pkg: "Future[PKG]" = field(default_factory=Future)
+    num_leases: int = 0
+    # Held by the thread leasing the PKG, see PKGCache.lease.
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    evicted: bool = False
+    closed: threading.Event = field(default_factory=threading.Event)
+
+
+class PKGCache:
+    def __init__(
+        self,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        """Initializes a bounded LRU cache of open PKGs.
+
+        Args:
+            max_size: Maximum number of PKGs kept open, unless more are
+              leased at once. Defaults to DEFAULT_CACHE_SIZE.
+            idle_timeout: Number of seconds after which an unused PKG is
+              closed. Defaults to DEFAULT_IDLE_TIMEOUT.
+
+        Raises:
+            ValueError: If the maximum size is not strictly positive.
+        """
+        if max_size < 1:
+            raise ValueError("The cache size must be strictly positive.")
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._entries: "OrderedDict[URI, _CacheEntry]" = OrderedDict()
+        # Entries evicted but not closed yet, by owner URI.
+        self._closing: Dict[URI, _CacheEntry] = {}
+        self._lock = threading.RLock()
+        # Set to stop the thread closing idle PKGs, None if not started.
+        self._reaper_stopped: Optional[threading.Event] = None
+
+    def __len__(self) -> int:
+        """Returns the number of open PKGs in the cache."""
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, owner_uri: URI) -> bool:
+        """Checks whether the PKG of a given owner is in the cache."""
+        with self._lock:
+            return owner_uri in self._entries
+
+    @contextmanager
+    def lease(
+        self, owner_uri: URI, factory: Callable[[], PKG]
+    ) -> Iterator[PKG]:
+        """Leases the open PKG of a given owner within the context.
+
+        If the PKG is not cached, it is opened with the factory and added to
+        the cache, possibly evicting the least recently used PKGs that are not
+        leased. If the PKG is leased by another thread, the lease waits for
+        the other one to end.
+
+        Args:
+            owner_uri: Owner URI.
+            factory: Function opening the PKG of the owner.
+
+        Raises:
+            Exception: If the PKG cannot be opened by the factory.
+
+        Yields:
+            Open PKG of the owner.
+        """
+        with self._lock:
+            now = time.monotonic()
+            evicted = self._evict_idle(now)
+            entry = self._entries.get(owner_uri)
+            previous_entry = None
+            is_new = entry is None
+            if entry is None:
+                entry = _CacheEntry(now)
+                self._entries[owner_uri] = entry
+                previous_entry = self._closing.get(owner_uri)
+            else:
+                entry.last_access = now
+                self._entries.move_to_end(owner_uri)
+            entry.num_leases += 1
+            evicted += self._evict_oldest()
+            self._start_reaper()
+
+        try:
+            self._close(evicted)
+            if is_new:
+                self._open(owner_uri, entry, factory, previous_entry)
+            pkg = entry.pkg.result()
+            with entry.lock:
+                yield pkg
+        finally:
+            with self._lock:
+                entry.num_leases -= 1
+                # The PKG is idle from the end of its lease.
+                if self._entries.get(owner_uri) is entry:
+                    entry.last_access = time.monotonic()
+                    self._entries.move_to_end(owner_uri)
+                closable = entry.evicted and entry.num_leases == 0
+            if closable:
+                self._close([(owner_uri, entry)])
+
+    def evict(self, owner_uri: URI) -> None:
+        """Removes the PKG of a given owner from the cache and closes it.
+
+        If the PKG is leased, it is closed when its last lease ends.
+
+        Args:
+            owner_uri: Owner URI.
+        """
+        with self._lock:
+            entry = self._entries.get(owner_uri)
+            evicted = [] if entry is None else self._remove(owner_uri, entry)
+        self._close(evicted)
+
+    def evict_idle(self) -> None:
+        """Closes the PKGs that have not been used for a while.
+
+        Leased PKGs are kept. This is done periodically by a background
+        thread, see _start_reaper.
+        """
+        with self._lock:
+            evicted = self._evict_idle(time.monotonic())
+        self._close(evicted)
+
+    def clear(self) -> None:
+        """Removes all the PKGs from the cache and closes them.
+
+        The thread closing idle PKGs is stopped, until the next lease.
+        """
+        with self._lock:
+            if self._reaper_stopped is not None:
+                self._reaper_stopped.set()
+                self._reaper_stopped = None
+            evicted = []
+            for owner_uri, entry in list(self._entries.items()):
+                evicted += self._remove(owner_uri, entry)
+        self._close(evicted)
+
+    def _start_reaper(self) -> None:
+        """Starts the thread closing idle PKGs, unless it is running.
+
+        The lock must be held by the caller. The thread checks for idle
+        PKGs every idle timeout, hence a PKG is closed within twice the
+        timeout after its last use.
+        """
+        if self._reaper_stopped is not None:
+            return
+        stopped = threading.Event()
+        self._reaper_stopped = stopped
+
+        def reap() -> None:
+            """Closes the idle PKGs periodically until stopped."""
+            while not stopped.wait(self._idle_timeout):
+                self.evict_idle()
+
+        threading.Thread(
+            target=reap, name="pkg-cache-reaper", daemon=True
+        ).start()
+
+    def _open(
+        self,
+        owner_uri: URI,
+        entry: _CacheEntry,
+        factory: Callable[[], PKG],
+        previous_entry: Optional[_CacheEntry],
+    ) -> None:
+        """Opens the PKG of an entry.
+
+        The PKG is opened once its previous instance, if any, is closed, such
+        that it is loaded after the previous instance is flushed.
+
+        Args:
+            owner_uri: Owner URI.
+            entry: Entry of the PKG.
+            factory: Function opening the PKG of the owner.
+            previous_entry: Entry of the previous instance of the PKG, if it
+              is being closed.
+
+        Raises:
+            Exception: If the PKG cannot be opened by the factory.
+        """
+        if previous_entry is not None:
+            previous_entry.closed.wait()
+        try:
+            entry.pkg.set_result(factory())
+        except Exception as e:
+            entry.pkg.set_exception(e)
+            with self._lock:
+                if self._entries.get(owner_uri) is entry:
+                    del self._entries[owner_uri]
+            raise
+
+    def _close(self, entries: List[Tuple[URI, _CacheEntry]]) -> None:
+        """Closes the PKGs of evicted entries.
+
+        The lock must not be held by the caller. A PKG failing to close is
+        logged, as it must not fail the request that evicted it.
+
+        Args:
+            entries: Owner URIs and entries of the PKGs.
+        """
+        for owner_uri, entry in entries:
+            try:
+                if entry.pkg.done() and entry.pkg.exception() is None:
+                    entry.pkg.result().close()
+            except Exception:
+                logging.exception(f"Failed to close the PKG of {owner_uri}.")
+            finally:
+                entry.closed.set()
+                with self._lock:
+                    if self._closing.get(owner_uri) is entry:
+                        del self._closing[owner_uri]
+
+    def _remove(
+        self, owner_uri: URI, entry: _CacheEntry
+    ) -> List[Tuple[URI, _CacheEntry]]:
+        """Removes an entry from the cache.
+
+        The lock must be held by the caller. The entry is closed by the
+        caller if it is not leased, otherwise when its last lease ends.
+
+        Args:
+            owner_uri: Owner URI.
+            entry: Entry of the PKG.
+
+        Returns:
+            The entry to close, if it can be closed now.
+        """
+        del self._entries[owner_uri]
+        entry.evicted = True
+        self._closing[owner_uri] = entry
+        return [(owner_uri, entry)] if entry.num_leases == 0 else []
+
+    def _evict_oldest(self) -> List[Tuple[URI, _CacheEntry]]:
+        """Removes the least recently used PKGs exceeding the cache size.
+
+        The lock must be held by the caller. Leased PKGs are not evicted.
+
+        Returns:
+            Entries to close.
+        """
+        evicted: List[Tuple[URI, _CacheEntry]] = []
+        num_entries = len(self._entries)
+        for owner_uri, entry in list(self._entries.items()):
+            if num_entries <= self._max_size:
+                break
+            if entry.num_leases == 0:
+                evicted += self._remove(owner_uri, entry)
+                num_entries -= 1
+        return evicted
+
+    def _evict_idle(self, now: float) -> List[Tuple[URI, _CacheEntry]]:
+        """Removes the PKGs that have not been accessed within the timeout.
+
+        The lock must be held by the caller. Leased PKGs are not evicted.
+
+        Args:
+            now: Current time.
+
+        Returns:
+            Entries to close.
+        """
+        evicted: List[Tuple[URI, _CacheEntry]] = []
+        for owner_uri, entry in list(self._entries.items()):
+            # Entries are ordered by access time, stop at the first fresh one.
+            if now - entry.last_access < self._idle_timeout:
+                break
+            if entry.num_leases == 0:
+                evicted += self._remove(owner_uri, entry)
+        return evicted
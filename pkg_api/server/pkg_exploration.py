@@ -1,19 +1,43 @@
 """PKG Exploration Resource."""
 
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Tuple, Union
 
-from flask import request
+from flask import Response, current_app, request, stream_with_context
 from flask_restful import Resource
+from rdflib.plugins.sparql.sparql import Query
 
-from pkg_api.server.utils import open_pkg, parse_query_request_data
+from pkg_api.pkg import PKG
+from pkg_api.query_limits import (
+    QueryTimeoutError,
+    QueryType,
+    check_query,
+    get_query_type,
+    is_update,
+    limit_query,
+)
+from pkg_api.server.sparql_results import iter_results
+from pkg_api.server.utils import (
+    open_pkg,
+    parse_query_request_data,
+    parse_query_results_request_data,
+    parse_visualization_request_data,
+)
+from pkg_api.server.visualization_jobs import JobStatus
 
 
 class PKGExplorationResource(Resource):
     def get(self) -> Tuple[Dict[str, Any], int]:
-        """Returns the PKG visualization.
+        """Starts the PKG visualization.
+
+        The image is rendered in the background, see
+        pkg_api.server.visualization_jobs, unless it is up to date. The
+        visualization may be restricted to the neighborhood of a focus node,
+        see PKG.visualize_graph.
 
         Returns:
-            A dictionary with the path to PKG visualization and the status code.
+            A dictionary with the path to PKG visualization if it is up to
+            date, otherwise with the ID of the visualization job, and the
+            status code.
         """
         data = request.json
         try:
@@ -21,20 +45,38 @@ class PKGExplorationResource(Resource):
         except Exception as e:
             return {"message": e.args[0]}, 400
 
-        graph_img_path = pkg.visualize_graph()
-        pkg.close()
+        visualization_jobs = current_app.extensions["visualization_jobs"]
+        try:
+            future = pkg.submit_visualization(
+                visualization_jobs.executor,
+                **parse_visualization_request_data(data),
+            )
+        except ValueError as e:
+            return {"message": e.args[0]}, 400
 
+        if future.done() and future.exception() is None:
+            return {
+                "message": "PKG visualized successfully.",
+                "img_path": future.result(),
+            }, 200
         return {
-            "message": "PKG visualized successfully.",
-            "img_path": graph_img_path,
-        }, 200
+            "message": "PKG visualization started.",
+            "job_id": visualization_jobs.add(future),
+        }, 202
 
-    def post(self) -> Tuple[Dict[str, Any], int]:
-        """Executes the SPARQL query.
+    def post(self) -> Union[Response, Tuple[Dict[str, Any], int]]:
+        """Executes the SPARQL SELECT query.
+
+        Queries with unbounded joins are rejected, see
+        pkg_api.query_limits.check_query, and queries running for longer than
+        QUERY_TIMEOUT seconds are cancelled. The rows are streamed either in
+        SPARQL JSON or as newline-delimited JSON, see
+        pkg_api.server.sparql_results. At most limit rows are returned, and
+        never more than MAX_QUERY_ROWS.
 
         Returns:
-            A dictionary with the result of running SPARQL query and the status
-            code.
+            A streamed response with the result of running SPARQL query, or a
+            dictionary with an error message and the status code.
         """
         data = request.json
         try:
@@ -43,20 +85,86 @@ class PKGExplorationResource(Resource):
             return {"message": e.args[0]}, 400
 
         sparql_query = parse_query_request_data(data)
+        if sparql_query is None:
+            return {"message": "Missing SPARQL query"}, 400
+        try:
+            limit, results_format = parse_query_results_request_data(
+                data, current_app.config["MAX_QUERY_ROWS"]
+            )
+            query = _prepare_select_query(pkg, sparql_query)
+            result = pkg.execute_sparql_query(
+                limit_query(query, limit),
+                timeout=current_app.config["QUERY_TIMEOUT"],
+            )
+        except ValueError as e:
+            return {"message": e.args[0]}, 400
+        except QueryTimeoutError as e:
+            return {"message": e.args[0]}, 503
 
-        if "SELECT" in sparql_query:
-            result = str(pkg.execute_sparql_query(sparql_query))
-        else:
-            return {
-                "message": (
-                    "Operation is not supported. Provide SPARQL select "
-                    "query."
-                )
-            }, 400
+        chunks = iter_results(result, results_format)
+        return Response(
+            stream_with_context(chunks), mimetype=results_format.mimetype
+        )
+
+
+def _prepare_select_query(pkg: PKG, sparql_query: str) -> Query:
+    """Prepares a SPARQL SELECT query sent to the exploration endpoint.
 
-        pkg.close()
+    Args:
+        pkg: PKG queried.
+        sparql_query: SPARQL query.
 
+    Raises:
+        ValueError: If the query is invalid, is not a SELECT query, or is
+          rejected by pkg_api.query_limits.check_query.
+
+    Returns:
+        Prepared query.
+    """
+    try:
+        query = pkg.prepare_query(sparql_query)
+    except ValueError:
+        if not is_update(sparql_query):
+            raise
+        query = None
+
+    if query is None or get_query_type(query) != QueryType.SELECT:
+        raise ValueError(
+            "Operation is not supported. Provide SPARQL select query."
+        )
+    check_query(query)
+    return query
+
+
+class PKGVisualizationJobResource(Resource):
+    def get(self, job_id: str) -> Tuple[Dict[str, Any], int]:
+        """Returns the status of a PKG visualization job.
+
+        Args:
+            job_id: ID of the job, returned when starting the visualization.
+
+        Returns:
+            A dictionary with the status of the job, with the path to PKG
+            visualization once it is done, and the status code.
+        """
+        visualization_jobs = current_app.extensions["visualization_jobs"]
+        job_status = visualization_jobs.get_status(job_id)
+        if job_status is None:
+            return {"message": "Unknown visualization job."}, 404
+
+        status, result = job_status
+        if status == JobStatus.PENDING:
+            return {
+                "message": "PKG visualization in progress.",
+                "status": status.value,
+            }, 202
+        if status == JobStatus.FAILED:
+            return {
+                "message": f"PKG visualization failed: {result}",
+                "status": status.value,
+            }, 500
         return {
-            "message": "SPARQL query executed successfully.",
-            "data": result,
+            "message": "PKG visualized successfully.",
+            "status": status.value,
+            "img_path": result,
         }, 200
@@ -0,0 +1,108 @@
+"""Streamed serialization of SPARQL SELECT results.
+
+The rows of a result are serialized one at a time as they are iterated
+over, such that the response never holds the whole result at once. Two
+formats are supported:
+
+- SPARQL 1.1 Query Results JSON, where the rows are chunks of the bindings
+  array.
+- Newline-delimited JSON, where the first line holds the head of the
+  result, i.e., {"head": {"vars": [...]}}, and every following line the
+  bindings of a row, in the same encoding as SPARQL JSON.
+
+Unbound variables are left out of the bindings of a row.
+"""
+
+import json
+from enum import Enum
+from typing import Any, Dict, Iterator, List, cast
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.query import Result, ResultRow
+from rdflib.term import Variable
+
+
+class ResultsFormat(Enum):
+    """Enum for the formats of SPARQL results."""
+
+    JSON = "json"
+    NDJSON = "ndjson"
+
+    @property
+    def mimetype(self) -> str:
+        """Returns the media type of the format."""
+        if self == ResultsFormat.JSON:
+            return "application/sparql-results+json"
+        return "application/x-ndjson"
+
+
+def get_term_json(term: Any) -> Dict[str, str]:
+    """Gets the SPARQL JSON representation of an RDF term.
+
+    Args:
+        term: URI, blank node, or literal.
+
+    Returns:
+        Dictionary with the type and the value of the term, and the language
+        or datatype of a literal, if any.
+    """
+    if isinstance(term, URIRef):
+        return {"type": "uri", "value": str(term)}
+    if isinstance(term, BNode):
+        return {"type": "bnode", "value": str(term)}
+    term_json = {"type": "literal", "value": str(term)}
+    if isinstance(term, Literal):
+        if term.language is not None:
+            term_json["xml:lang"] = term.language
+        elif term.datatype is not None:
+            term_json["datatype"] = str(term.datatype)
+    return term_json
+
+
+def get_bindings_json(
+    variables: List[Variable], row: ResultRow
+) -> Dict[str, Dict[str, str]]:
+    """Gets the SPARQL JSON bindings of a row.
+
+    Args:
+        variables: Variables of the result.
+        row: Row of the result.
+
+    Returns:
+        Dictionary with the representation of the value bound to each bound
+        variable.
+    """
+    return {
+        str(variable): get_term_json(value)
+        for variable, value in zip(variables, row)
+        if value is not None
+    }
+
+
+def iter_results(
+    result: Result, results_format: ResultsFormat
+) -> Iterator[str]:
+    """Serializes the rows of a SPARQL SELECT result one at a time.
+
+    Args:
+        result: Result of a SPARQL SELECT query.
+        results_format: Format of the serialized result.
+
+    Yields:
+        Chunks of the serialized result.
+    """
+    variables = result.vars or []
+    rows = cast(Iterator[ResultRow], iter(result))
+    head = {"vars": [str(variable) for variable in variables]}
+    if results_format == ResultsFormat.NDJSON:
+        yield json.dumps({"head": head}) + "\n"
+        for row in rows:
+            yield json.dumps(get_bindings_json(variables, row)) + "\n"
+        return
+
+    yield f'{{"head": {json.dumps(head)}, "results": {{"bindings": ['
+    separator = ""
+    for row in rows:
+        yield separator + json.dumps(get_bindings_json(variables, row))
+        separator = ", "
+    yield "]}}"
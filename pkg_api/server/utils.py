@@ -1,18 +1,30 @@
 """Utility functions for the server."""
 
 import logging
-from typing import Any, Dict
+from contextlib import ExitStack
+from typing import Any, Dict, Optional, Tuple
 
-from flask import current_app
+from flask import current_app, g
 
-from pkg_api.connector import RDFStore
 from pkg_api.core.pkg_types import URI
 from pkg_api.pkg import PKG
+from pkg_api.server.pkg_cache import PKGCache
+from pkg_api.server.sparql_results import ResultsFormat
+from pkg_api.visualization import (
+    DEFAULT_MAX_VISUALIZED_NODES,
+    DEFAULT_VISUALIZATION_DEPTH,
+    ImageFormat,
+)
 
 
 def open_pkg(data: Dict[str, str]) -> PKG:
     """Opens a connection to the PKG.
 
+    The PKG is retrieved from the process-level cache of open PKGs if it has
+    been used recently, otherwise it is loaded from the store and cached. The
+    returned PKG must therefore not be closed by the caller. It is leased
+    from the cache until the end of the request, see release_pkgs.
+
     Args:
         data: Request data.
 
@@ -29,14 +41,41 @@ def open_pkg(data: Dict[str, str]) -> PKG:
     store_path = current_app.config["STORE_PATH"]
     visualization_path = current_app.config["VISUALIZATION_PATH"]
 
-    return PKG(
-        URI(owner_uri),
-        RDFStore.MEMORY,
-        f"{store_path}/{owner_username}",
-        visualization_path=visualization_path,
+    pkg_cache: PKGCache = current_app.extensions["pkg_cache"]
+
+    if "pkg_leases" not in g:
+        g.pkg_leases = ExitStack()
+    return g.pkg_leases.enter_context(
+        pkg_cache.lease(
+            URI(owner_uri),
+            lambda: PKG(
+                URI(owner_uri),
+                current_app.config["RDF_STORE"],
+                f"{store_path}/{owner_username}",
+                visualization_path=visualization_path,
+                persistence_mode=current_app.config["PERSISTENCE_MODE"],
+                snapshot_format=current_app.config["SNAPSHOT_FORMAT"],
+                query_cache_size=current_app.config["QUERY_CACHE_SIZE"],
+                write_engine=current_app.config["WRITE_ENGINE"],
+                concept_nodes=current_app.config["CONCEPT_NODES"],
+                flush_interval=current_app.config["FLUSH_INTERVAL"],
+                lock_timeout=current_app.config["LOCK_TIMEOUT"],
+            ),
+        )
     )
 
 
+def release_pkgs(exception: Optional[BaseException] = None) -> None:
+    """Releases the PKGs leased from the cache during a request.
+
+    Args:
+        exception: Exception raised while handling the request, if any.
+    """
+    pkg_leases = g.pop("pkg_leases", None)
+    if pkg_leases is not None:
+        pkg_leases.close()
+
+
 def parse_query_request_data(data: Dict[str, Any]) -> str:
     """Parses the request data to execute SPARQL query.
 
@@ -47,3 +86,55 @@ def parse_query_request_data(data: Dict[str, Any]) -> str:
         A string containing SPARQL query.
     """
     return data.get("sparql_query", None)
+
+
+def parse_query_results_request_data(
+    data: Dict[str, Any], max_rows: int
+) -> Tuple[int, ResultsFormat]:
+    """Parses the request data to return the results of a SPARQL query.
+
+    Args:
+        data: Request data.
+        max_rows: Maximum number of rows returned by the server.
+
+    Raises:
+        ValueError: If the limit or the format is invalid.
+
+    Returns:
+        The maximum number of rows returned, i.e., the requested limit capped
+        by the server, and the format of the results.
+    """
+    try:
+        limit = int(data.get("limit", max_rows))
+        results_format = ResultsFormat(data.get("format", "json"))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid limit or format.")
+    if limit < 1:
+        raise ValueError("Invalid limit or format.")
+    return min(limit, max_rows), results_format
+
+
+def parse_visualization_request_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parses the request data to visualize the PKG.
+
+    Args:
+        data: Request data.
+
+    Raises:
+        ValueError: If the depth, the maximum number of nodes, or the format
+          is invalid.
+
+    Returns:
+        Keyword arguments of PKG.visualize_graph.
+    """
+    try:
+        return {
+            "focus": data.get("focus", None),
+            "depth": int(data.get("depth", DEFAULT_VISUALIZATION_DEPTH)),
+            "max_nodes": int(
+                data.get("max_nodes", DEFAULT_MAX_VISUALIZED_NODES)
+            ),
+            "image_format": ImageFormat(data.get("format", "png")),
+        }
+    except (TypeError, ValueError):
+        raise ValueError("Invalid depth, maximum number of nodes, or format.")
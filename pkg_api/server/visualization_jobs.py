@@ -0,0 +1,139 @@
+"""Background rendering of PKG visualizations.
+
+Rendering an image with Graphviz takes long for large graphs, it is hence
+moved out of the requests onto a bounded pool of worker processes. A
+request visualizing a PKG gets a job ID right away, which is then used to
+poll the status of the job until the image is ready.
+
+Identical visualizations requested while one is being rendered share its
+job, see pkg_api.pkg.PKG.submit_visualization. Finished jobs are forgotten
+once more than a given number of jobs have been started since.
+
+The worker processes are spawned rather than forked, as forking a
+multi-threaded server is unsafe, and are only started on the first render.
+"""
+
+import multiprocessing
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+DEFAULT_VISUALIZATION_WORKERS = 2
+DEFAULT_MAX_VISUALIZATION_JOBS = 1000
+
+
+class JobStatus(Enum):
+    """Enum for the statuses of visualization jobs."""
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class VisualizationJobs:
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_VISUALIZATION_WORKERS,
+        max_jobs: int = DEFAULT_MAX_VISUALIZATION_JOBS,
+    ) -> None:
+        """Initializes a registry of visualization jobs and its process pool.
+
+        Args:
+            max_workers: Number of processes rendering images. Defaults to
+              DEFAULT_VISUALIZATION_WORKERS.
+            max_jobs: Number of jobs after which the oldest finished jobs are
+              forgotten. Defaults to DEFAULT_MAX_VISUALIZATION_JOBS.
+
+        Raises:
+            ValueError: If the number of processes or jobs is not strictly
+              positive.
+        """
+        if max_workers < 1 or max_jobs < 1:
+            raise ValueError(
+                "The numbers of processes and jobs must be strictly positive."
+            )
+        self._max_workers = max_workers
+        self._max_jobs = max_jobs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Future[str]]" = OrderedDict()
+        # IDs of the jobs by future, such that shared futures share a job.
+        self._job_ids: Dict["Future[str]", str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Returns the process pool rendering images, started on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def add(self, future: "Future[str]") -> str:
+        """Adds the job of a render, unless the render already has one.
+
+        Args:
+            future: Future resolved with the path to the image.
+
+        Returns:
+            Job ID.
+        """
+        with self._lock:
+            job_id = self._job_ids.get(future)
+            if job_id is None:
+                job_id = uuid.uuid4().hex
+                self._jobs[job_id] = future
+                self._job_ids[future] = job_id
+                self._forget_finished_jobs()
+            return job_id
+
+    def get_status(
+        self, job_id: str
+    ) -> Optional[Tuple[JobStatus, Optional[str]]]:
+        """Gets the status of a job.
+
+        Args:
+            job_id: Job ID.
+
+        Returns:
+            The status of the job and the path to the image if it is done, or
+            the error message if it failed, or None if the job is unknown.
+        """
+        with self._lock:
+            future = self._jobs.get(job_id)
+        if future is None:
+            return None
+        if not future.done():
+            return JobStatus.PENDING, None
+        if future.cancelled():
+            return JobStatus.FAILED, "The visualization was cancelled."
+        exception = future.exception()
+        if exception is not None:
+            return JobStatus.FAILED, str(exception) or repr(exception)
+        return JobStatus.DONE, future.result()
+
+    def shutdown(self) -> None:
+        """Stops the process pool, cancelling the jobs not started yet."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _forget_finished_jobs(self) -> None:
+        """Forgets the oldest finished jobs exceeding the number of jobs.
+
+        The lock must be held by the caller. Pending jobs are kept.
+        """
+        num_jobs = len(self._jobs)
+        for job_id, future in list(self._jobs.items()):
+            if num_jobs <= self._max_jobs:
+                break
+            if future.done():
+                del self._jobs[job_id]
+                del self._job_ids[future]
+                num_jobs -= 1
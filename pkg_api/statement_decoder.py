@@ -0,0 +1,199 @@
+"""Decodes the statements of a graph into PKG data.
+
+This is the counterpart of pkg_api.triple_builder: the triples of each
+statement node, and of each concept it refers to, are read with one
+lookup of the node in the graph and decoded with tables mapping the
+properties of the PKG vocabulary to the fields of PKGData and Concept.
+The tables are compiled once per graph, such that decoding a triple is a
+dictionary lookup. Reading the triples of the whole graph at once is
+slower, as the graph also holds the triples of preferences and of other
+nodes.
+"""
+
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from rdflib import RDF, BNode, Graph, Literal, URIRef
+
+import pkg_api.utils as utils
+from pkg_api.core.namespaces import PKGPrefixes
+from pkg_api.core.pkg_types import URI, Concept, PKGData, Triple, TripleElement
+from pkg_api.mapping_vocab import MappingVocab
+
+# Properties describing the structure of the graph rather than PKG data.
+_STRUCTURAL_PROPERTIES = frozenset([RDF.type])
+# Namespace of the content-addressed concepts, see utils.get_concept_node_id.
+_CONCEPT_NAMESPACE = PKGPrefixes.EX.value + utils.CONCEPT_NODE_PREFIX
+
+
+def _expand_property(graph: Graph, property: str) -> URIRef:
+    """Expands a prefixed property with the namespaces bound to a graph.
+
+    Prefixes that are not bound to the graph are expanded with the PKG
+    vocabulary.
+
+    Args:
+        graph: Graph.
+        property: Prefixed property, e.g., dc:description.
+
+    Returns:
+        URI of the property.
+    """
+    try:
+        return graph.namespace_manager.expand_curie(property)
+    except ValueError:
+        prefix, name = property.split(":", 1)
+        return URIRef(PKGPrefixes[prefix.upper()].value + name)
+
+
+class StatementDecoder:
+    def __init__(self, graph: Graph) -> None:
+        """Initializes the decoder of the statements of a graph.
+
+        The prefixed properties of MappingVocab are expanded with the
+        namespaces bound to the graph, as done by the SPARQL updates writing
+        the statements.
+
+        Args:
+            graph: Graph holding the statements.
+        """
+        self._graph = graph
+        self._statement_fields: Dict[Any, Tuple[str, Optional[str]]] = {
+            _expand_property(graph, property): (field, field_property)
+            for field, mapping in MappingVocab.PKGDATA_MAPPING.items()
+            for property, field_property in mapping.items()
+        }
+        self._concept_fields: Dict[Any, str] = {
+            _expand_property(graph, property): field
+            for property, field in MappingVocab.CONCEPT_MAPPING.items()
+        }
+
+    def decode_statements(
+        self, statement_nodes: Iterable[Any]
+    ) -> List[Optional[PKGData]]:
+        """Decodes statements.
+
+        Args:
+            statement_nodes: Nodes of the statements.
+
+        Returns:
+            PKG data associated to the statements, None for the statements
+            without a description.
+        """
+        return [self.decode_statement(node) for node in statement_nodes]
+
+    def decode_statement(self, statement_node: Any) -> Optional[PKGData]:
+        """Decodes a statement.
+
+        Args:
+            statement_node: Node of the statement.
+
+        Returns:
+            PKG data associated to the statement, or None if the statement
+            has no description.
+        """
+        description = None
+        triple_values: Dict[str, Any] = {}
+        logging_data: Dict[str, Any] = {}
+        for p, o in self._graph.predicate_objects(statement_node):
+            field, field_property = self._statement_fields.get(p, (None, None))
+            if field == "statement":
+                description = str(o)
+            elif field == "triple" and field_property is not None:
+                triple_values[field_property] = self._decode_value(o)
+            elif field == "logging_data" and field_property is not None:
+                logging_data[field_property] = self._decode_value(o)
+            elif field is None and p not in _STRUCTURAL_PROPERTIES:
+                logging.warning(
+                    f"Statement parsing - Property {p} not supported."
+                )
+
+        if not description:
+            logging.warning("Statement parsing failed, not statement returned.")
+            return None
+
+        triple = None
+        if triple_values:
+            triple = Triple()
+            for field_property, value in triple_values.items():
+                if value is not None:
+                    setattr(
+                        triple, field_property, TripleElement.from_value(value)
+                    )
+
+        return PKGData(
+            id=self._decode_statement_id(statement_node),
+            statement=description,
+            triple=triple,
+            preference=None,
+            logging_data=logging_data,
+        )
+
+    @staticmethod
+    def _decode_statement_id(statement_node: Any) -> uuid.UUID:
+        """Decodes the UUID of a statement from its node.
+
+        Args:
+            statement_node: Node of the statement.
+
+        Returns:
+            UUID of the statement, or a new UUID if the node is not named
+            after one.
+        """
+        if isinstance(statement_node, URIRef) and statement_node.startswith(
+            PKGPrefixes.EX.value
+        ):
+            return uuid.UUID(statement_node[len(PKGPrefixes.EX.value) :])
+        return uuid.uuid1()
+
+    def _decode_value(self, value: Any) -> Optional[Union[URI, Concept, str]]:
+        """Decodes the value of a property.
+
+        Args:
+            value: RDF term.
+
+        Returns:
+            Value of the term as URI, Concept, or str.
+        """
+        if isinstance(value, URIRef):
+            if value.startswith(_CONCEPT_NAMESPACE):
+                return self._decode_concept(value)
+            return URI(str(value))
+        elif isinstance(value, Literal):
+            return str(value)
+        elif isinstance(value, BNode):
+            return self._decode_concept(value)
+
+        logging.warning(f"Object {value} of type {type(value)} not supported.")
+        return None
+
+    def _decode_concept(
+        self, concept_node: Union[BNode, URIRef]
+    ) -> Optional[Concept]:
+        """Decodes a concept.
+
+        Args:
+            concept_node: Node of the concept.
+
+        Returns:
+            Concept, or None if the concept has no description.
+        """
+        concept_dict: Dict[str, Any] = {}
+        for p, o in self._graph.predicate_objects(concept_node):
+            field = self._concept_fields.get(p)
+            if field == "description":
+                concept_dict[field] = str(o)
+            elif field is not None:
+                # Other fields of Concept are lists of URIs
+                concept_dict.setdefault(field, []).append(URI(str(o)))
+            elif p not in _STRUCTURAL_PROPERTIES:
+                logging.warning(
+                    f"Concept parsing - Property {p} not supported."
+                )
+
+        if not concept_dict.get("description"):
+            logging.warning("Concept parsing failed, not description found.")
+            return None
+
+        return Concept(**concept_dict)
@@ -0,0 +1,66 @@
+"""Crash-safe replacement of files.
+
+A file is never written in place. Its new content is written to a
+temporary file in the same directory, flushed to disk with fsync, and
+renamed over the file, which is atomic on POSIX and Windows. Readers,
+and the file left after a crash, see either the previous or the new
+content in full, never a truncated file.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "wb") -> Iterator[IO]:
+    """Opens a temporary file that replaces a file on exit.
+
+    If an exception is raised within the context, the temporary file is
+    removed and the file is left untouched.
+
+    Args:
+        path: Path to the file to replace.
+        mode: Mode in which the temporary file is opened, either "wb" or
+          "w". Defaults to "wb".
+
+    Raises:
+        FileNotFoundError: If the directory of the file does not exist.
+
+    Yields:
+        Temporary file to write the new content of the file to.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode) as tmp_file:
+            yield tmp_file
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory: str) -> None:
+    """Flushes the entries of a directory to disk, e.g., after a rename.
+
+    Directories cannot be opened on Windows, where renames are durable once
+    they return.
+
+    Args:
+        directory: Path to the directory.
+    """
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,145 @@
+"""Compact binary snapshot of a graph.
+
+Parsing Turtle is the main cost of opening a PKG. The binary snapshot avoids
+parsing altogether by storing a dictionary of the distinct terms of the graph
+and the triples as arrays of term identifiers.
+
+Layout of the file, all integers are little-endian:
+  - Header: magic number (8 bytes), number of terms, number of triples, and
+    size of the term blob in bytes (unsigned 64-bit integers).
+  - Term offsets: number of terms + 1 unsigned 64-bit integers, the i-th term
+    is stored in the blob between the i-th and (i+1)-th offsets.
+  - Triples: 3 x number of triples unsigned 32-bit integers, i.e., the
+    subject, predicate, and object identifiers of each triple.
+  - Term blob: encoded terms (see pkg_api.storage.terms).
+
+The sections are aligned such that the file can be memory-mapped and the
+arrays read without copy, e.g., with numpy.frombuffer. Blank node labels are
+preserved, which makes the snapshot usable with the write-ahead log.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List
+
+from rdflib import Graph
+
+from pkg_api.storage.atomic_file import atomic_write
+from pkg_api.storage.terms import decode_term, encode_term
+
+BINARY_SNAPSHOT_EXTENSION = "pkgb"
+
+_MAGIC = b"PKGB\x00\x00\x00\x01"
+_HEADER = struct.Struct("<8sQQQ")
+
+
+def _to_little_endian(values: array) -> bytes:
+    """Returns the bytes of an array of integers in little-endian order."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_binary_snapshot(graph: Graph, path: str) -> None:
+    """Writes a binary snapshot of a graph.
+
+    The snapshot replaces a previous one atomically, see
+    pkg_api.storage.atomic_file.
+
+    Args:
+        graph: Graph to snapshot.
+        path: Path to the snapshot file.
+    """
+    term_ids: Dict[Any, int] = {}
+    encoded_terms: List[bytes] = []
+    triples = array("I")
+    for triple in graph:
+        for term in triple:
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = term_ids[term] = len(encoded_terms)
+                encoded_terms.append(encode_term(term))
+            triples.append(term_id)
+
+    offsets = array("Q", [0])
+    for encoded_term in encoded_terms:
+        offsets.append(offsets[-1] + len(encoded_term))
+    blob = b"".join(encoded_terms)
+
+    with atomic_write(path) as snapshot_file:
+        snapshot_file.write(
+            _HEADER.pack(
+                _MAGIC, len(encoded_terms), len(triples) // 3, len(blob)
+            )
+        )
+        snapshot_file.write(_to_little_endian(offsets))
+        snapshot_file.write(_to_little_endian(triples))
+        snapshot_file.write(blob)
+
+
+def load_binary_snapshot(graph: Graph, path: str) -> None:
+    """Loads a binary snapshot into a graph.
+
+    Args:
+        graph: Graph to load the triples into.
+        path: Path to the snapshot file.
+
+    Raises:
+        ValueError: If the file is not a binary snapshot.
+    """
+    with open(path, "rb") as snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size < _HEADER.size:
+            raise ValueError(f"{path} is not a binary snapshot.")
+        with mmap.mmap(
+            snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            magic, num_terms, num_triples, _ = _HEADER.unpack_from(buffer)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a binary snapshot.")
+            _load_terms_and_triples(graph, buffer, num_terms, num_triples)
+
+
+def _load_terms_and_triples(
+    graph: Graph, buffer: mmap.mmap, num_terms: int, num_triples: int
+) -> None:
+    """Decodes the terms and adds the triples of a snapshot to a graph.
+
+    Args:
+        graph: Graph to load the triples into.
+        buffer: Memory-mapped snapshot.
+        num_terms: Number of terms in the snapshot.
+        num_triples: Number of triples in the snapshot.
+    """
+    offsets_start = _HEADER.size
+    triples_start = offsets_start + 8 * (num_terms + 1)
+    blob_start = triples_start + 4 * 3 * num_triples
+
+    # Views on the memory map must be released before the map is closed.
+    with memoryview(buffer) as view:
+        blob = bytes(view[blob_start:])
+        with view[offsets_start:triples_start].cast("Q") as offsets:
+            if sys.byteorder != "little":
+                offsets = _byteswapped(offsets)
+            terms = [
+                decode_term(blob[offsets[i] : offsets[i + 1]])
+                for i in range(num_terms)
+            ]
+        with view[triples_start:blob_start].cast("I") as triples:
+            ids = (
+                triples if sys.byteorder == "little" else _byteswapped(triples)
+            )
+            graph.addN(
+                (terms[ids[i]], terms[ids[i + 1]], terms[ids[i + 2]], graph)
+                for i in range(0, 3 * num_triples, 3)
+            )
+
+
+def _byteswapped(values: memoryview) -> memoryview:
+    """Returns a copy of little-endian integers in native byte order."""
+    native = array(values.format, values)
+    native.byteswap()
+    return memoryview(native)
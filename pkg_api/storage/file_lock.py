@@ -0,0 +1,153 @@
+"""Reader/writer lock shared by the processes opening the same PKG.
+
+The lock is an advisory fcntl lock on a sidecar lock file next to the
+files of the PKG. Any number of processes may hold the shared lock, e.g.,
+to load the PKG, while the exclusive lock is held by a single process,
+e.g., to write the PKG. The lock is only held for the duration of a single
+read or write of the files, never across calls, and acquiring it is
+retried until a timeout, such that a stuck process does not hang the
+others forever.
+
+Each FileLock opens its own file descriptor, hence two FileLocks on the
+same file exclude each other even within a process.
+
+fcntl is only available on POSIX systems, elsewhere the lock is a no-op.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+LOCK_FILE_EXTENSION = "lock"
+DEFAULT_LOCK_TIMEOUT = 10.0
+
+# Bounds of the delay between two attempts to acquire the lock, in seconds.
+_MIN_RETRY_DELAY = 0.001
+_MAX_RETRY_DELAY = 0.05
+
+
+class LockTimeoutError(TimeoutError):
+    """Raised when a lock cannot be acquired within the timeout."""
+
+
+class FileLock:
+    def __init__(
+        self, path: str, timeout: float = DEFAULT_LOCK_TIMEOUT
+    ) -> None:
+        """Initializes a reader/writer lock on a lock file.
+
+        The lock file is created when the lock is first acquired.
+
+        Args:
+            path: Path to the lock file.
+            timeout: Number of seconds to wait for the lock before giving up.
+              Defaults to DEFAULT_LOCK_TIMEOUT.
+        """
+        self.path = path
+        self._timeout = timeout
+        self._fd: Optional[int] = None
+        # Mode of the lock currently held, if any. The threads of a process
+        # share the file descriptor, they are serialized by the mutex.
+        self._operation: Optional[int] = None
+        self._mutex = threading.RLock()
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Holds the shared lock within the context.
+
+        The exclusive lock, if already held, is kept.
+
+        Raises:
+            LockTimeoutError: If the exclusive lock is held by another
+              process past the timeout.
+
+        Yields:
+            None.
+        """
+        with self._mutex:
+            if fcntl is None or self._operation is not None:
+                yield
+                return
+            self._acquire(fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                self._release()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Holds the exclusive lock within the context.
+
+        Raises:
+            LockTimeoutError: If the lock is held by another process past the
+              timeout.
+
+        Yields:
+            None.
+        """
+        with self._mutex:
+            if fcntl is None or self._operation == fcntl.LOCK_EX:
+                yield
+                return
+            previous_operation = self._operation
+            self._acquire(fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if previous_operation is None:
+                    self._release()
+                else:
+                    self._acquire(previous_operation)
+
+    def close(self) -> None:
+        """Closes the lock file, releasing the lock if held."""
+        with self._mutex:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+                self._operation = None
+
+    def _acquire(self, operation: int) -> None:
+        """Acquires the lock in a given mode, retrying until the timeout.
+
+        Args:
+            operation: Mode of the lock, either fcntl.LOCK_SH or
+              fcntl.LOCK_EX.
+
+        Raises:
+            LockTimeoutError: If the lock cannot be acquired within the
+              timeout.
+        """
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fd = self._fd
+
+        deadline = time.monotonic() + self._timeout
+        delay = _MIN_RETRY_DELAY
+        while True:
+            try:
+                fcntl.flock(fd, operation | fcntl.LOCK_NB)
+                self._operation = operation
+                return
+            except BlockingIOError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LockTimeoutError(
+                        f"Could not lock {self.path} within {self._timeout} "
+                        "seconds."
+                    )
+                time.sleep(min(delay, remaining))
+                delay = min(2 * delay, _MAX_RETRY_DELAY)
+
+    def _release(self) -> None:
+        """Releases the lock."""
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._operation = None
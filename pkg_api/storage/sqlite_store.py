@@ -0,0 +1,398 @@
+"""RDFLib store persisting graphs in a SQLite database.
+
+The store keeps many graphs, e.g., the PKGs of all the users, in a single
+database file, each graph being a named graph (context) of the store. Terms
+are stored once in a term dictionary and quads refer to them by identifier.
+The quads are indexed in the SPO, POS, and OSP orders, prefixed by the
+context, such that any triple pattern within a graph is answered by an index
+seek instead of a scan. The indexes are covering, i.e., the quads are read
+from the indexes only.
+
+Terms are never removed from the dictionary, which keeps their identifiers
+valid across transactions and connections.
+"""
+
+import os
+import sqlite3
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple
+
+from rdflib import Graph, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.store import NO_STORE, VALID_STORE, Store
+
+from pkg_api.storage.terms import decode_term, encode_term
+
+# Maximum number of terms kept in the in-memory term caches.
+TERM_CACHE_SIZE = 100000
+# Number of seconds to wait for a lock held by another connection.
+LOCK_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term BLOB NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS quads (
+    c INTEGER NOT NULL,
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    PRIMARY KEY (c, s, p, o)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS quads_pos ON quads (c, p, o, s);
+CREATE INDEX IF NOT EXISTS quads_osp ON quads (c, o, s, p);
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL UNIQUE
+);
+"""
+
+
+class SQLiteStore(Store):
+    context_aware = True
+    formula_aware = False
+    graph_aware = False
+    transaction_aware = True
+
+    def __init__(
+        self, configuration: Optional[str] = None, identifier: Any = None
+    ) -> None:
+        """Initializes the store.
+
+        Args:
+            configuration: Path to the database file. If given, the store is
+              opened. Defaults to None.
+            identifier: Identifier of the store. Defaults to None.
+        """
+        self._connection: Optional[sqlite3.Connection] = None
+        self._term_ids: Dict[Any, int] = {}
+        self._terms: Dict[int, Any] = {}
+        super().__init__(configuration, identifier)
+
+    def open(self, configuration: str, create: bool = False) -> int:
+        """Opens the database, creating the tables if needed.
+
+        Args:
+            configuration: Path to the database file.
+            create: Whether to create the database if it does not exist.
+              Defaults to False.
+
+        Returns:
+            VALID_STORE if the database is opened, NO_STORE otherwise.
+        """
+        if not create and not os.path.exists(configuration):
+            return NO_STORE
+        # PKGs may be shared between the threads of a server.
+        self._connection = sqlite3.connect(
+            configuration, timeout=LOCK_TIMEOUT, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction: bool = False) -> None:
+        """Closes the database.
+
+        Args:
+            commit_pending_transaction: Whether to commit pending changes,
+              otherwise they are rolled back. Defaults to False.
+        """
+        if self._connection is None:
+            return
+        if commit_pending_transaction:
+            self.commit()
+        else:
+            self.rollback()
+        self._connection.close()
+        self._connection = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Connection to the open database.
+
+        Raises:
+            RuntimeError: If the store is not open.
+        """
+        if self._connection is None:
+            raise RuntimeError("The SQLite store is not open.")
+        return self._connection
+
+    def destroy(self, configuration: str) -> None:
+        """Deletes the database file.
+
+        Args:
+            configuration: Path to the database file.
+        """
+        if os.path.exists(configuration):
+            os.remove(configuration)
+
+    def commit(self) -> None:
+        """Commits pending changes."""
+        self._conn.commit()
+
+    def rollback(self) -> None:
+        """Rolls back pending changes."""
+        self._conn.rollback()
+        # Terms inserted by the transaction do not exist anymore.
+        self._term_ids.clear()
+        self._terms.clear()
+
+    def _term_id(self, term: Any, create: bool = False) -> Optional[int]:
+        """Returns the identifier of a term in the dictionary.
+
+        Args:
+            term: RDF term.
+            create: Whether to add the term to the dictionary if it is
+              missing. Defaults to False.
+
+        Returns:
+            Identifier of the term, or None if it is not in the dictionary.
+        """
+        term_id = self._term_ids.get(term)
+        if term_id is not None:
+            return term_id
+        encoded_term = encode_term(term)
+        row = self._conn.execute(
+            "SELECT id FROM terms WHERE term = ?", (encoded_term,)
+        ).fetchone()
+        if row is not None:
+            term_id = row[0]
+        elif create:
+            term_id = self._conn.execute(
+                "INSERT INTO terms (term) VALUES (?)", (encoded_term,)
+            ).lastrowid
+            assert term_id is not None
+        else:
+            return None
+        if len(self._term_ids) >= TERM_CACHE_SIZE:
+            self._term_ids.clear()
+        self._term_ids[term] = term_id
+        return term_id
+
+    def _term(self, term_id: int) -> Any:
+        """Returns the term with a given identifier in the dictionary.
+
+        Args:
+            term_id: Identifier of the term.
+
+        Returns:
+            RDF term.
+        """
+        term = self._terms.get(term_id)
+        if term is None:
+            (encoded_term,) = self._conn.execute(
+                "SELECT term FROM terms WHERE id = ?", (term_id,)
+            ).fetchone()
+            term = decode_term(encoded_term)
+            if len(self._terms) >= TERM_CACHE_SIZE:
+                self._terms.clear()
+            self._terms[term_id] = term
+        return term
+
+    @staticmethod
+    def _context_identifier(context: Any) -> Any:
+        """Returns the identifier of a context given as a graph or a term."""
+        if isinstance(context, Graph):
+            return context.identifier
+        return context
+
+    def _quad_ids(
+        self, triple: Tuple[Any, Any, Any], context: Any
+    ) -> Tuple[Optional[int], ...]:
+        """Returns the identifiers of the terms of a quad, adding new ones."""
+        context_identifier = (
+            self._context_identifier(context) or DATASET_DEFAULT_GRAPH_ID
+        )
+        s, p, o = triple
+        return (
+            self._term_id(context_identifier, create=True),
+            self._term_id(s, create=True),
+            self._term_id(p, create=True),
+            self._term_id(o, create=True),
+        )
+
+    def add(
+        self, triple: Tuple[Any, Any, Any], context: Any, quoted: bool = False
+    ) -> None:
+        """Adds a triple to a context.
+
+        Args:
+            triple: Triple to add.
+            context: Graph to add the triple to.
+            quoted: Whether the triple is quoted. Not supported.
+        """
+        super().add(triple, context, quoted)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO quads (c, s, p, o) VALUES (?, ?, ?, ?)",
+            self._quad_ids(triple, context),
+        )
+
+    def addN(self, quads: Any) -> None:  # noqa: N802
+        """Adds quads in bulk.
+
+        Args:
+            quads: Iterable of quads, i.e., triples with their graph.
+        """
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO quads (c, s, p, o) VALUES (?, ?, ?, ?)",
+            (self._quad_ids((s, p, o), c) for s, p, o, c in quads),
+        )
+
+    def _where(
+        self, triple_pattern: Tuple[Any, Any, Any], context: Any
+    ) -> Optional[Tuple[str, List[int]]]:
+        """Builds the condition matching a triple pattern in a context.
+
+        Args:
+            triple_pattern: Triple pattern, unbound terms are None.
+            context: Graph to match the pattern in, or None for all graphs.
+
+        Returns:
+            SQL condition and its parameters, or None if a bound term is not
+            in the dictionary, in which case nothing matches.
+        """
+        columns = list(zip(("s", "p", "o"), triple_pattern))
+        if context is not None:
+            columns.insert(0, ("c", self._context_identifier(context)))
+        conditions, parameters = [], []
+        for column, term in columns:
+            if term is None:
+                continue
+            term_id = self._term_id(term)
+            if term_id is None:
+                return None
+            conditions.append(f"{column} = ?")
+            parameters.append(term_id)
+        return " AND ".join(conditions) or "1", parameters
+
+    def remove(
+        self, triple_pattern: Tuple[Any, Any, Any], context: Any = None
+    ) -> None:
+        """Removes the triples matching a pattern.
+
+        Args:
+            triple_pattern: Triple pattern, unbound terms are None.
+            context: Graph to remove the triples from, or None for all graphs.
+              Defaults to None.
+        """
+        super().remove(triple_pattern, context)
+        where = self._where(triple_pattern, context)
+        if where is not None:
+            self._conn.execute(f"DELETE FROM quads WHERE {where[0]}", where[1])
+
+    def triples(
+        self, triple_pattern: Tuple[Any, Any, Any], context: Any = None
+    ) -> Iterator[Tuple[Tuple[Any, Any, Any], Iterator[Any]]]:
+        """Yields the triples matching a pattern.
+
+        Args:
+            triple_pattern: Triple pattern, unbound terms are None.
+            context: Graph to match the pattern in, or None for all graphs.
+              Defaults to None.
+
+        Yields:
+            Matching triples with an iterator over their graphs.
+        """
+        where = self._where(triple_pattern, context)
+        if where is None:
+            return
+        # Rows are fetched upfront as the graph may be modified while the
+        # triples are iterated over, e.g., by a SPARQL update.
+        rows = self._conn.execute(
+            f"SELECT DISTINCT s, p, o FROM quads WHERE {where[0]}", where[1]
+        ).fetchall()
+        for s, p, o in rows:
+            triple = (self._term(s), self._term(p), self._term(o))
+            contexts = (
+                iter((context,))
+                if context is not None
+                else self.contexts(triple)
+            )
+            yield triple, contexts
+
+    def __len__(self, context: Any = None) -> int:
+        """Returns the number of triples in a context or in the store.
+
+        Args:
+            context: Graph to count the triples of, or None for all graphs.
+              Defaults to None.
+        """
+        if context is None:
+            query = "SELECT COUNT(*) FROM (SELECT DISTINCT s, p, o FROM quads)"
+            return self._conn.execute(query).fetchone()[0]
+        context_id = self._term_id(self._context_identifier(context))
+        if context_id is None:
+            return 0
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM quads WHERE c = ?", (context_id,)
+        ).fetchone()[0]
+
+    def contexts(
+        self, triple: Optional[Tuple[Any, Any, Any]] = None
+    ) -> Generator[Graph, None, None]:
+        """Yields the graphs of the store, or the graphs containing a triple.
+
+        Args:
+            triple: Triple contained by the graphs. Defaults to None.
+
+        Yields:
+            Graphs.
+        """
+        where = self._where(triple or (None, None, None), None)
+        if where is None:
+            return
+        rows = self._conn.execute(
+            f"SELECT DISTINCT c FROM quads WHERE {where[0]}", where[1]
+        ).fetchall()
+        for (context_id,) in rows:
+            yield Graph(store=self, identifier=self._term(context_id))
+
+    def bind(
+        self, prefix: str, namespace: URIRef, override: bool = True
+    ) -> None:
+        """Binds a prefix to a namespace.
+
+        Args:
+            prefix: Prefix.
+            namespace: Namespace.
+            override: Whether to replace existing bindings of the prefix or
+              the namespace. Defaults to True.
+        """
+        bound_namespace = self.namespace(prefix)
+        if bound_namespace == namespace or (
+            not override
+            and (bound_namespace is not None or self.prefix(namespace))
+        ):
+            return
+        self._conn.execute(
+            "DELETE FROM namespaces WHERE prefix = ? OR namespace = ?",
+            (prefix, str(namespace)),
+        )
+        self._conn.execute(
+            "INSERT INTO namespaces (prefix, namespace) VALUES (?, ?)",
+            (prefix, str(namespace)),
+        )
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        """Returns the namespace bound to a prefix, if any."""
+        row = self._conn.execute(
+            "SELECT namespace FROM namespaces WHERE prefix = ?", (prefix,)
+        ).fetchone()
+        return URIRef(row[0]) if row else None
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:
+        """Returns the prefix bound to a namespace, if any."""
+        row = self._conn.execute(
+            "SELECT prefix FROM namespaces WHERE namespace = ?",
+            (str(namespace),),
+        ).fetchone()
+        return row[0] if row else None
+
+    def namespaces(self) -> Iterator[Tuple[str, URIRef]]:
+        """Yields the bound prefixes and namespaces."""
+        rows = self._conn.execute(
+            "SELECT prefix, namespace FROM namespaces"
+        ).fetchall()
+        for prefix, namespace in rows:
+            yield prefix, URIRef(namespace)
@@ -0,0 +1,57 @@
+"""Encoding of RDF terms as bytes.
+
+Terms are encoded as their kind ("U" for URIs, "B" for blank nodes, "L"
+for literals) followed by their value in UTF-8. The value of a literal
+is its language, datatype, and lexical form separated by null
+characters. Blank node labels are preserved.
+"""
+
+from typing import Any
+
+from rdflib import BNode, Literal, URIRef
+
+
+def encode_term(term: Any) -> bytes:
+    """Encodes an RDF term.
+
+    Args:
+        term: RDF term.
+
+    Raises:
+        TypeError: If the term is not a URI, blank node, or literal.
+
+    Returns:
+        Encoded term.
+    """
+    if isinstance(term, URIRef):
+        return f"U{term}".encode("utf-8")
+    if isinstance(term, BNode):
+        return f"B{term}".encode("utf-8")
+    if isinstance(term, Literal):
+        return (
+            f"L{term.language or ''}\x00{term.datatype or ''}\x00{term}"
+        ).encode("utf-8")
+    raise TypeError(f"Term {term} of type {type(term)} not supported.")
+
+
+def decode_term(data: bytes) -> Any:
+    """Decodes an RDF term.
+
+    Args:
+        data: Encoded term.
+
+    Returns:
+        RDF term.
+    """
+    value = data.decode("utf-8")
+    kind, value = value[0], value[1:]
+    if kind == "U":
+        return URIRef(value)
+    if kind == "B":
+        return BNode(value)
+    language, datatype, lexical_form = value.split("\x00", 2)
+    return Literal(
+        lexical_form,
+        lang=language or None,
+        datatype=URIRef(datatype) if datatype else None,
+    )
@@ -0,0 +1,126 @@
+"""RDF graph keeping track of the triples added to and removed from it.
+
+SPARQL updates are evaluated by RDFLib through the add, addN, and remove
+methods of the graph. Overriding them gives access to the actual changes
+made by an update, which is needed to persist or react to the changes
+without comparing the whole graph before and after the update.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Set, Tuple
+
+from rdflib import Graph
+
+ADDED = "+"
+REMOVED = "-"
+
+# A change is a pair of the operation (ADDED or REMOVED) and the triple.
+Change = Tuple[str, Tuple[Any, Any, Any]]
+
+
+def invert_changes(changes: Iterable[Change]) -> List[Change]:
+    """Gets the changes undoing a sequence of changes.
+
+    Args:
+        changes: Changes, in the order they were made.
+
+    Returns:
+        Inverse changes, in the order to apply them.
+    """
+    return [
+        (REMOVED if operation == ADDED else ADDED, triple)
+        for operation, triple in reversed(list(changes))
+    ]
+
+
+class TrackedGraph(Graph):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initializes a graph that can record the changes made to it.
+
+        Accepts the same arguments as rdflib.Graph.
+        """
+        super().__init__(*args, **kwargs)
+        self._tracked_changes: List[List[Change]] = []
+
+    @contextmanager
+    def track_changes(self) -> Iterator[List[Change]]:
+        """Records the changes made to the graph within the context.
+
+        Only effective changes are recorded, i.e., adding a triple that is
+        already in the graph is not a change. Changes are recorded in the
+        order they are made. Contexts may be nested, in which case the changes
+        recorded by the inner context are also part of the outer one.
+
+        Yields:
+            List of changes, filled in as changes are made.
+        """
+        changes: List[Change] = []
+        self._tracked_changes.append(changes)
+        try:
+            yield changes
+        finally:
+            self._tracked_changes.pop()
+            if self._tracked_changes:
+                self._tracked_changes[-1].extend(changes)
+
+    def _record(self, operation: str, triples: Iterable[Any]) -> None:
+        """Records changes in the innermost tracking context.
+
+        Args:
+            operation: Operation, either ADDED or REMOVED.
+            triples: Triples affected by the operation.
+        """
+        self._tracked_changes[-1].extend(
+            (operation, triple) for triple in triples
+        )
+
+    def add(self, triple: Tuple[Any, Any, Any]) -> "TrackedGraph":
+        """Adds a triple to the graph, recording it if tracked."""
+        if self._tracked_changes and triple not in self:
+            self._record(ADDED, [triple])
+        super().add(triple)
+        return self
+
+    def addN(  # noqa: N802
+        self, quads: Iterable[Tuple[Any, Any, Any, Any]]
+    ) -> "TrackedGraph":
+        """Adds quads to the graph, recording the new triples if tracked."""
+        if not self._tracked_changes:
+            super().addN(quads)
+            return self
+
+        quads = [
+            quad
+            for quad in quads
+            if isinstance(quad[3], Graph)
+            and quad[3].identifier is self.identifier
+        ]
+        added: Set[Tuple[Any, Any, Any]] = set()
+        new_triples = []
+        for s, p, o, _ in quads:
+            triple = (s, p, o)
+            if triple not in added and triple not in self:
+                added.add(triple)
+                new_triples.append(triple)
+        self._record(ADDED, new_triples)
+        super().addN(quads)
+        return self
+
+    def remove(self, triple: Tuple[Any, Any, Any]) -> "TrackedGraph":
+        """Removes triples matching a pattern, recording them if tracked."""
+        if self._tracked_changes:
+            self._record(REMOVED, list(self.triples(triple)))
+        super().remove(triple)
+        return self
+
+    def apply_changes(self, changes: Iterable[Change]) -> None:
+        """Applies a sequence of changes.
+
+        Args:
+            changes: Changes to apply, in the order they were made.
+        """
+        for operation, triple in changes:
+            if operation == ADDED:
+                self.add(triple)
+            else:
+                self.remove(triple)
@@ -0,0 +1,190 @@
+"""Append-only write-ahead log persisting the changes made to a graph.
+
+Instead of re-serializing the whole graph after each update, the triples
+added and removed by an update are appended to a log file. The graph is
+restored by loading the last snapshot and replaying the log on top of it.
+Compaction folds the log into a new snapshot and empties the log.
+
+The snapshot and the log must preserve blank node labels, since logged changes
+may refer to blank nodes of the snapshot, e.g., the concept of a removed
+statement. The snapshot is therefore stored either in N-Triples syntax or as a
+binary snapshot (see pkg_api.storage.binary_snapshot). Each line of the log is
+a triple in N-Triples syntax prefixed with the operation, "+" for an addition
+and "-" for a removal.
+
+Replaying the log is idempotent: the presence of a triple after the replay is
+decided by the last operation on it. A crash between writing a new snapshot
+and emptying the log is therefore harmless.
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from rdflib import BNode, Graph
+from rdflib.exceptions import ParserError
+from rdflib.plugins.parsers.ntriples import DummySink, W3CNTriplesParser
+from rdflib.plugins.serializers.nt import _nt_row
+
+from pkg_api.storage.atomic_file import atomic_write
+from pkg_api.storage.binary_snapshot import (
+    BINARY_SNAPSHOT_EXTENSION,
+    load_binary_snapshot,
+    write_binary_snapshot,
+)
+from pkg_api.storage.tracked_graph import Change, TrackedGraph
+
+SNAPSHOT_EXTENSION = "nt"
+LOG_EXTENSION = "log"
+
+
+class PreservedBNodeLabels(Dict[str, BNode]):
+    """Blank node context mapping each label to a blank node with that label.
+
+    By default, RDFLib parsers create fresh blank nodes for the labels
+    found in a document. Logged changes refer to the blank nodes by
+    label, hence the labels must be preserved across loads.
+    """
+
+    def get(self, key: str, default: Any = None) -> BNode:
+        """Returns the blank node with the given label."""
+        return BNode(key)
+
+
+class _TripleSink(DummySink):
+    """Sink keeping the last triple read by the N-Triples parser."""
+
+    def __init__(self) -> None:
+        """Initializes the sink."""
+        super().__init__()
+        self.triple_: Optional[Tuple[Any, Any, Any]] = None
+
+    def triple(self, s: Any, p: Any, o: Any) -> None:
+        """Receives a triple from the parser."""
+        self.triple_ = (s, p, o)
+
+
+class WriteAheadLog:
+    def __init__(self, path: str, binary_snapshot: bool = False) -> None:
+        """Initializes the write-ahead log of a graph.
+
+        Args:
+            path: Path to the store without extension. The snapshot and the
+              log are stored next to each other with the extensions
+              SNAPSHOT_EXTENSION (or BINARY_SNAPSHOT_EXTENSION) and
+              LOG_EXTENSION, respectively.
+            binary_snapshot: Whether to write binary snapshots instead of
+              N-Triples. Defaults to False.
+        """
+        self.nt_snapshot_path = f"{path}.{SNAPSHOT_EXTENSION}"
+        self.binary_snapshot_path = f"{path}.{BINARY_SNAPSHOT_EXTENSION}"
+        self._binary_snapshot = binary_snapshot
+        self.log_path = f"{path}.{LOG_EXTENSION}"
+        self._log_file: Optional[TextIO] = None
+        self._num_entries = 0
+
+    def __len__(self) -> int:
+        """Returns the number of changes logged since the last snapshot."""
+        return self._num_entries
+
+    def has_snapshot(self) -> bool:
+        """Checks whether a snapshot exists, in any format."""
+        return os.path.exists(self.binary_snapshot_path) or os.path.exists(
+            self.nt_snapshot_path
+        )
+
+    def load(self, graph: TrackedGraph) -> None:
+        """Loads the last snapshot into the graph and replays the log.
+
+        A binary snapshot is preferred over an N-Triples one if both exist.
+
+        Args:
+            graph: Graph to load the data into.
+        """
+        labels = PreservedBNodeLabels()
+        if os.path.exists(self.binary_snapshot_path):
+            load_binary_snapshot(graph, self.binary_snapshot_path)
+        elif os.path.exists(self.nt_snapshot_path):
+            graph.parse(
+                self.nt_snapshot_path, format="nt", bnode_context=labels
+            )
+        self._num_entries = 0
+        if not os.path.exists(self.log_path):
+            return
+
+        sink = _TripleSink()
+        parser = W3CNTriplesParser(sink, bnode_context=labels)
+        changes: List[Change] = []
+        with open(self.log_path, "r", encoding="utf-8") as log_file:
+            for line in log_file:
+                if not line.strip():
+                    continue
+                sink.triple_ = None
+                try:
+                    parser.parsestring(line[2:], bnode_context=labels)
+                except ParserError:
+                    # A truncated last line means that the process crashed
+                    # while appending, the change was never acknowledged.
+                    logging.warning(
+                        f"Write-ahead log {self.log_path} - Skipping "
+                        f"malformed entry: {line.strip()}"
+                    )
+                    continue
+                if sink.triple_ is not None:
+                    changes.append((line[0], sink.triple_))
+        graph.apply_changes(changes)
+        self._num_entries = len(changes)
+
+    def append(self, changes: List[Change]) -> None:
+        """Appends changes to the log and flushes them to disk.
+
+        Args:
+            changes: Changes to append.
+
+        Raises:
+            FileNotFoundError: If the directory to store the log does not
+              exist.
+        """
+        if not changes:
+            return
+        if self._log_file is None:
+            self._log_file = open(self.log_path, "a", encoding="utf-8")
+        self._log_file.write(
+            "".join(
+                f"{operation} {_nt_row(triple)}"
+                for operation, triple in changes
+            )
+        )
+        self._log_file.flush()
+        os.fsync(self._log_file.fileno())
+        self._num_entries += len(changes)
+
+    def compact(self, graph: Graph) -> None:
+        """Writes a new snapshot of the graph and empties the log.
+
+        The snapshot replaces the previous one atomically, see
+        pkg_api.storage.atomic_file, such that the previous snapshot and the
+        log stay intact if writing fails. A snapshot in the other format is
+        removed, as it would otherwise shadow the new one.
+
+        Args:
+            graph: Graph to snapshot.
+        """
+        if self._binary_snapshot:
+            write_binary_snapshot(graph, self.binary_snapshot_path)
+            stale_snapshot_path = self.nt_snapshot_path
+        else:
+            with atomic_write(self.nt_snapshot_path) as snapshot_file:
+                graph.serialize(snapshot_file, format="nt", encoding="utf-8")
+            stale_snapshot_path = self.binary_snapshot_path
+        if os.path.exists(stale_snapshot_path):
+            os.remove(stale_snapshot_path)
+        self.close()
+        open(self.log_path, "w").close()
+        self._num_entries = 0
+
+    def close(self) -> None:
+        """Closes the log file."""
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
@@ -0,0 +1,205 @@
+"""Builds the RDF triples of statements and preferences.
+
+This is the direct counterpart of the SPARQL updates in pkg_api.utils: the
+triples are built from the PKG data as RDFLib terms and added to the graph
+without formatting and parsing SPARQL. The triples are identical to the ones
+added by the corresponding SPARQL updates, including the normalization of
+white space in literals done when cleaning the queries.
+
+PKG vocabulary:
+https://iai-group.github.io/pkg-vocabulary/
+"""
+
+import dataclasses
+import re
+import uuid
+from typing import Any, List, Tuple, Union
+
+from rdflib import DC, RDF, BNode, Literal, Namespace, URIRef
+
+import pkg_api.utils as utils
+from pkg_api.core.namespaces import PKGPrefixes
+from pkg_api.core.pkg_types import URI, Concept, PKGData
+
+RDFTriple = Tuple[Any, Any, Any]
+
+_EX = Namespace(PKGPrefixes.EX.value)
+_PAV = Namespace(PKGPrefixes.PAV.value)
+_PKG = Namespace(PKGPrefixes.PKG.value)
+_SKOS = Namespace(PKGPrefixes.SKOS.value)
+_WI = Namespace(PKGPrefixes.WI.value)
+_WO = Namespace(PKGPrefixes.WO.value)
+_XSD = Namespace(PKGPrefixes.XSD.value)
+# The SPARQL updates resolve the dc prefix with the namespaces bound to the
+# graph, where RDFLib binds it to DC elements rather than to DC terms.
+_DC = DC
+
+
+def _get_text_literal(text: str) -> Literal:
+    """Gets the literal of a text as stored by the SPARQL updates.
+
+    Args:
+        text: Text.
+
+    Returns:
+        Literal with runs of white space replaced by a single space.
+    """
+    return Literal(re.sub(r"\s+", " ", text))
+
+
+def _get_concept_triples(
+    concept: Concept,
+    triples: List[RDFTriple],
+    content_addressed_concepts: bool = False,
+) -> Union[BNode, URIRef]:
+    """Builds the triples of a concept.
+
+    Args:
+        concept: Concept.
+        triples: List to append the triples to.
+        content_addressed_concepts: Whether to name the concept by its IRI,
+          see get_concept_node, instead of a blank node. Defaults to False.
+
+    Returns:
+        Node of the concept.
+    """
+    node = get_concept_node(concept) if content_addressed_concepts else BNode()
+    triples.append((node, RDF.type, _SKOS.Concept))
+    triples.append(
+        (node, _DC.description, _get_text_literal(concept.description))
+    )
+    for property, entities in (
+        (_SKOS.related, concept.related_entities),
+        (_SKOS.broader, concept.broader_entities),
+        (_SKOS.narrower, concept.narrower_entities),
+    ):
+        triples.extend((node, property, URIRef(entity)) for entity in entities)
+    return node
+
+
+def _get_value_term(
+    value: Union[URI, Concept, str],
+    triples: List[RDFTriple],
+    content_addressed_concepts: bool = False,
+) -> Any:
+    """Gets the term of a value, building the triples of concepts.
+
+    Args:
+        value: Value of a property.
+        triples: List to append the triples of a concept to.
+        content_addressed_concepts: Whether to name concepts by their IRI.
+          Defaults to False.
+
+    Returns:
+        RDF term of the value.
+    """
+    if isinstance(value, URI):
+        return URIRef(value)
+    elif isinstance(value, Concept):
+        return _get_concept_triples(value, triples, content_addressed_concepts)
+    return _get_text_literal(value)
+
+
+def get_statement_node(pkg_data: PKGData) -> URIRef:
+    """Gets the node of a statement based on its UUID."""
+    return get_statement_node_for_id(pkg_data.id)
+
+
+def get_statement_node_for_id(statement_id: uuid.UUID) -> URIRef:
+    """Gets the node of a statement given its UUID."""
+    return _EX[str(statement_id)]
+
+
+def get_concept_node(concept: Concept) -> URIRef:
+    """Gets the content-addressed node of a concept.
+
+    See pkg_api.utils.get_concept_node_id.
+    """
+    return _EX[utils.CONCEPT_NODE_PREFIX + utils.get_concept_digest(concept)]
+
+
+def get_preference_node(pkg_data: PKGData) -> URIRef:
+    """Gets the node of the preference derived from a statement."""
+    return _EX[f"{pkg_data.id}-preference"]
+
+
+def get_weight_node(pkg_data: PKGData) -> URIRef:
+    """Gets the node of the weight of a statement's preference."""
+    return _EX[f"{pkg_data.id}-weight"]
+
+
+def get_triples_for_add_statement(
+    pkg_data: PKGData,
+    include_preference: bool = False,
+    content_addressed_concepts: bool = False,
+) -> List[RDFTriple]:
+    """Gets the triples to add a statement.
+
+    See pkg_api.utils.get_query_for_add_statement and
+    pkg_api.utils.get_query_for_add_preference.
+
+    Args:
+        pkg_data: PKG data associated to a statement.
+        include_preference: Whether to include the triples of the preference
+          derived from the statement, if any. Defaults to False.
+        content_addressed_concepts: Whether to name concepts by their IRI
+          instead of blank nodes. Defaults to False.
+
+    Returns:
+        List of triples.
+    """
+    node = get_statement_node(pkg_data)
+    triples: List[RDFTriple] = [
+        (node, RDF.type, RDF.Statement),
+        (node, _DC.description, _get_text_literal(pkg_data.statement)),
+    ]
+
+    terms = {}
+    if pkg_data.triple is not None:
+        for field in dataclasses.fields(pkg_data.triple):
+            annotation = getattr(pkg_data.triple, field.name)
+            if annotation is None or annotation.value is None:
+                continue
+            terms[field.name] = _get_value_term(
+                annotation.value, triples, content_addressed_concepts
+            )
+            triples.append((node, RDF[field.name], terms[field.name]))
+
+    for property in ["authoredOn", "createdOn"]:
+        if pkg_data.logging_data.get(property):
+            triples.append(
+                (
+                    node,
+                    _PAV[property],
+                    Literal(
+                        pkg_data.logging_data[property], datatype=_XSD.dateTime
+                    ),
+                )
+            )
+    for property in ["createdBy", "authoredBy"]:
+        if pkg_data.logging_data.get(property):
+            triples.append(
+                (node, _PAV[property], URIRef(pkg_data.logging_data[property]))
+            )
+
+    if (
+        include_preference
+        and pkg_data.preference is not None
+        and "subject" in terms
+        and "object" in terms
+    ):
+        preference = get_preference_node(pkg_data)
+        weight = get_weight_node(pkg_data)
+        triples += [
+            (terms["subject"], _WI.preference, preference),
+            (preference, _PAV.derivedFrom, node),
+            (preference, _WI.topic, terms["object"]),
+            (preference, _WO.weight, weight),
+            (
+                weight,
+                _WO.weight_value,
+                Literal(f"{pkg_data.preference.weight}", datatype=_XSD.decimal),
+            ),
+            (weight, _WO.scale, _PKG.StandardScale),
+        ]
+    return triples
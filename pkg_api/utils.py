@@ -6,11 +6,24 @@ about the properties of statements and preferences.
 
 PKG vocabulary:
 https://iai-group.github.io/pkg-vocabulary/
+
+Queries whose shape does not depend on the values they look for are also
+available as prepared queries. They are parsed and compiled once, and the
+values are bound to their parameters when the query is executed. Concepts
+cannot be bound to a parameter, the prepared variants fall back to the
+regular query for them.
 """
 
 import dataclasses
+import functools
+import hashlib
+import json
 import re
-from typing import List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from rdflib import DC, XSD, Literal, URIRef
+from rdflib.plugins.sparql import prepareQuery, prepareUpdate
+from rdflib.plugins.sparql.sparql import Query, Update
 
 from pkg_api.core.namespaces import PKGPrefixes
 from pkg_api.core.pkg_types import (
@@ -23,6 +36,20 @@ from pkg_api.core.pkg_types import (
 )
 
 _SPARQL_STATEMENT_VARIABLE = "?statement"
+# Prefix of the local names of content-addressed concepts in the ex namespace,
+# see get_concept_node_id.
+CONCEPT_NODE_PREFIX = "concept-"
+_CONCEPT_NAMESPACE = PKGPrefixes.EX.value + CONCEPT_NODE_PREFIX
+
+_INIT_NS = {
+    prefix.lower(): namespace.value
+    for prefix, namespace in PKGPrefixes.__members__.items()
+}
+
+# Prepared queries and updates, with the values bound to their parameters. A
+# query that could not be prepared is given as a string without bindings.
+PreparedQuery = Tuple[Union[SPARQLQuery, Query], Dict[str, Any]]
+PreparedUpdate = Tuple[Update, Dict[str, Any]]
 
 
 def _clean_sparql_representation(sparql: str) -> str:
@@ -147,14 +174,49 @@ def get_query_for_conditioned_get_preference(
     return _clean_sparql_representation(query)
 
 
+def _get_concept_node_id(
+    field: str,
+    concept: Concept,
+    prefix: str,
+    content_addressed_concepts: bool = False,
+) -> str:
+    """Gets the name of the node of a concept in a statement representation.
+
+    Args:
+        field: Field of the triple having the concept as value.
+        concept: Concept.
+        prefix: Prefix of the name, i.e., "?" or "_:".
+        content_addressed_concepts: Whether the concept is named by its IRI,
+          see get_concept_node_id. Defaults to False.
+
+    Returns:
+        Name of the node, e.g., ?concept_object.
+    """
+    if content_addressed_concepts:
+        return get_concept_node_id(concept)
+    return f"{prefix}concept_{field}"
+
+
 def _get_statement_representation(
-    pkg_data: PKGData, statement_node_id: str
+    pkg_data: PKGData,
+    statement_node_id: str,
+    concept_patterns: Optional[List[str]] = None,
+    concept_node_prefix: str = "?",
+    content_addressed_concepts: bool = False,
 ) -> str:
     """Gets the representation of a statement given a PKG data.
 
     Args:
         pkg_data: PKG data associated to a statement.
         statement_node_id: Node ID of the statement.
+        concept_patterns: If given, concepts are represented by named nodes,
+          see _get_concept_node_id, and the patterns describing them are
+          appended to this list. Defaults to None, i.e., concepts are
+          represented inline by blank nodes.
+        concept_node_prefix: Prefix of the names of the concept nodes, i.e.,
+          "?" for variables or "_:" for blank nodes. Defaults to "?".
+        content_addressed_concepts: Whether the concept nodes are named by
+          their IRI instead. Defaults to False.
 
     Returns:
         Representation of the statement.
@@ -170,6 +232,20 @@ def _get_statement_representation(
             annotation: TripleElement = getattr(pkg_data.triple, field.name)
             if annotation is None or annotation.value is None:
                 continue
+            if concept_patterns is not None and isinstance(
+                annotation.value, Concept
+            ):
+                node_id = _get_concept_node_id(
+                    field.name,
+                    annotation.value,
+                    concept_node_prefix,
+                    content_addressed_concepts,
+                )
+                concept = _get_concept_representation(annotation.value)
+                # The brackets of the blank node are replaced by the node
+                concept_patterns.append(f"{node_id} {concept[1:-1]} .")
+                statement += f"{property} {node_id} ; "
+                continue
             statement += (
                 f"{_get_property_representation(annotation.value, property)} ; "
             )
@@ -192,16 +268,106 @@ def _get_statement_representation(
     return _clean_sparql_representation(statement)
 
 
-def get_query_for_add_statement(pkg_data: PKGData) -> SPARQLQuery:
+def _get_preference_representation(
+    pkg_data: PKGData, content_addressed_concepts: bool = False
+) -> str:
+    """Gets the representation of the preference derived from a statement.
+
+    The preference and its weight are named after the statement, see
+    get_preference_node_id and get_weight_node_id. Concepts are referred to by
+    the nodes of the statement representation, see _get_concept_node_id.
+
+    Args:
+        pkg_data: PKG data associated to a statement with a preference.
+        content_addressed_concepts: Whether the concepts are named by their
+          IRI. Defaults to False.
+
+    Returns:
+        Representation of the preference, or an empty string if the statement
+        has no subject or object.
+    """
+    if pkg_data.preference is None:
+        return ""
+    terms = {}
+    for field in ["subject", "object"]:
+        annotation = getattr(pkg_data.triple, field, None)
+        if annotation is None or annotation.value is None:
+            return ""
+        terms[field] = (
+            _get_concept_node_id(
+                field, annotation.value, "_:", content_addressed_concepts
+            )
+            if isinstance(annotation.value, Concept)
+            else _get_property_representation(annotation.value)
+        )
+
+    preference_node_id = get_preference_node_id(pkg_data)
+    weight_node_id = get_weight_node_id(pkg_data)
+    representation = f"""
+        {terms["subject"]} wi:preference {preference_node_id} .
+        {preference_node_id} pav:derivedFrom {get_statement_node_id(pkg_data)} ;
+            wi:topic {terms["object"]} ; wo:weight {weight_node_id} .
+        {weight_node_id}
+            wo:weight_value "{pkg_data.preference.weight}"^^xsd:decimal ;
+            wo:scale pkg:StandardScale .
+    """
+    return _clean_sparql_representation(representation)
+
+
+def get_query_for_add_statement(
+    pkg_data: PKGData,
+    include_preference: bool = False,
+    content_addressed_concepts: bool = False,
+) -> SPARQLQuery:
     """Gets SPARQL query to add a statement.
 
+    With the preference derived from the statement, the statement and the
+    preference are added by the same operation. The concepts of the statement
+    are then named blank nodes, which are fresh for each solution of an
+    INSERT template but not for INSERT DATA in RDFLib, hence the empty WHERE
+    clause.
+
+    With content-addressed concepts, the concepts are named by their IRI, see
+    get_concept_node_id, and are shared with the statements already referring
+    to them.
+
     Args:
         pkg_data: PKG data associated to a statement.
+        include_preference: Whether to include the preference derived from
+          the statement, if any. Defaults to False.
+        content_addressed_concepts: Whether to name concepts by their IRI
+          instead of blank nodes. Defaults to False.
 
     Returns:
         SPARQL query.
     """
     statement_node_id = get_statement_node_id(pkg_data)
+    preference = (
+        _get_preference_representation(pkg_data, content_addressed_concepts)
+        if include_preference and pkg_data.preference is not None
+        else ""
+    )
+    if preference or content_addressed_concepts:
+        concept_patterns: List[str] = []
+        statement = _get_statement_representation(
+            pkg_data,
+            statement_node_id,
+            concept_patterns,
+            "_:",
+            content_addressed_concepts,
+        )
+        operation = "INSERT" if preference else "INSERT DATA"
+        query = f"""
+            {operation} {{
+                {statement}
+                {" ".join(concept_patterns)}
+                {preference}
+            }}
+        """
+        if preference:
+            query += " WHERE {}"
+        return _clean_sparql_representation(query)
+
     # Create a statement
     statement = _get_statement_representation(pkg_data, statement_node_id)
 
@@ -215,9 +381,41 @@ def get_query_for_add_statement(pkg_data: PKGData) -> SPARQLQuery:
     return _clean_sparql_representation(query)
 
 
+def get_query_for_add_statements(
+    pkg_data_list: Iterable[PKGData],
+    include_preference: bool = False,
+    content_addressed_concepts: bool = False,
+) -> SPARQLQuery:
+    """Gets SPARQL update to add several statements at once.
+
+    Each statement is added by its own INSERT DATA operation within a single
+    update. A single INSERT DATA with all the statements would be slower, as
+    RDFLib reorders the triples of a block in quadratic time.
+
+    Args:
+        pkg_data_list: PKG data associated to the statements.
+        include_preference: Whether to include the preferences derived from
+          the statements, if any. Defaults to False.
+        content_addressed_concepts: Whether to name concepts by their IRI
+          instead of blank nodes. Defaults to False.
+
+    Returns:
+        SPARQL update.
+    """
+    return " ; ".join(
+        get_query_for_add_statement(
+            pkg_data, include_preference, content_addressed_concepts
+        )
+        for pkg_data in pkg_data_list
+    )
+
+
 def get_query_for_add_preference(pkg_data: PKGData) -> SPARQLQuery:
     """Gets SPARQL query to add a preference.
 
+    The preference is the one added by get_query_for_add_statement with its
+    preference included, hence adding it again has no effect.
+
     Args:
         pkg_data: PKG data associated to a statement.
 
@@ -229,15 +427,16 @@ def get_query_for_add_preference(pkg_data: PKGData) -> SPARQLQuery:
     if pkg_data.preference is None:
         return ""
 
+    preference_node_id = get_preference_node_id(pkg_data)
+    weight_node_id = get_weight_node_id(pkg_data)
     query = f"""
         INSERT {{
-            ?subject wi:preference [
-                pav:derivedFrom {_SPARQL_STATEMENT_VARIABLE} ;
-                wi:topic ?object ; wo:weight [
-                    wo:weight_value "{pkg_data.preference.weight}"^^xsd:decimal;
-                    wo:scale pkg:StandardScale
-                ]
-            ] .
+            ?subject wi:preference {preference_node_id} .
+            {preference_node_id} pav:derivedFrom {_SPARQL_STATEMENT_VARIABLE} ;
+                wi:topic ?object ; wo:weight {weight_node_id} .
+            {weight_node_id}
+                wo:weight_value "{pkg_data.preference.weight}"^^xsd:decimal;
+                wo:scale pkg:StandardScale .
         }}
         WHERE {{
             {statement_node_id} a rdf:Statement ;
@@ -255,6 +454,53 @@ def get_statement_node_id(pkg_data: PKGData) -> str:
     return f"{PKGPrefixes.EX.name.lower()}:{pkg_data.id}"
 
 
+def get_concept_digest(concept: Concept) -> str:
+    """Gets the digest of the content of a concept.
+
+    Concepts with the same description, up to white space, and the same
+    related, broader, and narrower entities, regardless of their order, have
+    the same digest.
+
+    Args:
+        concept: Concept.
+
+    Returns:
+        Hexadecimal digest.
+    """
+    content = json.dumps(
+        [
+            re.sub(r"\s+", " ", concept.description),
+            sorted(set(concept.related_entities)),
+            sorted(set(concept.broader_entities)),
+            sorted(set(concept.narrower_entities)),
+        ]
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+def get_concept_node_id(concept: Concept) -> str:
+    """Gets the content-addressed node ID of a concept."""
+    return (
+        f"{PKGPrefixes.EX.name.lower()}:"
+        f"{CONCEPT_NODE_PREFIX}{get_concept_digest(concept)}"
+    )
+
+
+def is_concept_node(node: Any) -> bool:
+    """Checks whether a node is a content-addressed concept node."""
+    return isinstance(node, URIRef) and str(node).startswith(_CONCEPT_NAMESPACE)
+
+
+def get_preference_node_id(pkg_data: PKGData) -> str:
+    """Gets the node ID of the preference derived from a statement."""
+    return f"{get_statement_node_id(pkg_data)}-preference"
+
+
+def get_weight_node_id(pkg_data: PKGData) -> str:
+    """Gets the node ID of the weight of a statement's preference."""
+    return f"{get_statement_node_id(pkg_data)}-weight"
+
+
 def get_query_for_get_statements(pkg_data: PKGData) -> SPARQLQuery:
     """Gets SPARQL query to get statements.
 
@@ -294,6 +540,26 @@ def get_query_for_conditional_get_statements(triple: Triple) -> SPARQLQuery:
     Returns:
         SPARQL query.
     """
+    query = f"""
+        SELECT {_SPARQL_STATEMENT_VARIABLE}
+        WHERE {{
+            {_get_conditional_statement_patterns(triple)}
+        }}
+    """
+
+    # Cleaning up the query
+    return _clean_sparql_representation(query)
+
+
+def _get_conditional_statement_patterns(triple: Triple) -> str:
+    """Gets the graph patterns of statements given conditions in the triple.
+
+    Args:
+        triple: Triple with conditions.
+
+    Returns:
+        Graph patterns, with the values of the conditions inlined.
+    """
     conditions = []
     for field in dataclasses.fields(triple):
         # Loop through the fields of the triple (subject, predicate, object), if
@@ -306,16 +572,7 @@ def get_query_for_conditional_get_statements(triple: Triple) -> SPARQLQuery:
             continue
         value = _get_property_representation(annotation)
         conditions.append(f"{_SPARQL_STATEMENT_VARIABLE} {property} {value} .")
-
-    query = f"""
-        SELECT {_SPARQL_STATEMENT_VARIABLE}
-        WHERE {{
-            {" ".join(conditions)}
-        }}
-    """
-
-    # Cleaning up the query
-    return _clean_sparql_representation(query)
+    return " ".join(conditions)
 
 
 def get_query_for_remove_preference(pkg_data: PKGData) -> SPARQLQuery:
@@ -350,6 +607,45 @@ def get_query_for_remove_preference(pkg_data: PKGData) -> SPARQLQuery:
     return _clean_sparql_representation(query)
 
 
+def get_query_for_replace_preference(pkg_data: PKGData) -> SPARQLQuery:
+    """Gets SPARQL query to remove the preferences replaced by a statement's.
+
+    The preferences replaced are the other preferences of the subject of the
+    preference derived from the statement for the same topic. They are
+    removed with their weights, while the statements they are derived from
+    are kept. The query is meant to follow the addition of the statement
+    with its preference, see get_query_for_add_statement.
+
+    Args:
+        pkg_data: PKG data associated to a statement.
+
+    Returns:
+        SPARQL query, or an empty string if the statement has no preference.
+    """
+    if pkg_data.preference is None:
+        return ""
+
+    preference_node_id = get_preference_node_id(pkg_data)
+    query = f"""
+        DELETE {{
+            ?subject wi:preference ?preference .
+            ?preference ?p ?o .
+            ?weight_node ?weight_p ?weight_o .
+        }}
+        WHERE {{
+            ?subject wi:preference {preference_node_id}, ?preference .
+            {preference_node_id} wi:topic ?topic .
+            ?preference wi:topic ?topic ; ?p ?o .
+            FILTER (?preference != {preference_node_id})
+            OPTIONAL {{
+                ?preference wo:weight ?weight_node .
+                ?weight_node ?weight_p ?weight_o .
+            }}
+        }}
+    """
+    return _clean_sparql_representation(query)
+
+
 def get_query_for_remove_statement(pkg_data: PKGData) -> SPARQLQuery:
     """Gets SPARQL query to remove a statement.
 
@@ -415,3 +711,428 @@ def get_queries_for_remove_cleanup() -> List[SPARQLQuery]:
     """
     query_delete_scales = _clean_sparql_representation(query_delete_scales)
     return [query_delete_concepts, query_delete_scales]
+
+
+@functools.lru_cache(maxsize=None)
+def prepare_query(query: SPARQLQuery) -> Query:
+    """Parses and compiles a SPARQL query once.
+
+    Args:
+        query: SPARQL query, using the prefixes of the PKG vocabulary.
+
+    Returns:
+        Prepared query.
+    """
+    return prepareQuery(query, initNs=_INIT_NS)
+
+
+@functools.lru_cache(maxsize=None)
+def prepare_update(update: SPARQLQuery) -> Update:
+    """Parses and compiles a SPARQL update once.
+
+    Args:
+        update: SPARQL update, using the prefixes of the PKG vocabulary.
+
+    Returns:
+        Prepared update.
+    """
+    return prepareUpdate(update, initNs=_INIT_NS)
+
+
+def _get_parameter_value(
+    value: Union[URI, Concept, str]
+) -> Optional[Union[URIRef, Literal]]:
+    """Gets the RDF term bound to a query parameter for a value.
+
+    Args:
+        value: Value of a property.
+
+    Returns:
+        RDF term, or None if the value is a concept.
+    """
+    if isinstance(value, URI):
+        return URIRef(value)
+    if isinstance(value, Concept):
+        return None
+    return Literal(value)
+
+
+def get_prepared_query_for_conditioned_get_preference(
+    who: Union[str, URI], topic: Union[URI, Concept, str]
+) -> PreparedQuery:
+    """Gets prepared query to retrieve preference value.
+
+    See get_query_for_conditioned_get_preference.
+
+    Args:
+        who: Subject.
+        topic: Topic of the preference.
+
+    Returns:
+        Prepared query and bindings.
+    """
+    topic_value = _get_parameter_value(topic)
+    if topic_value is None:
+        return get_query_for_conditioned_get_preference(who, topic), {}
+    query = prepare_query(
+        """
+        SELECT ?weight
+        WHERE {
+            ?who wi:preference [
+                wi:topic ?topic ;
+                wo:weight [
+                    wo:weight_value ?weight ;
+                    wo:scale pkg:StandardScale
+                ]
+            ] .
+        }
+        """
+    )
+    return query, {"who": _get_parameter_value(who), "topic": topic_value}
+
+
+def get_prepared_query_for_conditional_get_statements(
+    triple: Triple,
+) -> PreparedQuery:
+    """Gets prepared query to get statements given conditions in the triple.
+
+    See get_query_for_conditional_get_statements. A query is prepared for
+    each combination of conditioned fields of the triple.
+
+    Args:
+        triple: Triple with conditions.
+
+    Returns:
+        Prepared query and bindings.
+    """
+    parametrized_patterns = _get_parametrized_conditional_statement_patterns(
+        triple
+    )
+    if parametrized_patterns is None:
+        return get_query_for_conditional_get_statements(triple), {}
+    patterns, bindings = parametrized_patterns
+    query = prepare_query(
+        f"SELECT {_SPARQL_STATEMENT_VARIABLE} WHERE {{ {patterns} }}"
+    )
+    return query, bindings
+
+
+def _get_parametrized_conditional_statement_patterns(
+    triple: Triple,
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Gets the graph patterns of statements given conditions in the triple.
+
+    Unlike _get_conditional_statement_patterns, the values of the conditions
+    are parameters of the patterns.
+
+    Args:
+        triple: Triple with conditions.
+
+    Returns:
+        Graph patterns and the values bound to their parameters, or None if a
+        condition is on a concept, which cannot be bound to a parameter.
+    """
+    conditions = []
+    bindings = {}
+    for field in dataclasses.fields(triple):
+        annotation = getattr(triple, field.name)
+        annotation = annotation.value if annotation else None
+        if not annotation:
+            continue
+        value = _get_parameter_value(annotation)
+        if value is None:
+            return None
+        conditions.append(
+            f"{_SPARQL_STATEMENT_VARIABLE} rdf:{field.name} ?{field.name} ."
+        )
+        bindings[field.name] = value
+    return " ".join(conditions), bindings
+
+
+def get_prepared_query_for_get_statements_page(
+    pkg_data: PKGData,
+    triple_conditioned: bool,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Any] = None,
+) -> PreparedQuery:
+    """Gets prepared query to get a page of statements ordered by IRI.
+
+    The statements are the ones of get_query_for_get_statements or, if
+    conditioned with the triple, of get_query_for_conditional_get_statements.
+    Only the statements with a description, which can be decoded, are
+    retrieved. The ordering, cursor, limit, and offset are evaluated by the
+    query, hence a page is retrieved without going through the statements
+    before the cursor.
+
+    LIMIT and OFFSET cannot be parameters of a query, the query is hence
+    only prepared, and cached, for the first page, i.e., without offset. The
+    description property is given by its IRI, as the dc prefix is resolved
+    differently by prepared queries and by the graph (see
+    pkg_api.triple_builder).
+
+    Args:
+        pkg_data: PKG data associated to wanted statements.
+        triple_conditioned: Whether to condition the query with the triple.
+        limit: Maximum number of statements.
+        offset: Number of statements to skip. Defaults to 0.
+        cursor: Node of the statement to start after. Defaults to None, i.e.,
+          start with the first statement.
+
+    Returns:
+        Prepared query and bindings.
+    """
+    # The patterns are only parametrized if conditioned on URIs and literals.
+    parametrized_patterns = None
+    if triple_conditioned and pkg_data.triple is not None:
+        parametrized_patterns = (
+            _get_parametrized_conditional_statement_patterns(pkg_data.triple)
+        )
+    if parametrized_patterns is not None:
+        patterns, bindings = parametrized_patterns
+    elif triple_conditioned and pkg_data.triple is not None:
+        patterns = _get_conditional_statement_patterns(pkg_data.triple)
+        bindings = {}
+    else:
+        patterns = _get_statement_representation(
+            pkg_data, _SPARQL_STATEMENT_VARIABLE
+        )
+        bindings = {}
+
+    cursor_filter = ""
+    if cursor is not None:
+        cursor_filter = (
+            f"FILTER (STR({_SPARQL_STATEMENT_VARIABLE}) > STR(?cursor))"
+        )
+        bindings["cursor"] = cursor
+    query = _clean_sparql_representation(
+        f"""
+        SELECT DISTINCT {_SPARQL_STATEMENT_VARIABLE}
+        WHERE {{
+            {patterns}
+            FILTER EXISTS {{
+                {_SPARQL_STATEMENT_VARIABLE} <{DC.description}> ?_description .
+            }}
+            {cursor_filter}
+        }}
+        ORDER BY STR({_SPARQL_STATEMENT_VARIABLE})
+        LIMIT {limit} OFFSET {offset}
+        """
+    )
+    if parametrized_patterns is not None and offset == 0:
+        return prepare_query(query), bindings
+    return query, bindings
+
+
+def get_query_for_get_statements_to_remove(pkg_data: PKGData) -> SPARQLQuery:
+    """Gets SPARQL query to get the statements to remove.
+
+    The statements are matched like in get_query_for_remove_statement, i.e.,
+    regardless of their description.
+
+    Args:
+        pkg_data: PKG data associated to a statement.
+
+    Returns:
+        SPARQL query.
+    """
+    concept_patterns: List[str] = []
+    statement_representation = _get_statement_representation(
+        pkg_data, _SPARQL_STATEMENT_VARIABLE, concept_patterns
+    )
+    # The concepts are matched in a separate group, which RDFLib evaluates
+    # for each matched statement (lazy join), instead of enumerating all the
+    # concepts of the graph for each candidate statement. A single group is
+    # used, as a join of joins is not evaluated lazily.
+    patterns = f"{{ {statement_representation} }}"
+    if concept_patterns:
+        patterns += f" {{ {' '.join(concept_patterns)} }}"
+    patterns = re.sub(r'dc:description "[^"]+" ;', "", patterns)
+    query = f"""
+        SELECT {_SPARQL_STATEMENT_VARIABLE}
+        WHERE {{
+            {patterns}
+        }}
+    """
+
+    # Cleaning up the query
+    return _clean_sparql_representation(query)
+
+
+def get_prepared_update_for_remove_statement_node(
+    statement_node: Any,
+) -> PreparedUpdate:
+    """Gets prepared update to remove a statement node and its preference.
+
+    Args:
+        statement_node: Node of the statement.
+
+    Returns:
+        Prepared update and bindings.
+    """
+    update = prepare_update(
+        f"""
+        DELETE {{
+            ?preference ?p ?o .
+            ?subject wi:preference ?preference .
+        }}
+        WHERE {{
+            ?subject wi:preference ?preference .
+            ?preference pav:derivedFrom {_SPARQL_STATEMENT_VARIABLE} .
+            ?preference ?p ?o .
+        }} ;
+        DELETE WHERE {{
+            {_SPARQL_STATEMENT_VARIABLE} ?p ?o .
+        }}
+        """
+    )
+    return update, {_SPARQL_STATEMENT_VARIABLE[1:]: statement_node}
+
+
+def get_prepared_query_for_get_statement_node_objects(
+    statement_node: Any,
+) -> PreparedQuery:
+    """Gets prepared query to get the nodes referred to by a statement.
+
+    The nodes are the blank nodes, weights, and content-addressed concepts
+    that are values of the properties of the statement and of the
+    preferences derived from it. They may become dangling when the statement
+    is removed.
+
+    Args:
+        statement_node: Node of the statement.
+
+    Returns:
+        Prepared query and bindings.
+    """
+    query = prepare_query(
+        f"""
+        SELECT DISTINCT ?node
+        WHERE {{
+            {{
+                {_SPARQL_STATEMENT_VARIABLE} ?p ?node .
+            }} UNION {{
+                ?preference pav:derivedFrom {_SPARQL_STATEMENT_VARIABLE} ;
+                    ?p ?node .
+            }}
+            FILTER (
+                isBlank(?node) || ?p = wo:weight
+                || STRSTARTS(STR(?node), "{_CONCEPT_NAMESPACE}")
+            )
+        }}
+        """
+    )
+    return query, {_SPARQL_STATEMENT_VARIABLE[1:]: statement_node}
+
+
+def get_prepared_update_for_remove_dangling_node(node: Any) -> PreparedUpdate:
+    """Gets prepared update to delete a dangling concept or weight node.
+
+    The node is deleted if it is a concept or a weight scale that is no
+    longer referred to. This is the counterpart of
+    get_queries_for_remove_cleanup restricted to a single node, hence its
+    cost does not depend on the size of the graph.
+
+    Args:
+        node: Node, e.g., referred to by a removed statement.
+
+    Returns:
+        Prepared update and bindings.
+    """
+    update = prepare_update(
+        """
+        DELETE {
+            ?node ?p ?o .
+        } WHERE {
+            { ?node a skos:Concept . } UNION { ?node wo:scale ?_3 . }
+            ?node ?p ?o .
+            FILTER NOT EXISTS { ?_1 ?_2 ?node . }
+        }
+        """
+    )
+    return update, {"node": node}
+
+
+def get_prepared_update_for_remove_preference_node(
+    preference_node: Any,
+) -> PreparedUpdate:
+    """Gets prepared update to remove a preference node and its weight.
+
+    The statement the preference is derived from is kept.
+
+    Args:
+        preference_node: Node of the preference.
+
+    Returns:
+        Prepared update and bindings.
+    """
+    update = prepare_update(
+        """
+        DELETE {
+            ?subject wi:preference ?preference .
+            ?preference ?p ?o .
+            ?weight_node ?weight_p ?weight_o .
+        }
+        WHERE {
+            ?subject wi:preference ?preference .
+            ?preference ?p ?o .
+            OPTIONAL {
+                ?preference wo:weight ?weight_node .
+                ?weight_node ?weight_p ?weight_o .
+            }
+        }
+        """
+    )
+    return update, {"preference": preference_node}
+
+
+def get_prepared_update_for_update_preference(
+    statement_node: Any, weight: float
+) -> PreparedUpdate:
+    """Gets prepared update to set the weight of a statement's preferences.
+
+    The preferences are the ones derived from the statement. The weight
+    value is replaced in place, hence the preference nodes and their weight
+    nodes are kept.
+
+    Args:
+        statement_node: Node of the statement.
+        weight: New weight of the preferences.
+
+    Returns:
+        Prepared update and bindings.
+    """
+    update = prepare_update(
+        f"""
+        DELETE {{
+            ?weight_node wo:weight_value ?previous_weight .
+        }}
+        INSERT {{
+            ?weight_node wo:weight_value ?weight .
+        }}
+        WHERE {{
+            ?preference pav:derivedFrom {_SPARQL_STATEMENT_VARIABLE} ;
+                wo:weight ?weight_node .
+            ?weight_node wo:scale pkg:StandardScale ;
+                wo:weight_value ?previous_weight .
+        }}
+        """
+    )
+    return update, {
+        _SPARQL_STATEMENT_VARIABLE[1:]: statement_node,
+        "weight": Literal(f"{weight}", datatype=XSD.decimal),
+    }
+
+
+def get_prepared_updates_for_remove_cleanup() -> List[PreparedUpdate]:
+    """Gets prepared updates to delete dangling concepts and weight scales.
+
+    See get_queries_for_remove_cleanup.
+
+    Returns:
+        List of prepared updates and bindings.
+    """
+    return [
+        (prepare_update(query), {})
+        for query in get_queries_for_remove_cleanup()
+    ]
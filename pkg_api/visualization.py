@@ -0,0 +1,199 @@
+"""Visualization of PKGs.
+
+Rendering the whole graph of a large PKG is slow and gives an unreadable
+image. The graph visualized is hence restricted to the neighborhood of a
+focus node, i.e., the nodes within a given number of hops of it, following
+triples in both directions, or to the first nodes of the graph if there is
+no focus node. The number of nodes is capped in both cases. Literals are
+drawn within the nodes of their subjects and do not count as nodes.
+
+The graph is converted to DOT with rdf2dot and rendered by Graphviz via
+pydotplus, which are imported on use as they are slow to import. Rendering
+may be moved to another process, e.g., by the server, with
+render_serialized_graph.
+"""
+
+import hashlib
+import io
+import itertools
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Iterable, Optional, Set, Tuple
+
+from rdflib import BNode, Graph, URIRef
+
+from pkg_api.storage.atomic_file import atomic_write
+
+DEFAULT_VISUALIZATION_DEPTH = 2
+DEFAULT_MAX_VISUALIZED_NODES = 100
+
+
+class ImageFormat(Enum):
+    """Enum for the formats of the images visualizing PKGs."""
+
+    PNG = "png"
+    SVG = "svg"
+
+
+def get_neighborhood(
+    graph: Graph,
+    focus: Optional[URIRef] = None,
+    depth: int = DEFAULT_VISUALIZATION_DEPTH,
+    max_nodes: int = DEFAULT_MAX_VISUALIZED_NODES,
+) -> Graph:
+    """Gets the subgraph of the neighborhood of a focus node.
+
+    The nodes are visited breadth-first from the focus node, hence the nodes
+    closest to it are kept if the neighborhood has more than max_nodes nodes.
+    Without focus node, the first max_nodes nodes in lexicographic order are
+    kept. The subgraph holds the triples between the kept nodes and the
+    literals of the kept nodes.
+
+    Args:
+        graph: Graph.
+        focus: Focus node. Defaults to None, i.e., no focus node.
+        depth: Maximum number of hops from the focus node. Defaults to
+          DEFAULT_VISUALIZATION_DEPTH.
+        max_nodes: Maximum number of nodes. Defaults to
+          DEFAULT_MAX_VISUALIZED_NODES.
+
+    Raises:
+        ValueError: If the depth is negative or the maximum number of nodes is
+          not strictly positive.
+
+    Returns:
+        Subgraph, sharing the namespaces of the graph.
+    """
+    if depth < 0 or max_nodes < 1:
+        raise ValueError(
+            "The depth must be positive and the maximum number of nodes "
+            "strictly positive."
+        )
+    nodes = (
+        _get_first_nodes(graph, max_nodes)
+        if focus is None
+        else _get_nearest_nodes(graph, focus, depth, max_nodes)
+    )
+    subgraph = Graph(namespace_manager=graph.namespace_manager)
+    for node in nodes:
+        for p, o in graph.predicate_objects(node):
+            if not _is_node(o) or o in nodes:
+                subgraph.add((node, p, o))
+    return subgraph
+
+
+def _get_first_nodes(graph: Graph, max_nodes: int) -> Set[Any]:
+    """Gets the first nodes of a graph in lexicographic order.
+
+    Args:
+        graph: Graph.
+        max_nodes: Maximum number of nodes.
+
+    Returns:
+        Set of nodes.
+    """
+    nodes = {term for s, _, o in graph for term in (s, o) if _is_node(term)}
+    return set(sorted(nodes, key=str)[:max_nodes])
+
+
+def _get_nearest_nodes(
+    graph: Graph, focus: URIRef, depth: int, max_nodes: int
+) -> Set[Any]:
+    """Gets the nodes nearest to a focus node, visited breadth-first.
+
+    Args:
+        graph: Graph.
+        focus: Focus node.
+        depth: Maximum number of hops from the focus node.
+        max_nodes: Maximum number of nodes.
+
+    Returns:
+        Set of nodes.
+    """
+    nodes: Set[Any] = {focus}
+    frontier: Deque[Tuple[Any, int]] = deque([(focus, 0)])
+    while frontier and len(nodes) < max_nodes:
+        node, distance = frontier.popleft()
+        if distance == depth:
+            continue
+        neighbors = itertools.chain(
+            filter(_is_node, graph.objects(node)), graph.subjects(None, node)
+        )
+        for neighbor in neighbors:
+            if len(nodes) == max_nodes:
+                break
+            if neighbor not in nodes:
+                nodes.add(neighbor)
+                frontier.append((neighbor, distance + 1))
+    return nodes
+
+
+def get_content_digest(graph: Graph) -> str:
+    """Gets the digest of the triples of a graph.
+
+    Args:
+        graph: Graph.
+
+    Returns:
+        Hexadecimal digest, identical for graphs with the same triples.
+    """
+    triples: Iterable[Tuple[Any, Any, Any]] = graph
+    digest = hashlib.sha256()
+    for line in sorted(f"{s.n3()} {p.n3()} {o.n3()}" for s, p, o in triples):
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def render_graph(graph: Graph, path: str, image_format: ImageFormat) -> str:
+    """Renders a graph to an image file.
+
+    The image replaces the file atomically, such that readers never see a
+    partially written image.
+
+    Args:
+        graph: Graph.
+        path: Path to the image file.
+        image_format: Format of the image.
+
+    Returns:
+        Path to the image file.
+    """
+    # Imported on use, as they are only needed for rendering.
+    import pydotplus
+    from rdflib.tools.rdf2dot import rdf2dot
+
+    stream = io.StringIO()
+    rdf2dot(graph, stream)
+    dot_graph = pydotplus.graph_from_dot_data(stream.getvalue())
+    image = dot_graph.create(format=image_format.value)
+    with atomic_write(path) as image_file:
+        image_file.write(image)
+    return path
+
+
+def render_serialized_graph(
+    data: str, path: str, image_format: ImageFormat
+) -> str:
+    """Renders a graph serialized in Turtle to an image file.
+
+    Graphs are sent serialized to the processes rendering them, see
+    PKG.submit_visualization. Turtle keeps the prefixes of the namespaces,
+    which are used to abbreviate the URIs drawn.
+
+    Args:
+        data: Graph serialized in Turtle.
+        path: Path to the image file.
+        image_format: Format of the image.
+
+    Returns:
+        Path to the image file.
+    """
+    return render_graph(
+        Graph().parse(data=data, format="turtle"), path, image_format
+    )
+
+
+def _is_node(term: Any) -> bool:
+    """Checks whether a term is drawn as a node, i.e., is not a literal."""
+    return isinstance(term, (URIRef, BNode))
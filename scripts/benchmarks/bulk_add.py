@@ -0,0 +1,65 @@
+"""Benchmarks adding statements one by one and in batches.
+
+The one-by-one path mirrors the server, which saves the PKG after adding
+each statement. The batched path adds all the statements with
+PKG.add_statements and saves the PKG once.
+
+Usage:
+    python -m scripts.benchmarks.bulk_add --size 500 --batch-sizes 1 10 50
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+from pkg_api.connector import RDFStore
+from pkg_api.pkg import PKG
+from scripts.benchmarks.synthetic_pkg import OWNER_URI, generate_statements
+
+
+def benchmark(size: int, batch_sizes: List[int]) -> None:
+    """Prints the time to add statements one by one and in batches.
+
+    Args:
+        size: Number of statements to add.
+        batch_sizes: Batch sizes of the batched path.
+    """
+    statements = generate_statements(size)
+    print(f"{'method':>20} {'time (s)':>9} {'statements/s':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        pkg = PKG(
+            OWNER_URI, RDFStore.MEMORY, os.path.join(directory, "one_by_one")
+        )
+        start = time.perf_counter()
+        for statement in statements:
+            pkg.add_statement(statement)
+            pkg.save()
+        elapsed = time.perf_counter() - start
+        print(f"{'add_statement':>20} {elapsed:>9.3f} {size / elapsed:>13.1f}")
+
+        for batch_size in batch_sizes:
+            pkg = PKG(
+                OWNER_URI,
+                RDFStore.MEMORY,
+                os.path.join(directory, f"batch_{batch_size}"),
+            )
+            start = time.perf_counter()
+            pkg.add_statements(statements, batch_size=batch_size)
+            pkg.save()
+            elapsed = time.perf_counter() - start
+            print(
+                f"{f'add_statements({batch_size})':>20} {elapsed:>9.3f} "
+                f"{size / elapsed:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 10, 50]
+    )
+    args = parser.parse_args()
+    benchmark(args.size, args.batch_sizes)
@@ -0,0 +1,74 @@
+"""Benchmarks the size and load time of PKGs for each naming of concepts.
+
+With content-addressed concepts, the identical concepts of different
+statements are stored once. The PKGs are saved as Turtle and loaded again,
+which is dominated by parsing.
+
+Usage:
+    python -m scripts.benchmarks.concept_nodes --sizes 1000 10000 50000
+"""
+
+import argparse
+import os
+import tempfile
+from typing import List
+
+from rdflib import RDF, SKOS
+
+from pkg_api.connector import Connector, RDFStore
+from pkg_api.pkg import ConceptNodes
+from scripts.benchmarks.snapshot_load import best_time
+from scripts.benchmarks.synthetic_pkg import (
+    OWNER_URI,
+    generate_statements,
+    populate_graph,
+)
+
+
+def benchmark(sizes: List[int], repeat: int) -> None:
+    """Prints the size and load time of PKGs of different sizes.
+
+    Args:
+        sizes: Numbers of statements of the benchmarked PKGs.
+        repeat: Number of runs for each measurement.
+    """
+    print(
+        f"{'statements':>10} {'concepts':>18} {'nodes':>8} {'triples':>9} "
+        f"{'size (MB)':>10} {'open (s)':>9}"
+    )
+    for size in sizes:
+        statements = generate_statements(size)
+        with tempfile.TemporaryDirectory() as directory:
+            for concept_nodes in ConceptNodes:
+                path = os.path.join(directory, concept_nodes.name)
+                connector = Connector(OWNER_URI, RDFStore.MEMORY, path)
+                populate_graph(
+                    connector._graph,
+                    statements,
+                    content_addressed_concepts=(
+                        concept_nodes == ConceptNodes.CONTENT_ADDRESSED
+                    ),
+                )
+                connector.save_graph()
+                concepts = len(
+                    set(connector._graph.subjects(RDF.type, SKOS.Concept))
+                )
+                file_size = os.path.getsize(f"{path}.ttl") / 1e6
+                open_time = best_time(
+                    lambda: Connector(OWNER_URI, RDFStore.MEMORY, path), repeat
+                )
+                print(
+                    f"{size:>10} {concept_nodes.value:>18} {concepts:>8} "
+                    f"{len(connector._graph):>9} {file_size:>10.2f} "
+                    f"{open_time:>9.3f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 50000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.repeat)
@@ -0,0 +1,61 @@
+"""Benchmarks retrieving statements from PKGs of increasing size.
+
+All the statements of the synthetic PKGs share the owner as subject, hence
+retrieving the statements with the owner as subject returns all of them.
+
+Usage:
+    python -m scripts.benchmarks.get_statements --sizes 1000 10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from typing import List
+
+from pkg_api.connector import RDFStore
+from pkg_api.core.pkg_types import PKGData, Triple, TripleElement
+from pkg_api.pkg import PKG
+from scripts.benchmarks.synthetic_pkg import (
+    OWNER_URI,
+    generate_statements,
+    populate_graph,
+)
+
+
+def benchmark(sizes: List[int], number: int) -> None:
+    """Prints the time to retrieve all the statements of PKGs.
+
+    Args:
+        sizes: Numbers of statements of the benchmarked PKGs.
+        number: Number of measurements per PKG, the best one is reported.
+    """
+    pkg_data = PKGData(
+        id=uuid.uuid1(),
+        statement="",
+        triple=Triple(subject=TripleElement("I", OWNER_URI)),
+    )
+    print(f"{'statements':>10} {'time (s)':>9} {'statements/s':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            pkg = PKG(
+                OWNER_URI, RDFStore.MEMORY, os.path.join(directory, str(size))
+            )
+            populate_graph(pkg._connector._graph, generate_statements(size))
+            times = []
+            for _ in range(number):
+                start = time.perf_counter()
+                statements = pkg.get_statements(pkg_data)
+                times.append(time.perf_counter() - start)
+            assert len(statements) == size
+            elapsed = min(times)
+            print(f"{size:>10} {elapsed:>9.3f} {size / elapsed:>13.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.number)
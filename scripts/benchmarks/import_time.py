@@ -0,0 +1,100 @@
+"""Benchmarks the time to import the modules of the PKG API.
+
+Each module is imported in a fresh interpreter with -X importtime, which
+reports the time spent importing every module, itself included. The
+cumulative time of the module and of its slowest imports are printed.
+
+Usage:
+    python -m scripts.benchmarks.import_time --modules pkg_api.pkg
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+DEFAULT_MODULES = [
+    "pkg_api.pkg",
+    "pkg_api.nl_to_pkg",
+    "pkg_api.nl_to_pkg.eval_nl_to_pkg",
+    "pkg_api.server",
+]
+
+# Line of the -X importtime report: self and cumulative times in
+# microseconds, and the module name indented by its import depth.
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def get_import_times(module: str) -> Dict[str, int]:
+    """Gets the cumulative import time of a module and of its imports.
+
+    Args:
+        module: Name of the module.
+
+    Raises:
+        RuntimeError: If the module cannot be imported.
+
+    Returns:
+        Dictionary mapping the names of the imported modules to their
+        cumulative import time in microseconds.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Could not import {module}:\n{process.stderr}")
+    imports = []
+    for line in process.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match is not None:
+            imports.append(
+                (match.group(4), int(match.group(2)), len(match.group(3)))
+            )
+
+    # The imports of a module are reported right before it, more indented.
+    # The modules imported at startup, e.g., site, are left out.
+    index = max(i for i, (name, _, _) in enumerate(imports) if name == module)
+    _, module_time, module_depth = imports[index]
+    import_times = {module: module_time}
+    for name, time, depth in reversed(imports[:index]):
+        if depth <= module_depth:
+            break
+        import_times[name] = time
+    return import_times
+
+
+def benchmark(modules: List[str], repeat: int, top: int) -> None:
+    """Prints the import times of modules and of their slowest imports.
+
+    Args:
+        modules: Names of the benchmarked modules.
+        repeat: Number of runs for each module.
+        top: Number of slowest imports printed for each module.
+    """
+    for module in modules:
+        runs = [get_import_times(module) for _ in range(repeat)]
+        import_times = min(runs, key=lambda times: times[module])
+        print(f"{module}: {import_times[module] / 1e6:.3f} s")
+        # Top-level packages only, their submodules are included.
+        packages = sorted(
+            (
+                (time, name)
+                for name, time in import_times.items()
+                if "." not in name and name != module
+            ),
+            reverse=True,
+        )
+        for time, name in packages[:top]:
+            print(f"  {name:<30} {time / 1e6:>8.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+    benchmark(args.modules, args.repeat, args.top)
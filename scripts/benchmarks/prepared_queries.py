@@ -0,0 +1,121 @@
+"""Benchmarks the per-call overhead of regular and prepared SPARQL queries.
+
+Regular queries are formatted, cleaned, parsed, and compiled on each call,
+while prepared queries are compiled once and executed with bindings.
+
+Usage:
+    python -m scripts.benchmarks.prepared_queries --size 1000 --number 100
+"""
+
+import argparse
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+import pkg_api.utils as utils
+from pkg_api.connector import Connector, RDFStore
+from pkg_api.core.pkg_types import URI, Triple, TripleElement
+from scripts.benchmarks.synthetic_pkg import (
+    OWNER_URI,
+    generate_statements,
+    populate_graph,
+)
+
+
+def _execute(connector: Connector, *query: Any) -> None:
+    """Executes a query, possibly with bindings, and consumes its results."""
+    list(connector.execute_sparql_query(*query))
+
+
+def _update(connector: Connector, updates: List[Tuple[Any, ...]]) -> None:
+    """Executes updates, possibly with bindings, one after the other."""
+    for update in updates:
+        connector.execute_sparql_update(*update)
+
+
+def get_cases(
+    connector: Connector,
+) -> Dict[str, Tuple[Callable[[], Any], Callable[[], Any]]]:
+    """Returns the regular and prepared variants of each benchmarked call.
+
+    Args:
+        connector: Connector to the benchmarked PKG.
+
+    Returns:
+        Dictionary mapping the name of each case to its regular and prepared
+        variants.
+    """
+    topic = URI("http://dbpedia.org/resource/Place_0")
+    triple = Triple(
+        subject=TripleElement("I", OWNER_URI),
+        predicate=TripleElement("live", "live"),
+        object=TripleElement("Place", topic),
+    )
+    return {
+        "get preference": (
+            lambda: _execute(
+                connector,
+                utils.get_query_for_conditioned_get_preference(
+                    OWNER_URI, topic
+                ),
+            ),
+            lambda: _execute(
+                connector,
+                *utils.get_prepared_query_for_conditioned_get_preference(
+                    OWNER_URI, topic
+                ),
+            ),
+        ),
+        "get statements": (
+            lambda: _execute(
+                connector,
+                utils.get_query_for_conditional_get_statements(triple),
+            ),
+            lambda: _execute(
+                connector,
+                *utils.get_prepared_query_for_conditional_get_statements(
+                    triple
+                ),
+            ),
+        ),
+        "remove cleanup": (
+            lambda: _update(
+                connector,
+                [(query,) for query in utils.get_queries_for_remove_cleanup()],
+            ),
+            lambda: _update(
+                connector, utils.get_prepared_updates_for_remove_cleanup()
+            ),
+        ),
+    }
+
+
+def benchmark(size: int, number: int) -> None:
+    """Prints the time per call of regular and prepared queries.
+
+    Args:
+        size: Number of statements of the benchmarked PKG.
+        number: Number of calls per measurement.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        connector = Connector(OWNER_URI, RDFStore.MEMORY, f"{directory}/pkg")
+        populate_graph(connector._graph, generate_statements(size))
+        print(f"{'query':>15} {'regular (ms)':>13} {'prepared (ms)':>14}")
+        for name, (regular, prepared) in get_cases(connector).items():
+            # Warm up, e.g., the cache of prepared queries.
+            regular()
+            prepared()
+            regular_time = timeit.timeit(regular, number=number) / number
+            prepared_time = timeit.timeit(prepared, number=number) / number
+            print(
+                f"{name:>15} {regular_time * 1000:>13.3f} "
+                f"{prepared_time * 1000:>14.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+    benchmark(args.size, args.number)
@@ -0,0 +1,101 @@
+"""Benchmarks removing statements from PKGs of increasing size.
+
+PKG.remove_statement only garbage-collects the concepts and weights referred
+to by the removed statement. It is compared to the removal of the statement
+followed by the cleanup of all the dangling concepts and weight scales of the
+graph, which was done before.
+
+Usage:
+    python -m scripts.benchmarks.remove_statement --sizes 1000 5000 10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable, List
+
+from rdflib.term import Variable
+
+import pkg_api.utils as utils
+from pkg_api.connector import RDFStore
+from pkg_api.core.pkg_types import PKGData
+from pkg_api.pkg import PKG
+from scripts.benchmarks.synthetic_pkg import (
+    OWNER_URI,
+    generate_statements,
+    populate_graph,
+)
+
+
+def _remove_with_full_cleanup(pkg: PKG, pkg_data: PKGData) -> None:
+    """Removes a statement and cleans up the whole graph."""
+    query = utils.get_query_for_get_statements_to_remove(pkg_data)
+    for row in pkg._connector.execute_sparql_query(query).bindings:
+        pkg._connector.execute_sparql_update(
+            *utils.get_prepared_update_for_remove_statement_node(
+                row.get(Variable("statement"))
+            )
+        )
+    for prepared_update in utils.get_prepared_updates_for_remove_cleanup():
+        pkg._connector.execute_sparql_update(*prepared_update)
+
+
+def _time_removals(
+    directory: str,
+    size: int,
+    number: int,
+    remove: Callable[[PKG, PKGData], Any],
+) -> float:
+    """Returns the mean time to remove statements from a PKG.
+
+    Args:
+        directory: Directory of the PKG.
+        size: Number of statements of the PKG.
+        number: Number of statements to remove.
+        remove: Function removing a statement from a PKG.
+
+    Returns:
+        Mean time per removal in seconds.
+    """
+    statements = generate_statements(size)
+    pkg = PKG(
+        OWNER_URI, RDFStore.MEMORY, os.path.join(directory, f"pkg_{size}")
+    )
+    populate_graph(pkg._connector._graph, statements)
+    start = time.perf_counter()
+    for pkg_data in statements[:number]:
+        remove(pkg, pkg_data)
+    return (time.perf_counter() - start) / number
+
+
+def benchmark(sizes: List[int], number: int) -> None:
+    """Prints the time to remove a statement from PKGs of increasing size.
+
+    Args:
+        sizes: Numbers of statements of the benchmarked PKGs.
+        number: Number of statements removed from each PKG.
+    """
+    print(f"{'statements':>10} {'targeted (ms)':>14} {'full cleanup (ms)':>18}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            targeted = _time_removals(
+                directory, size, number, PKG.remove_statement
+            )
+            full_cleanup = _time_removals(
+                directory, size, number, _remove_with_full_cleanup
+            )
+            print(
+                f"{size:>10} {targeted * 1000:>14.2f} "
+                f"{full_cleanup * 1000:>18.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 5000, 10000]
+    )
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.number)
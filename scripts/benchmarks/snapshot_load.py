@@ -0,0 +1,85 @@
+"""Benchmarks the time to open and save a PKG for each snapshot format.
+
+Usage:
+    python -m scripts.benchmarks.snapshot_load --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, List
+
+from pkg_api.connector import Connector, RDFStore, SnapshotFormat
+from scripts.benchmarks.synthetic_pkg import (
+    OWNER_URI,
+    generate_statements,
+    populate_graph,
+)
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    """Returns the best execution time of a function over several runs.
+
+    Args:
+        function: Function to time.
+        repeat: Number of runs.
+
+    Returns:
+        Best execution time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(sizes: List[int], repeat: int) -> None:
+    """Prints the open and save times of PKGs of different sizes.
+
+    Args:
+        sizes: Numbers of statements of the benchmarked PKGs.
+        repeat: Number of runs for each measurement.
+    """
+    print(
+        f"{'statements':>10} {'triples':>9} {'format':>7} {'size (MB)':>10} "
+        f"{'save (s)':>9} {'open (s)':>9}"
+    )
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            for snapshot_format in SnapshotFormat:
+                path = os.path.join(directory, snapshot_format.value)
+                connector = Connector(
+                    OWNER_URI,
+                    RDFStore.MEMORY,
+                    path,
+                    snapshot_format=snapshot_format,
+                )
+                populate_graph(connector._graph, generate_statements(size))
+                save_time = best_time(connector.save_graph, repeat)
+                extension = (
+                    "pkgb"
+                    if snapshot_format == SnapshotFormat.BINARY
+                    else "ttl"
+                )
+                file_size = os.path.getsize(f"{path}.{extension}") / 1e6
+                open_time = best_time(
+                    lambda: Connector(OWNER_URI, RDFStore.MEMORY, path), repeat
+                )
+                print(
+                    f"{size:>10} {len(connector._graph):>9} "
+                    f"{snapshot_format.value:>7} {file_size:>10.2f} "
+                    f"{save_time:>9.3f} {open_time:>9.3f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.repeat)
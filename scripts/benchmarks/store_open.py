@@ -0,0 +1,76 @@
+"""Benchmarks opening a PKG and persisting an update for each triplestore.
+
+The in-memory store parses the whole Turtle file on open and re-serializes it
+on save, while BerkeleyDB and SQLite open the store on disk and commit
+incrementally. BerkeleyDB is skipped if the berkeleydb package is not installed.
+
+Usage:
+    python -m scripts.benchmarks.store_open --sizes 1000 10000 100000
+"""
+
+import argparse
+import importlib.util
+import os
+import tempfile
+import time
+from typing import List
+
+from pkg_api.connector import Connector, RDFStore
+from scripts.benchmarks.synthetic_pkg import (
+    OWNER_URI,
+    generate_statements,
+    populate_graph,
+)
+
+UPDATE = "INSERT DATA { ex:benchmark ex:p ex:o . }"
+
+
+def benchmark(sizes: List[int], repeat: int) -> None:
+    """Prints the open and update times of PKGs of different sizes.
+
+    Args:
+        sizes: Numbers of statements of the benchmarked PKGs.
+        repeat: Number of runs for each measurement.
+    """
+    rdf_stores = [RDFStore.MEMORY, RDFStore.SQLITE]
+    if importlib.util.find_spec("berkeleydb") is not None:
+        rdf_stores.append(RDFStore.BERKELEYDB)
+    else:
+        print("berkeleydb is not installed, skipping BerkeleyDB.")
+
+    print(
+        f"{'statements':>10} {'store':>10} {'open (s)':>9} "
+        f"{'update (s)':>10}"
+    )
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            for rdf_store in rdf_stores:
+                path = os.path.join(directory, rdf_store.value)
+                connector = Connector(OWNER_URI, rdf_store, path)
+                populate_graph(connector._graph, generate_statements(size))
+                connector.close()
+
+                open_times, update_times = [], []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    connector = Connector(OWNER_URI, rdf_store, path)
+                    open_times.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    connector.execute_sparql_update(UPDATE)
+                    connector.save_graph()
+                    update_times.append(time.perf_counter() - start)
+                    connector.close()
+                print(
+                    f"{size:>10} {rdf_store.value:>10} "
+                    f"{min(open_times):>9.3f} {min(update_times):>10.3f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.repeat)
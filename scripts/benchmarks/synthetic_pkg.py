@@ -0,0 +1,124 @@
+"""Generation of synthetic PKGs for benchmarks.
+
+Statements follow the shape of the statements extracted from natural
+language: the owner likes or dislikes a concept related to an entity, or
+lives in a place.
+"""
+
+import datetime
+import random
+import uuid
+from typing import List
+
+from rdflib import Graph
+
+from pkg_api.core.pkg_types import (
+    URI,
+    Concept,
+    PKGData,
+    Preference,
+    Triple,
+    TripleElement,
+)
+from pkg_api.triple_builder import get_triples_for_add_statement
+
+OWNER_URI = URI("http://example.com/benchmarkuser")
+
+_PREDICATES = ["like", "dislike", "enjoy", "hate"]
+_FIRST_AUTHORED_ON = datetime.datetime(2024, 2, 5, 13, 54, 32)
+_TOPICS = ["movies", "books", "songs", "restaurants", "podcasts", "games"]
+
+
+def generate_statements(n: int, seed: int = 0) -> List[PKGData]:
+    """Generates synthetic statements.
+
+    Args:
+        n: Number of statements.
+        seed: Seed of the random generator. Defaults to 0.
+
+    Returns:
+        List of statements.
+    """
+    rng = random.Random(seed)
+    statements = []
+    for i in range(n):
+        # Statements are authored one minute apart.
+        authored_on = (
+            _FIRST_AUTHORED_ON + datetime.timedelta(minutes=i)
+        ).isoformat()
+        if i % 10 == 0:
+            place = f"Place_{rng.randrange(n)}"
+            statements.append(
+                PKGData(
+                    id=uuid.UUID(int=rng.getrandbits(128)),
+                    statement=f"I live in {place}.",
+                    triple=Triple(
+                        TripleElement("I", OWNER_URI),
+                        TripleElement("live", "live"),
+                        TripleElement(
+                            place, URI(f"http://dbpedia.org/resource/{place}")
+                        ),
+                    ),
+                    logging_data={
+                        "authoredBy": OWNER_URI,
+                        "authoredOn": authored_on,
+                    },
+                )
+            )
+            continue
+
+        predicate = rng.choice(_PREDICATES)
+        entity = f"Entity_{rng.randrange(n)}"
+        description = f"{rng.choice(_TOPICS)} with {entity}"
+        _object = TripleElement(
+            description,
+            Concept(
+                description=description,
+                related_entities=[URI(f"http://dbpedia.org/resource/{entity}")],
+            ),
+        )
+        statements.append(
+            PKGData(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                statement=f"I {predicate} {description}.",
+                triple=Triple(
+                    TripleElement("I", OWNER_URI),
+                    TripleElement(predicate, Concept(description=predicate)),
+                    _object,
+                ),
+                preference=Preference(
+                    _object, 1.0 if predicate in ("like", "enjoy") else -1.0
+                ),
+                logging_data={
+                    "authoredBy": OWNER_URI,
+                    "authoredOn": authored_on,
+                },
+            )
+        )
+    return statements
+
+
+def populate_graph(
+    graph: Graph,
+    statements: List[PKGData],
+    content_addressed_concepts: bool = False,
+) -> None:
+    """Adds the triples of statements to a graph without SPARQL.
+
+    Preferences are included, as when adding statements with PKG.
+
+    Args:
+        graph: Graph to populate.
+        statements: Statements to add.
+        content_addressed_concepts: Whether to name concepts by their IRI.
+          Defaults to False.
+    """
+    graph.addN(
+        (s, p, o, graph)
+        for statement in statements
+        for s, p, o in get_triples_for_add_statement(
+            statement,
+            include_preference=True,
+            content_addressed_concepts=content_addressed_concepts,
+        )
+    )
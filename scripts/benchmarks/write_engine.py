@@ -0,0 +1,52 @@
+"""Benchmarks the throughput of the SPARQL and direct write engines.
+
+Both engines add the same statements with PKG.add_statements. The SPARQL
+engine formats and parses an update per batch, while the direct engine builds
+the triples as RDFLib terms and adds them to the graph.
+
+Usage:
+    python -m scripts.benchmarks.write_engine --size 1000 --batch-size 10
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from pkg_api.connector import RDFStore
+from pkg_api.pkg import PKG, WriteEngine
+from scripts.benchmarks.synthetic_pkg import OWNER_URI, generate_statements
+
+
+def benchmark(size: int, batch_size: int) -> None:
+    """Prints the time to add statements with each write engine.
+
+    Args:
+        size: Number of statements to add.
+        batch_size: Number of statements per batch.
+    """
+    statements = generate_statements(size)
+    print(f"{'engine':>8} {'time (s)':>9} {'statements/s':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for write_engine in WriteEngine:
+            pkg = PKG(
+                OWNER_URI,
+                RDFStore.MEMORY,
+                os.path.join(directory, write_engine.name),
+                write_engine=write_engine,
+            )
+            start = time.perf_counter()
+            pkg.add_statements(statements, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{write_engine.value:>8} {elapsed:>9.3f} "
+                f"{size / elapsed:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+    benchmark(args.size, args.batch_size)
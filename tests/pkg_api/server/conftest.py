@@ -17,6 +17,8 @@ def client() -> Flask:
     app = create_app(testing=True)
     client = app.test_client()
     yield client
+    # Flush and close the cached PKGs
+    app.extensions["pkg_cache"].clear()
     # Delete the test database
     os.remove(f"{app.instance_path}/test.sqlite")
     # Delete turtle files
@@ -90,6 +90,47 @@ def test_nl_processing_post_get_statement(client: Flask) -> None:
         assert isinstance(response.json["annotation"], dict)
 
 
+def test_nl_processing_post_get_statement_pages(client: Flask) -> None:
+    """Tests POST with a get statement returning several pages."""
+    owner = TripleElement("I", URI("http://example.com/test_pages"))
+    data = {
+        "owner_uri": "http://example.com/test_pages",
+        "owner_username": "test_pages",
+        "query": "What do I like?",
+    }
+    with patch("pkg_api.nl_to_pkg.nl_to_pkg.NLtoPKG.annotate") as mock_annotate:
+        for i in range(3):
+            mock_annotate.return_value = Intent.ADD, PKGData(
+                id=uuid.uuid4(),
+                statement=f"I like {i}.",
+                triple=Triple(owner, TripleElement("like", "like"), None),
+            )
+            client.post("/nl", json=data)
+
+        mock_annotate.return_value = Intent.GET, PKGData(
+            id=uuid.uuid1(),
+            statement="What do I like?",
+            triple=Triple(subject=owner),
+        )
+        ids = []
+        cursor = None
+        for _ in range(3):
+            response = client.post(
+                "/nl", json={**data, "limit": 1, "cursor": cursor}
+            )
+            assert response.status_code == 200
+            assert len(response.json["data"]) == 1
+            ids.append(response.json["data"][0]["id"])
+            cursor = response.json["next_cursor"]
+        assert cursor is None
+        assert ids == sorted(set(ids))
+
+        response = client.post("/nl", json={**data, "limit": 0})
+        assert response.status_code == 400
+        response = client.post("/nl", json={**data, "cursor": "x"})
+        assert response.status_code == 400
+
+
 def test_nl_processing_post_delete_statement(client: Flask) -> None:
     """Tests POST with a valid delete statement."""
     with patch("pkg_api.nl_to_pkg.nl_to_pkg.NLtoPKG.annotate") as mock_annotate:
@@ -0,0 +1,194 @@
+"""Tests for the cache of open PKGs."""
+
+import threading
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from pkg_api.core.pkg_types import URI
+from pkg_api.server.pkg_cache import PKGCache
+
+ALICE = URI("http://example.com/alice")
+BOB = URI("http://example.com/bob")
+CAROL = URI("http://example.com/carol")
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Returns a controllable clock used by the cache."""
+    clock = MagicMock(return_value=0.0)
+    monkeypatch.setattr("pkg_api.server.pkg_cache.time.monotonic", clock)
+    return clock
+
+
+def _get(cache: PKGCache, owner_uri: URI, factory: Any = MagicMock) -> Any:
+    """Returns the PKG of an owner, leased only for the call."""
+    with cache.lease(owner_uri, factory) as pkg:
+        return pkg
+
+
+def test_lease_reuses_open_pkg() -> None:
+    """Tests that a cached PKG is returned without reopening it."""
+    cache = PKGCache(max_size=2)
+    factory = MagicMock(side_effect=lambda: MagicMock())
+
+    with cache.lease(ALICE, factory) as pkg:
+        with cache.lease(ALICE, factory) as other_pkg:
+            assert other_pkg is pkg
+    with cache.lease(ALICE, factory) as other_pkg:
+        assert other_pkg is pkg
+    assert factory.call_count == 1
+    assert ALICE in cache
+
+
+def test_lru_eviction_closes_pkg() -> None:
+    """Tests that the least recently used PKG is flushed when evicted."""
+    cache = PKGCache(max_size=2)
+    alice_pkg = _get(cache, ALICE)
+    bob_pkg = _get(cache, BOB)
+    # Alice becomes the most recently used PKG.
+    _get(cache, ALICE)
+    _get(cache, CAROL)
+
+    assert len(cache) == 2
+    assert BOB not in cache
+    bob_pkg.close.assert_called_once()
+    alice_pkg.close.assert_not_called()
+
+
+def test_leased_pkg_not_evicted() -> None:
+    """Tests that PKGs in use are kept open even if the cache is full."""
+    cache = PKGCache(max_size=1)
+    with cache.lease(ALICE, MagicMock) as alice_pkg:
+        bob_pkg = _get(cache, BOB)
+        assert len(cache) == 2
+        alice_pkg.close.assert_not_called()
+
+        cache.evict(ALICE)
+        assert ALICE not in cache
+        alice_pkg.close.assert_not_called()
+    alice_pkg.close.assert_called_once()
+    bob_pkg.close.assert_not_called()
+
+
+def test_idle_timeout(clock: MagicMock) -> None:
+    """Tests that PKGs unused for longer than the timeout are closed."""
+    cache = PKGCache(max_size=2, idle_timeout=10.0)
+    alice_pkg = _get(cache, ALICE)
+    clock.return_value = 5.0
+    bob_pkg = _get(cache, BOB)
+    clock.return_value = 12.0
+    _get(cache, BOB)
+
+    assert ALICE not in cache
+    alice_pkg.close.assert_called_once()
+    bob_pkg.close.assert_not_called()
+
+
+def test_idle_pkg_closed_without_lease() -> None:
+    """Tests that idle PKGs are closed without waiting for another lease."""
+    cache = PKGCache(idle_timeout=0.01)
+    closed = threading.Event()
+    alice_pkg = _get(cache, ALICE)
+    alice_pkg.close.side_effect = lambda: closed.set()
+
+    assert closed.wait(5.0)
+    assert ALICE not in cache
+    cache.clear()
+
+
+def test_lease_serialized_across_threads() -> None:
+    """Tests that a PKG is leased by one thread at a time."""
+    cache = PKGCache()
+    leased = threading.Event()
+    released = threading.Event()
+    other_leased = threading.Event()
+
+    def lease_alice_pkg() -> None:
+        """Leases the PKG of Alice until released."""
+        with cache.lease(ALICE, MagicMock):
+            leased.set()
+            released.wait()
+
+    def lease_alice_pkg_again() -> None:
+        """Leases the PKG of Alice once it is available."""
+        with cache.lease(ALICE, MagicMock):
+            other_leased.set()
+
+    thread = threading.Thread(target=lease_alice_pkg)
+    thread.start()
+    leased.wait()
+    other_thread = threading.Thread(target=lease_alice_pkg_again)
+    other_thread.start()
+
+    assert not other_leased.wait(0.1)
+    released.set()
+    assert other_leased.wait(5.0)
+    thread.join()
+    other_thread.join()
+
+
+def test_evict_and_clear() -> None:
+    """Tests explicit eviction and clearing of the cache."""
+    cache = PKGCache()
+    alice_pkg = _get(cache, ALICE)
+    bob_pkg = _get(cache, BOB)
+
+    cache.evict(ALICE)
+    alice_pkg.close.assert_called_once()
+    assert ALICE not in cache
+
+    cache.clear()
+    bob_pkg.close.assert_called_once()
+    assert len(cache) == 0
+
+
+def test_concurrent_open() -> None:
+    """Tests that a PKG is opened once, without blocking other PKGs."""
+    cache = PKGCache()
+    opening = threading.Event()
+    opened = threading.Event()
+    alice_pkg = MagicMock()
+
+    def open_alice_pkg() -> MagicMock:
+        """Opens the PKG of Alice once allowed to."""
+        opening.set()
+        opened.wait()
+        return alice_pkg
+
+    pkgs = []
+    threads = [
+        threading.Thread(
+            target=lambda: pkgs.append(_get(cache, ALICE, open_alice_pkg))
+        )
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    opening.wait()
+    # The cache is not locked while the PKG of Alice is being opened.
+    _get(cache, BOB)
+    opened.set()
+    for thread in threads:
+        thread.join()
+
+    assert pkgs == [alice_pkg, alice_pkg]
+
+
+def test_open_failure() -> None:
+    """Tests that a PKG failing to open is not cached."""
+    cache = PKGCache()
+    factory = MagicMock(side_effect=OSError("Cannot read the PKG"))
+
+    with pytest.raises(OSError):
+        with cache.lease(ALICE, factory):
+            pass
+    assert ALICE not in cache
+    assert _get(cache, ALICE) is not None
+
+
+def test_invalid_size() -> None:
+    """Tests that the cache cannot be created without capacity."""
+    with pytest.raises(ValueError):
+        PKGCache(max_size=0)
@@ -1,9 +1,15 @@
 """Tests for the pkg exploration endpoints."""
 
+import json
 import os
+import time
+from typing import Any
 
+import pytest
 from flask import Flask
 
+from pkg_api.query_limits import QueryTimeoutError
+
 
 def test_pkg_exploration_endpoint_errors(client: Flask) -> None:
     """Tests /explore endpoints with invalid data."""
@@ -16,6 +22,19 @@ def test_pkg_exploration_endpoint_errors(client: Flask) -> None:
     assert response.status_code == 400
     assert response.json["message"] == "Missing owner URI"
 
+    response = client.get(
+        "/explore",
+        json={
+            "owner_uri": "http://example.com#test",
+            "owner_username": "test",
+            "format": "gif",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json["message"] == (
+        "Invalid depth, maximum number of nodes, or format."
+    )
+
     response = client.post(
         "/explore",
         json={
@@ -63,11 +82,25 @@ def test_pkg_visualization(client: Flask) -> None:
             "owner_username": "test",
         },
     )
+    if response.status_code == 202:
+        assert response.json["message"] == "PKG visualization started."
+        job_url = f"/explore/jobs/{response.json['job_id']}"
+        deadline = time.monotonic() + 60
+        while response.status_code == 202 and time.monotonic() < deadline:
+            time.sleep(0.1)
+            response = client.get(job_url)
     assert response.status_code == 200
     assert response.json["message"] == "PKG visualized successfully."
     assert response.json["img_path"] == "tests/data/pkg_visualizations/test.png"
 
 
+def test_pkg_visualization_unknown_job(client: Flask) -> None:
+    """Tests the GET /explore/jobs endpoint with an unknown job."""
+    response = client.get("/explore/jobs/unknown")
+    assert response.status_code == 404
+    assert response.json["message"] == "Unknown visualization job."
+
+
 def test_pkg_sparql_query(client: Flask) -> None:
     """Tests the POST /explore endpoint."""
     if not os.path.exists("tests/data/RDFStore/"):
@@ -85,4 +118,98 @@ def test_pkg_sparql_query(client: Flask) -> None:
         },
     )
     assert response.status_code == 200
-    assert response.json["message"] == "SPARQL query executed successfully."
+    assert response.mimetype == "application/sparql-results+json"
+    assert response.json["head"] == {"vars": ["statement"]}
+    assert isinstance(response.json["results"]["bindings"], list)
+
+
+def test_pkg_sparql_query_ndjson(client: Flask) -> None:
+    """Tests the POST /explore endpoint with NDJSON results and a limit."""
+    if not os.path.exists("tests/data/RDFStore/"):
+        os.makedirs("tests/data/RDFStore/", exist_ok=True)
+    response = client.post(
+        "/explore",
+        json={
+            "owner_uri": "http://example.com#test",
+            "owner_username": "test",
+            "sparql_query": "SELECT ?s ?o WHERE { ?s a ?o . }",
+            "format": "ndjson",
+            "limit": 1,
+        },
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"head": {"vars": ["s", "o"]}}
+    assert len(lines) <= 2
+
+
+def test_pkg_sparql_query_errors(client: Flask) -> None:
+    """Tests the POST /explore endpoint with invalid queries and limits."""
+    data = {
+        "owner_uri": "http://example.com#test",
+        "owner_username": "test",
+    }
+    response = client.post("/explore", json=data)
+    assert response.status_code == 400
+    assert response.json["message"] == "Missing SPARQL query"
+
+    response = client.post(
+        "/explore",
+        json={**data, "sparql_query": 'ASK { ?s ?p "SELECT" . }'},
+    )
+    assert response.status_code == 400
+    assert (
+        response.json["message"]
+        == "Operation is not supported. Provide SPARQL select query."
+    )
+
+    response = client.post(
+        "/explore", json={**data, "sparql_query": "SELECT ?s WHERE {"}
+    )
+    assert response.status_code == 400
+    assert response.json["message"].startswith("Invalid SPARQL query")
+
+    response = client.post(
+        "/explore",
+        json={
+            **data,
+            "sparql_query": "SELECT ?s WHERE { ?s ?p ?o . }",
+            "limit": 0,
+        },
+    )
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid limit or format."
+
+
+def test_pkg_sparql_query_limits(
+    client: Flask, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests the POST /explore endpoint with unbounded and slow queries."""
+    data = {
+        "owner_uri": "http://example.com#test",
+        "owner_username": "test",
+    }
+    response = client.post(
+        "/explore",
+        json={**data, "sparql_query": "SELECT * WHERE { ?a ?p ?b . ?c ?q ?d }"},
+    )
+    assert response.status_code == 400
+    assert "cartesian product" in response.json["message"]
+
+    def mock_execute_query_with_timeout(*args: Any) -> None:
+        """Mock function timing out."""
+        raise QueryTimeoutError("The query did not complete within 10 seconds.")
+
+    monkeypatch.setattr(
+        "pkg_api.connector.execute_query_with_timeout",
+        mock_execute_query_with_timeout,
+    )
+    response = client.post(
+        "/explore",
+        json={**data, "sparql_query": "SELECT * WHERE { ?s ?p ?o . }"},
+    )
+    assert response.status_code == 503
+    assert response.json["message"] == (
+        "The query did not complete within 10 seconds."
+    )
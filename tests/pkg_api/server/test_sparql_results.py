@@ -0,0 +1,59 @@
+"""Tests for the streamed serialization of SPARQL results."""
+
+import json
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import XSD
+
+from pkg_api.server.sparql_results import (
+    ResultsFormat,
+    get_term_json,
+    iter_results,
+)
+
+
+@pytest.mark.parametrize(
+    "term,term_json",
+    [
+        (
+            URIRef("http://example.com/s"),
+            {"type": "uri", "value": "http://example.com/s"},
+        ),
+        (BNode("b0"), {"type": "bnode", "value": "b0"}),
+        (Literal("pizza"), {"type": "literal", "value": "pizza"}),
+        (
+            Literal("pizza", lang="en"),
+            {"type": "literal", "value": "pizza", "xml:lang": "en"},
+        ),
+        (
+            Literal(1),
+            {"type": "literal", "value": "1", "datatype": str(XSD.integer)},
+        ),
+    ],
+)
+def test_get_term_json(term: object, term_json: dict) -> None:
+    """Tests the SPARQL JSON representation of RDF terms."""
+    assert get_term_json(term) == term_json
+
+
+@pytest.mark.parametrize("results_format", list(ResultsFormat))
+def test_iter_results(results_format: ResultsFormat) -> None:
+    """Tests that both formats hold the head and the bindings of the rows."""
+    graph = Graph()
+    graph.parse(
+        data="<http://example.com/s> <http://example.com/p> 1 , 2 .",
+        format="turtle",
+    )
+    result = graph.query("SELECT ?o ?unbound WHERE { ?s ?p ?o . } ORDER BY ?o")
+    text = "".join(iter_results(result, results_format))
+
+    if results_format == ResultsFormat.JSON:
+        results = json.loads(text)
+        head, bindings = results["head"], results["results"]["bindings"]
+    else:
+        head, *bindings = [json.loads(line) for line in text.splitlines()]
+        head = head["head"]
+    assert head == {"vars": ["o", "unbound"]}
+    assert [row["o"]["value"] for row in bindings] == ["1", "2"]
+    assert all("unbound" not in row for row in bindings)
@@ -0,0 +1,48 @@
+"""Tests for the background rendering of PKG visualizations."""
+
+from concurrent.futures import Future
+
+import pytest
+
+from pkg_api.server.visualization_jobs import JobStatus, VisualizationJobs
+
+
+def test_job_status() -> None:
+    """Tests the statuses of pending, done, and failed jobs."""
+    jobs = VisualizationJobs()
+    future: "Future[str]" = Future()
+    job_id = jobs.add(future)
+    assert jobs.add(future) == job_id
+    assert jobs.get_status(job_id) == (JobStatus.PENDING, None)
+
+    future.set_result("image.png")
+    assert jobs.get_status(job_id) == (JobStatus.DONE, "image.png")
+
+    failed_future: "Future[str]" = Future()
+    failed_future.set_exception(OSError("GraphViz's executables not found"))
+    assert jobs.get_status(jobs.add(failed_future)) == (
+        JobStatus.FAILED,
+        "GraphViz's executables not found",
+    )
+    assert jobs.get_status("unknown") is None
+
+
+def test_forget_finished_jobs() -> None:
+    """Tests that only the oldest finished jobs are forgotten."""
+    jobs = VisualizationJobs(max_jobs=2)
+    pending_future: "Future[str]" = Future()
+    pending_job_id = jobs.add(pending_future)
+    done_future: "Future[str]" = Future()
+    done_future.set_result("image.png")
+    done_job_id = jobs.add(done_future)
+    last_job_id = jobs.add(Future())
+
+    assert jobs.get_status(pending_job_id) == (JobStatus.PENDING, None)
+    assert jobs.get_status(done_job_id) is None
+    assert jobs.get_status(last_job_id) == (JobStatus.PENDING, None)
+
+
+def test_invalid_size() -> None:
+    """Tests that the registry cannot be created without workers."""
+    with pytest.raises(ValueError):
+        VisualizationJobs(max_workers=0)
@@ -0,0 +1,46 @@
+"""Tests for the crash-safe replacement of files."""
+
+import os
+
+import pytest
+
+from pkg_api.storage.atomic_file import atomic_write
+
+
+def test_atomic_write(tmp_path: str) -> None:
+    """Tests that the file is replaced by the new content."""
+    path = os.path.join(tmp_path, "testuser.ttl")
+    with open(path, "w") as f:
+        f.write("previous")
+
+    with atomic_write(path, mode="w") as f:
+        f.write("new")
+        with open(path) as reader:
+            assert reader.read() == "previous"
+
+    with open(path) as f:
+        assert f.read() == "new"
+    assert os.listdir(tmp_path) == ["testuser.ttl"]
+
+
+def test_atomic_write_failure(tmp_path: str) -> None:
+    """Tests that the file is left intact if writing fails."""
+    path = os.path.join(tmp_path, "testuser.ttl")
+    with open(path, "w") as f:
+        f.write("previous")
+
+    with pytest.raises(ValueError):
+        with atomic_write(path, mode="w") as f:
+            f.write("truncated")
+            raise ValueError()
+
+    with open(path) as f:
+        assert f.read() == "previous"
+    assert os.listdir(tmp_path) == ["testuser.ttl"]
+
+
+def test_atomic_write_missing_directory(tmp_path: str) -> None:
+    """Tests that writing to a missing directory fails."""
+    with pytest.raises(FileNotFoundError):
+        with atomic_write(os.path.join(tmp_path, "missing", "testuser.ttl")):
+            pass
@@ -0,0 +1,57 @@
+"""Tests for the binary snapshot."""
+
+import os
+
+import pytest
+from rdflib import XSD, BNode, Graph, Literal, URIRef
+
+from pkg_api.storage.binary_snapshot import (
+    load_binary_snapshot,
+    write_binary_snapshot,
+)
+
+EX = "http://example.com#"
+
+
+def test_round_trip(tmp_path: str) -> None:
+    """Tests that all kinds of terms are restored identically."""
+    concept = BNode()
+    graph = Graph()
+    graph.add((URIRef(f"{EX}s"), URIRef(f"{EX}object"), concept))
+    graph.add((concept, URIRef(f"{EX}description"), Literal("films")))
+    graph.add((concept, URIRef(f"{EX}label"), Literal("film", lang="en")))
+    graph.add(
+        (
+            URIRef(f"{EX}s"),
+            URIRef(f"{EX}weight"),
+            Literal(0.5, datatype=XSD.decimal),
+        )
+    )
+    graph.add(
+        (URIRef(f"{EX}s"), URIRef(f"{EX}note"), Literal('multi\nline "ø"'))
+    )
+    path = os.path.join(tmp_path, "testuser.pkgb")
+
+    write_binary_snapshot(graph, path)
+    restored = Graph()
+    load_binary_snapshot(restored, path)
+
+    assert set(restored) == set(graph)
+
+
+def test_empty_graph(tmp_path: str) -> None:
+    """Tests the snapshot of an empty graph."""
+    path = os.path.join(tmp_path, "testuser.pkgb")
+    write_binary_snapshot(Graph(), path)
+    restored = Graph()
+    load_binary_snapshot(restored, path)
+    assert len(restored) == 0
+
+
+def test_invalid_file(tmp_path: str) -> None:
+    """Tests loading a file that is not a binary snapshot."""
+    path = os.path.join(tmp_path, "testuser.pkgb")
+    with open(path, "w") as f:
+        f.write("@prefix ex: <http://example.com#> . ex:s ex:p ex:o .")
+    with pytest.raises(ValueError):
+        load_binary_snapshot(Graph(), path)
@@ -0,0 +1,42 @@
+"""Tests for the reader/writer lock on a lock file."""
+
+import os
+
+import pytest
+
+from pkg_api.storage.file_lock import FileLock, LockTimeoutError
+
+
+@pytest.fixture
+def lock_path(tmp_path: str) -> str:
+    """Returns the path of a lock file in a temporary directory."""
+    return os.path.join(tmp_path, "testuser.lock")
+
+
+def test_shared_locks(lock_path: str) -> None:
+    """Tests that readers do not block each other."""
+    reader = FileLock(lock_path, timeout=0.1)
+    other_reader = FileLock(lock_path, timeout=0.1)
+    with reader.shared():
+        with other_reader.shared():
+            pass
+    with pytest.raises(LockTimeoutError):
+        with reader.shared():
+            with FileLock(lock_path, timeout=0.1).exclusive():
+                pass
+
+
+def test_exclusive_lock(lock_path: str) -> None:
+    """Tests that a writer blocks the others until it releases the lock."""
+    writer = FileLock(lock_path, timeout=0.1)
+    other = FileLock(lock_path, timeout=0.1)
+    with writer.exclusive():
+        with writer.shared():
+            pass
+        with pytest.raises(LockTimeoutError):
+            with other.shared():
+                pass
+    with other.exclusive():
+        pass
+    writer.close()
+    other.close()
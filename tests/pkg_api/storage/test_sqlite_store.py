@@ -0,0 +1,113 @@
+"""Tests for the SQLite store."""
+
+import os
+from typing import Iterator
+
+import pytest
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.compare import isomorphic
+
+from pkg_api.storage.sqlite_store import SQLiteStore
+
+EX = Namespace("http://example.com/")
+
+
+@pytest.fixture
+def database_path(tmp_path: str) -> str:
+    """Returns the path to a database file."""
+    return os.path.join(tmp_path, "pkg.sqlite")
+
+
+@pytest.fixture
+def graph(database_path: str) -> Iterator[Graph]:
+    """Returns a graph stored in a SQLite database."""
+    graph = Graph(SQLiteStore(), identifier=EX.alice)
+    graph.open(database_path, create=True)
+    yield graph
+    graph.close()
+
+
+def test_triple_patterns(graph: Graph) -> None:
+    """Tests that triples are matched by any pattern."""
+    concept = BNode()
+    graph.add((EX.s, EX.p, concept))
+    graph.add((concept, EX.q, Literal(1)))
+    graph.add((concept, EX.q, Literal("un", lang="fr")))
+
+    assert len(graph) == 3
+    assert set(graph.objects(concept, EX.q)) == {
+        Literal(1),
+        Literal("un", lang="fr"),
+    }
+    assert set(graph.subjects(EX.q, Literal(1))) == {concept}
+    assert set(graph.predicates(EX.s, concept)) == {EX.p}
+    assert (EX.s, EX.p, concept) in graph
+    assert (EX.s, EX.q, None) not in graph
+    assert not list(graph.triples((EX.unknown, None, None)))
+
+
+def test_remove(graph: Graph) -> None:
+    """Tests that triples matching a pattern are removed."""
+    graph.add((EX.s, EX.p, EX.o))
+    graph.add((EX.s, EX.p, EX.o2))
+    graph.add((EX.s, EX.q, EX.o))
+
+    graph.remove((EX.s, EX.p, None))
+    assert set(graph) == {(EX.s, EX.q, EX.o)}
+
+
+def test_sparql(graph: Graph) -> None:
+    """Tests that SPARQL updates and queries run against the store."""
+    graph.update(
+        "PREFIX ex: <http://example.com/> "
+        "INSERT DATA { ex:s ex:p [ ex:q 1 ] . }"
+    )
+    result = graph.query(
+        "PREFIX ex: <http://example.com/> "
+        "SELECT ?o WHERE { ex:s ex:p ?c . ?c ex:q ?o . }"
+    )
+    assert [row.o for row in result] == [Literal(1)]
+
+
+def test_named_graphs(database_path: str, graph: Graph) -> None:
+    """Tests that graphs share the database but not their triples."""
+    other_graph = Graph(SQLiteStore(), identifier=EX.bob)
+    other_graph.open(database_path, create=True)
+    graph.add((EX.s, EX.p, EX.o))
+    graph.commit()
+    other_graph.add((EX.s, EX.p, EX.o2))
+    other_graph.commit()
+
+    assert set(graph) == {(EX.s, EX.p, EX.o)}
+    assert set(other_graph) == {(EX.s, EX.p, EX.o2)}
+    assert {context.identifier for context in graph.store.contexts()} == {
+        EX.alice,
+        EX.bob,
+    }
+    other_graph.close()
+
+
+def test_persistence(database_path: str, graph: Graph) -> None:
+    """Tests that committed triples and namespaces survive reopening."""
+    expected = Graph()
+    expected.add((EX.s, EX.p, BNode("b1")))
+    expected.add((BNode("b1"), EX.q, Literal("2024-02-05")))
+    graph.addN((s, p, o, graph) for s, p, o in expected)
+    graph.bind("ex", EX)
+    graph.commit()
+    graph.add((EX.s, EX.p, EX.uncommitted))
+    graph.close()
+
+    reopened = Graph(SQLiteStore(), identifier=EX.alice)
+    reopened.open(database_path)
+    assert isomorphic(reopened, expected)
+    assert set(reopened) == set(expected)
+    assert reopened.store.namespace("ex") == URIRef(EX)
+    reopened.close()
+
+
+def test_open_missing_database(database_path: str) -> None:
+    """Tests that a missing database is only created if requested."""
+    graph = Graph(SQLiteStore(), identifier=EX.alice)
+    assert graph.open(database_path, create=False) == -1
+    assert not os.path.exists(database_path)
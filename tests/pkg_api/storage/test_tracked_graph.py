@@ -0,0 +1,49 @@
+"""Tests for the graph tracking its changes."""
+
+from rdflib import BNode, Literal, URIRef
+
+from pkg_api.storage.tracked_graph import ADDED, REMOVED, TrackedGraph
+
+EX = "http://example.com#"
+
+
+def test_track_sparql_update() -> None:
+    """Tests that the effective changes of SPARQL updates are recorded."""
+    graph = TrackedGraph()
+    graph.add((URIRef(f"{EX}a"), URIRef(f"{EX}p"), Literal("old")))
+
+    with graph.track_changes() as changes:
+        graph.update(f"INSERT DATA {{ <{EX}a> <{EX}p> 'old', 'new' . }}")
+        graph.update(f"DELETE WHERE {{ <{EX}a> <{EX}p> 'old' . }}")
+
+    assert changes == [
+        (ADDED, (URIRef(f"{EX}a"), URIRef(f"{EX}p"), Literal("new"))),
+        (REMOVED, (URIRef(f"{EX}a"), URIRef(f"{EX}p"), Literal("old"))),
+    ]
+
+
+def test_nested_tracking() -> None:
+    """Tests that changes of nested contexts are part of outer contexts."""
+    graph = TrackedGraph()
+    triple = (BNode(), URIRef(f"{EX}p"), URIRef(f"{EX}o"))
+    with graph.track_changes() as outer:
+        with graph.track_changes() as inner:
+            graph.add(triple)
+        assert inner == [(ADDED, triple)]
+    assert outer == [(ADDED, triple)]
+
+    # Changes outside of a context are not recorded.
+    graph.remove(triple)
+    assert outer == [(ADDED, triple)]
+
+
+def test_apply_changes() -> None:
+    """Tests applying recorded changes to another graph."""
+    graph = TrackedGraph()
+    with graph.track_changes() as changes:
+        graph.update(f"INSERT DATA {{ <{EX}a> <{EX}p> [ <{EX}q> 1 ] . }}")
+        graph.update(f"DELETE WHERE {{ ?s <{EX}q> 1 . }}")
+
+    replica = TrackedGraph()
+    replica.apply_changes(changes)
+    assert set(replica) == set(graph)
@@ -0,0 +1,71 @@
+"""Tests for the write-ahead log."""
+
+import os
+
+import pytest
+from rdflib import BNode, Literal, URIRef
+
+from pkg_api.storage.tracked_graph import TrackedGraph
+from pkg_api.storage.write_ahead_log import WriteAheadLog
+
+EX = "http://example.com#"
+
+
+@pytest.fixture
+def wal_path(tmp_path: str) -> str:
+    """Returns the path of a write-ahead log in a temporary directory."""
+    return os.path.join(tmp_path, "testuser")
+
+
+def test_replay_preserves_blank_nodes(wal_path: str) -> None:
+    """Tests that logged changes on blank nodes of the snapshot replay."""
+    concept = BNode()
+    graph = TrackedGraph()
+    graph.add((URIRef(f"{EX}s"), URIRef(f"{EX}object"), concept))
+    graph.add((concept, URIRef(f"{EX}description"), Literal("movies")))
+    wal = WriteAheadLog(wal_path)
+    wal.compact(graph)
+
+    with graph.track_changes() as changes:
+        graph.remove((concept, None, None))
+        graph.add((concept, URIRef(f"{EX}description"), Literal("films")))
+    wal.append(changes)
+    wal.close()
+
+    assert len(wal) == 2
+    restored = TrackedGraph()
+    WriteAheadLog(wal_path).load(restored)
+    assert set(restored) == set(graph)
+
+
+def test_truncated_entry_is_skipped(wal_path: str) -> None:
+    """Tests that a partially written entry does not prevent loading."""
+    triple = (URIRef(f"{EX}s"), URIRef(f"{EX}p"), Literal("o"))
+    wal = WriteAheadLog(wal_path)
+    wal.append([("+", triple)])
+    wal.close()
+    with open(wal.log_path, "a") as log_file:
+        log_file.write("+ <http://example.com#s> <http://exa")
+
+    restored = TrackedGraph()
+    wal = WriteAheadLog(wal_path)
+    wal.load(restored)
+    assert set(restored) == {triple}
+    assert len(wal) == 1
+
+
+def test_compact(wal_path: str) -> None:
+    """Tests that compaction empties the log."""
+    graph = TrackedGraph()
+    triple = (URIRef(f"{EX}s"), URIRef(f"{EX}p"), Literal("o"))
+    wal = WriteAheadLog(wal_path)
+    with graph.track_changes() as changes:
+        graph.add(triple)
+    wal.append(changes)
+    wal.compact(graph)
+
+    assert len(wal) == 0
+    assert os.path.getsize(wal.log_path) == 0
+    restored = TrackedGraph()
+    WriteAheadLog(wal_path).load(restored)
+    assert set(restored) == {triple}
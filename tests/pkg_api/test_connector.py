@@ -1,10 +1,20 @@
 """Tests for PKG connector."""
 
 import os
+from typing import Any, List
 
 import pytest
+from rdflib import Namespace
 
-from pkg_api.connector import Connector, RDFStore
+from pkg_api.connector import (
+    Connector,
+    PersistenceMode,
+    RDFStore,
+    SnapshotFormat,
+)
+from pkg_api.storage.tracked_graph import Change
+
+EX = Namespace("http://example.com#")
 
 
 @pytest.fixture
@@ -44,3 +54,512 @@ def test_save_grpah_exception() -> None:
     )
     with pytest.raises(FileNotFoundError):
         connector.save_graph()
+
+
+def test_save_graph_clean(
+    tmp_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that a graph without changes is not written again."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    serialize = connector._graph.serialize
+    saves = []
+
+    def mock_serialize(*args: Any, **kwargs: Any) -> Any:
+        """Mock function for the serialization of the graph."""
+        saves.append(args)
+        return serialize(*args, **kwargs)
+
+    monkeypatch.setattr(connector._graph, "serialize", mock_serialize)
+    connector.save_graph()
+    connector.save_graph()
+    assert len(saves) == 1
+
+    connector.execute_sparql_query("SELECT * WHERE { ?s ?p ?o . }")
+    connector.close()
+    assert len(saves) == 1
+
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    monkeypatch.setattr(connector._graph, "serialize", mock_serialize)
+    connector.close()
+    assert len(saves) == 1
+
+
+def test_flush_interval(tmp_path: str) -> None:
+    """Tests that saves within the flush interval are written once."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        flush_interval=0.5,
+    )
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o1 . }")
+    connector.save_graph()
+    timer = connector._flush_timer
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o2 . }")
+    connector.save_graph()
+    assert connector._flush_timer is timer
+    assert not os.path.exists(f"{path}.ttl")
+
+    timer.join()
+    assert os.path.exists(f"{path}.ttl")
+    assert not connector._dirty
+    connector.save_graph()
+    assert connector._flush_timer is None
+
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o3 . }")
+    connector.save_graph()
+    connector.close()
+    reopened = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    assert len(reopened._graph) == 3
+
+
+def test_save_graph_failure(
+    tmp_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that a failed save leaves the previous snapshot intact."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o1 . }")
+    connector.save_graph()
+    with open(f"{path}.ttl") as f:
+        snapshot = f.read()
+
+    def mock_serialize(destination: Any, **kwargs: Any) -> None:
+        """Mock function failing midway through the serialization."""
+        destination.write(b"@prefix ex: <http://example.com#> .\nex:s ")
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(connector._graph, "serialize", mock_serialize)
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o2 . }")
+    with pytest.raises(OSError):
+        connector.save_graph()
+
+    with open(f"{path}.ttl") as f:
+        assert f.read() == snapshot
+    assert sorted(os.listdir(tmp_path)) == ["testuser.lock", "testuser.ttl"]
+    assert connector._dirty
+
+
+def test_new_graph(tmp_path: str) -> None:
+    """Tests that a graph without files is changed without reloading it."""
+    path = os.path.join(tmp_path, "missing", "testuser")
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    assert not connector._is_stale()
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o1 . }")
+    assert len(connector._graph) == 1
+
+
+@pytest.mark.parametrize(
+    "persistence_mode",
+    [PersistenceMode.SNAPSHOT, PersistenceMode.WRITE_AHEAD_LOG],
+)
+def test_concurrent_writers(
+    tmp_path: str, persistence_mode: PersistenceMode
+) -> None:
+    """Tests that the changes of processes sharing a graph are all kept."""
+    path = os.path.join(tmp_path, "testuser")
+    alice, bob = (
+        Connector(
+            "http://example.com/testuser",
+            RDFStore.MEMORY,
+            path,
+            persistence_mode=persistence_mode,
+            lock_timeout=0.1,
+        )
+        for _ in range(2)
+    )
+    alice.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o1 . }")
+    bob.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o2 . }")
+    alice.save_graph()
+    bob.save_graph()
+    assert alice.execute_sparql_query("ASK { ex:s ex:p ex:o2 }").askAnswer
+    alice.execute_sparql_update("DELETE DATA { ex:s ex:p ex:o2 . }")
+    alice.close()
+    assert not bob.execute_sparql_query("ASK { ex:s ex:p ex:o2 }").askAnswer
+    bob.close()
+
+    reopened = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        persistence_mode=persistence_mode,
+    )
+    assert len(reopened._graph) == 1
+
+
+@pytest.mark.parametrize(
+    "snapshot_format", [SnapshotFormat.TURTLE, SnapshotFormat.BINARY]
+)
+def test_concurrent_blank_node_removal(
+    tmp_path: str, snapshot_format: SnapshotFormat
+) -> None:
+    """Tests that removals of blank nodes are merged with other changes."""
+    path = os.path.join(tmp_path, "testuser")
+    alice, bob = (
+        Connector(
+            "http://example.com/testuser",
+            RDFStore.MEMORY,
+            path,
+            snapshot_format=snapshot_format,
+            lock_timeout=0.1,
+        )
+        for _ in range(2)
+    )
+    alice.execute_sparql_update(
+        "INSERT DATA { ex:s1 rdf:object "
+        '[ a skos:Concept ; dc:description "pizza" ] . }'
+    )
+    alice.save_graph()
+    bob.execute_sparql_update(
+        "DELETE { ex:s1 rdf:object ?o . ?o ?p ?v . } "
+        "WHERE { ex:s1 rdf:object ?o . ?o ?p ?v . }"
+    )
+    alice.execute_sparql_update("INSERT DATA { ex:s2 ex:p ex:o . }")
+    alice.save_graph()
+    bob.save_graph()
+    alice.close()
+    bob.close()
+
+    reopened = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        snapshot_format=snapshot_format,
+    )
+    assert set(reopened._graph) == {
+        (EX.s2, EX.p, EX.o),
+    }
+
+
+def test_turtle_snapshot_migration(tmp_path: str) -> None:
+    """Tests that prefixed Turtle snapshots are rewritten on load."""
+    path = os.path.join(tmp_path, "testuser")
+    with open(f"{path}.ttl", "w") as snapshot_file:
+        snapshot_file.write(
+            "@prefix ex: <http://example.com#> .\n"
+            'ex:s ex:p [ ex:q "pizza" ] .\n'
+        )
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    labels = {str(o) for o in connector._graph.objects(EX.s, EX.p)}
+    connector.close()
+
+    reopened = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    assert {str(o) for o in reopened._graph.objects(EX.s, EX.p)} == labels
+    assert len(reopened._graph) == 2
+
+
+def test_write_ahead_log(tmp_path: str) -> None:
+    """Tests that updates are persisted without saving the graph."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        persistence_mode=PersistenceMode.WRITE_AHEAD_LOG,
+    )
+    connector.execute_sparql_update(
+        "INSERT DATA { ex:s rdf:object [ a skos:Concept ; "
+        'dc:description "movies" ] . }'
+    )
+    connector.execute_sparql_update(
+        'INSERT DATA { ex:s dc:description "statement" . }'
+    )
+    connector.execute_sparql_update(
+        "DELETE WHERE { ?c a skos:Concept ; ?p ?o . }"
+    )
+    assert not os.path.exists(f"{path}.ttl")
+    assert os.path.exists(f"{path}.log")
+
+    # The connector is not closed, as if the process had crashed.
+    reopened = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        persistence_mode=PersistenceMode.WRITE_AHEAD_LOG,
+    )
+    assert set(reopened._graph) == set(connector._graph)
+    assert len(reopened._graph) == 2
+
+
+def test_write_ahead_log_compaction(tmp_path: str) -> None:
+    """Tests that the log is folded into a snapshot past the threshold."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        persistence_mode=PersistenceMode.WRITE_AHEAD_LOG,
+        wal_compaction_threshold=2,
+    )
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o1 . }")
+    assert not os.path.exists(f"{path}.nt")
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o2 . }")
+    assert os.path.exists(f"{path}.nt")
+    assert os.path.getsize(f"{path}.log") == 0
+
+
+def test_write_ahead_log_migration(tmp_path: str) -> None:
+    """Tests opening a PKG saved as Turtle with the write-ahead log."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p [ ex:q 1 ] . }")
+    connector.close()
+
+    connector = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        persistence_mode=PersistenceMode.WRITE_AHEAD_LOG,
+    )
+    assert len(connector._graph) == 2
+    assert os.path.exists(f"{path}.nt")
+
+
+def test_binary_snapshot(tmp_path: str) -> None:
+    """Tests that a binary snapshot is picked up when opening the graph."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        snapshot_format=SnapshotFormat.BINARY,
+    )
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p [ ex:q 1 ] . }")
+    connector.close()
+    assert os.path.exists(f"{path}.pkgb")
+    assert not os.path.exists(f"{path}.ttl")
+
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    assert len(connector._graph) == 2
+    # Saving as Turtle supersedes the binary snapshot.
+    connector.close()
+    assert os.path.exists(f"{path}.ttl")
+    assert not os.path.exists(f"{path}.pkgb")
+
+    connector.export_graph(os.path.join(tmp_path, "export.ttl"))
+    assert os.path.exists(os.path.join(tmp_path, "export.ttl"))
+
+
+def test_write_ahead_log_binary_snapshot(tmp_path: str) -> None:
+    """Tests the write-ahead log on top of a binary snapshot."""
+    path = os.path.join(tmp_path, "testuser")
+    kwargs = {
+        "persistence_mode": PersistenceMode.WRITE_AHEAD_LOG,
+        "snapshot_format": SnapshotFormat.BINARY,
+        "wal_compaction_threshold": 2,
+    }
+    connector = Connector(
+        "http://example.com/testuser", RDFStore.MEMORY, path, **kwargs
+    )
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p [ ex:q 1 ] . }")
+    assert os.path.exists(f"{path}.pkgb")
+    connector.execute_sparql_update("DELETE WHERE { ?c ex:q 1 . }")
+
+    reopened = Connector(
+        "http://example.com/testuser", RDFStore.MEMORY, path, **kwargs
+    )
+    assert set(reopened._graph) == set(connector._graph)
+    assert len(reopened._graph) == 1
+
+
+def test_berkeleydb_persistence(tmp_path: str) -> None:
+    """Tests that changes are committed to BerkeleyDB without snapshots."""
+    pytest.importorskip("berkeleydb")
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector(
+        "http://example.com/testuser", RDFStore.BERKELEYDB, path
+    )
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p [ ex:q 1 ] . }")
+    connector.close()
+    assert not os.path.exists(f"{path}.ttl")
+
+    connector = Connector(
+        "http://example.com/testuser", RDFStore.BERKELEYDB, path
+    )
+    assert len(connector._graph) == 2
+    connector.close()
+
+
+def test_berkeleydb_migration(tmp_path: str) -> None:
+    """Tests that a PKG stored as Turtle is migrated into BerkeleyDB."""
+    pytest.importorskip("berkeleydb")
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p [ ex:q 1 ] . }")
+    connector.close()
+
+    connector = Connector(
+        "http://example.com/testuser", RDFStore.BERKELEYDB, path
+    )
+    assert len(connector._graph) == 2
+    connector.close()
+
+
+def test_persistent_store_write_ahead_log(tmp_path: str) -> None:
+    """Tests that the write-ahead log cannot be used with a native store."""
+    with pytest.raises(ValueError):
+        Connector(
+            "http://example.com/testuser",
+            RDFStore.BERKELEYDB,
+            os.path.join(tmp_path, "testuser"),
+            persistence_mode=PersistenceMode.WRITE_AHEAD_LOG,
+        )
+
+
+def test_sqlite_named_graphs(tmp_path: str) -> None:
+    """Tests that PKGs stored with SQLite share a single database file."""
+    alice = Connector(
+        "http://example.com/alice",
+        RDFStore.SQLITE,
+        os.path.join(tmp_path, "alice"),
+    )
+    bob = Connector(
+        "http://example.com/bob",
+        RDFStore.SQLITE,
+        os.path.join(tmp_path, "bob"),
+    )
+    alice.execute_sparql_update("INSERT DATA { ex:s ex:p [ ex:q 1 ] . }")
+    bob.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o . }")
+    alice.close()
+    bob.close()
+    assert os.path.exists(os.path.join(tmp_path, "pkg.sqlite"))
+    assert not os.path.exists(os.path.join(tmp_path, "alice.ttl"))
+
+    alice = Connector(
+        "http://example.com/alice",
+        RDFStore.SQLITE,
+        os.path.join(tmp_path, "alice"),
+    )
+    assert len(alice._graph) == 2
+    result = alice.execute_sparql_query("SELECT ?o WHERE { ex:s ex:p ?o . }")
+    assert len(result) == 1
+    alice.close()
+
+
+def test_sqlite_migration(tmp_path: str) -> None:
+    """Tests that a PKG stored as Turtle is migrated into SQLite."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p [ ex:q 1 ] . }")
+    connector.close()
+
+    connector = Connector("http://example.com/testuser", RDFStore.SQLITE, path)
+    assert len(connector._graph) == 2
+    connector.close()
+
+
+def test_query_cache(tmp_path: str) -> None:
+    """Tests that query results are reused until the graph is updated."""
+    connector = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        os.path.join(tmp_path, "testuser"),
+        query_cache_size=10**6,
+    )
+    query = "SELECT ?o WHERE { ex:s ex:p ?o . }"
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p 1 . }")
+    result = connector.execute_sparql_query(query)
+    assert connector.execute_sparql_query(query) is result
+
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p 2 . }")
+    assert len(connector.execute_sparql_query(query)) == 2
+    info = connector.query_cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_query_cache_disabled(pkg_connector: Connector) -> None:
+    """Tests that query results are not cached by default."""
+    query = "SELECT ?o WHERE { ex:s ex:p ?o . }"
+    assert pkg_connector.execute_sparql_query(
+        query
+    ) is not pkg_connector.execute_sparql_query(query)
+    assert pkg_connector.query_cache_info() is None
+
+
+def test_prepare_query(tmp_path: str) -> None:
+    """Tests that prepared queries use the prefixes of the graph."""
+    connector = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        os.path.join(tmp_path, "testuser"),
+        query_cache_size=10**6,
+    )
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p 1 . }")
+    query = connector.prepare_query("SELECT ?o WHERE { ex:s ex:p ?o . }")
+    assert len(connector.execute_sparql_query(query, cache=False)) == 1
+    assert connector.query_cache_info().entries == 0
+
+    with pytest.raises(ValueError):
+        connector.prepare_query("SELECT ?o WHERE { ex:s ex:p ?o ")
+
+
+def test_transaction(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that updates of a transaction are combined and logged at once."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        persistence_mode=PersistenceMode.WRITE_AHEAD_LOG,
+    )
+    update = connector._graph.update
+    updates = []
+    append = connector._wal.append
+    appended_changes = []
+
+    def mock_update(query: str, **kwargs: Any) -> None:
+        """Mock function for the update of the graph."""
+        updates.append(query)
+        update(query, **kwargs)
+
+    def mock_append(changes: List[Change]) -> None:
+        """Mock function for the append to the write-ahead log."""
+        appended_changes.append(changes)
+        append(changes)
+
+    monkeypatch.setattr(connector._graph, "update", mock_update)
+    monkeypatch.setattr(connector._wal, "append", mock_append)
+
+    with connector.transaction():
+        connector.execute_sparql_update("INSERT DATA { ex:s ex:p 1 . }")
+        connector.execute_sparql_update("INSERT DATA { ex:s ex:p 2 . }")
+        # Buffered updates are executed before queries.
+        query = "SELECT ?o WHERE { ex:s ex:p ?o . }"
+        assert len(connector.execute_sparql_query(query)) == 2
+        connector.execute_sparql_update("INSERT DATA { ex:s ex:p 3 . }")
+        assert not appended_changes
+
+    assert len(updates) == 2
+    assert [len(changes) for changes in appended_changes] == [3]
+    reopened = Connector(
+        "http://example.com/testuser",
+        RDFStore.MEMORY,
+        path,
+        persistence_mode=PersistenceMode.WRITE_AHEAD_LOG,
+    )
+    assert set(reopened._graph) == set(connector._graph)
+
+
+def test_transaction_rollback(tmp_path: str) -> None:
+    """Tests that the changes of a failed transaction are reverted."""
+    path = os.path.join(tmp_path, "testuser")
+    connector = Connector("http://example.com/testuser", RDFStore.MEMORY, path)
+    connector.execute_sparql_update("INSERT DATA { ex:s ex:p 1 . }")
+    triples = set(connector._graph)
+    changes = []
+    connector.add_change_listener(changes.extend)
+
+    with pytest.raises(ValueError):
+        with connector.transaction():
+            connector.execute_sparql_update("DELETE WHERE { ex:s ex:p ?o . }")
+            connector.execute_sparql_update("INSERT DATA { ex:s ex:p 2 . }")
+            connector.save_graph()
+            assert connector.execute_sparql_query("ASK { ex:s ex:p 2 }")
+            raise ValueError()
+
+    assert set(connector._graph) == triples
+    # The listeners are notified of the changes and of their reversal.
+    assert len(changes) == 4
+    assert not os.path.exists(f"{path}.ttl")
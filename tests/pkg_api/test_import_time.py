@@ -0,0 +1,23 @@
+"""Tests that the slow dependencies of the PKG API are imported on use."""
+
+from typing import List
+
+import pytest
+
+from scripts.benchmarks.import_time import get_import_times
+
+
+@pytest.mark.parametrize(
+    "module,lazy_imports",
+    [
+        ("pkg_api.pkg", ["IPython", "pydotplus", "rdflib.tools.rdf2dot"]),
+        ("pkg_api.nl_to_pkg", ["ollama"]),
+        ("pkg_api.nl_to_pkg.eval_nl_to_pkg", ["ollama", "sklearn", "tqdm"]),
+    ],
+)
+def test_lazy_imports(module: str, lazy_imports: List[str]) -> None:
+    """Tests that importing a module does not import slow dependencies."""
+    import_times = get_import_times(module)
+
+    assert module in import_times
+    assert set(lazy_imports).isdisjoint(import_times)
@@ -1,11 +1,20 @@
 """Tests for the PKG module."""
 
+import dataclasses
 import re
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from unittest.mock import MagicMock
 
 import pytest
+from rdflib import RDF, RDFS, SKOS, Namespace, URIRef
+from rdflib.compare import isomorphic
 
+from pkg_api import triple_builder, utils
 from pkg_api.connector import RDFStore
+from pkg_api.core.namespaces import PKGPrefixes
 from pkg_api.core.pkg_types import (
     URI,
     Concept,
@@ -14,8 +23,11 @@ from pkg_api.core.pkg_types import (
     Triple,
     TripleElement,
 )
-from pkg_api.pkg import PKG
+from pkg_api.pkg import PKG, ConceptNodes, WriteEngine
 from pkg_api.utils import get_statement_node_id
+from pkg_api.visualization import ImageFormat
+
+WO = Namespace(PKGPrefixes.WO.value)
 
 
 @pytest.fixture
@@ -134,6 +146,41 @@ def test_add_statement(
     assert mock_execute_sparql_update.called
 
 
+def test_add_statement_with_preference(
+    monkeypatch: pytest.MonkeyPatch,
+    user_pkg: PKG,
+    statement_with_concept: PKGData,
+) -> None:
+    """Tests adding a statement and its preference with a single update."""
+    execute_sparql_update = user_pkg._connector.execute_sparql_update
+    updates = []
+
+    def mock_execute_sparql_update(query: str) -> None:
+        """Mock function for execute_sparql_update."""
+        updates.append(query)
+        execute_sparql_update(query)
+
+    monkeypatch.setattr(
+        user_pkg._connector,
+        "execute_sparql_update",
+        mock_execute_sparql_update,
+    )
+    user_pkg.add_statement(statement_with_concept)
+
+    assert len(updates) == 1
+    object = statement_with_concept.triple.object.value
+    assert user_pkg.get_owner_preference(object) == 1.0
+
+    # The preference and its weight have deterministic IRIs, hence adding the
+    # preference again has no effect.
+    graph_size = len(user_pkg._connector._graph)
+    user_pkg._connector.execute_sparql_update(
+        utils.get_query_for_add_preference(statement_with_concept)
+    )
+    assert len(user_pkg._connector._graph) == graph_size
+    assert user_pkg.get_owner_preference(object) == 1.0
+
+
 def test_get_statements(
     user_pkg: PKG,
     statement: PKGData,
@@ -191,3 +238,511 @@ def test_remove_statement(user_pkg: PKG, statement: PKGData) -> None:
     user_pkg.remove_statement(statement)
     statements = user_pkg.get_statements(statement)
     assert len(statements) == 0
+
+
+def test_remove_statement_cleanup(
+    user_pkg: PKG, statement_with_concept: PKGData
+) -> None:
+    """Tests that concepts and weights left dangling are removed."""
+    user_pkg.add_statement(statement_with_concept)
+    user_pkg._connector.execute_sparql_update(
+        utils.get_query_for_add_preference(statement_with_concept)
+    )
+    graph = user_pkg._connector._graph
+    # The object concept is also referred to outside of the statement.
+    user_pkg._connector.execute_sparql_update(
+        "INSERT { ex:other rdfs:seeAlso ?concept } "
+        "WHERE { ?statement rdf:object ?concept }"
+    )
+    other = URIRef("http://example.com#other")
+    concept = graph.value(other, RDFS.seeAlso)
+
+    user_pkg.remove_statement(statement_with_concept)
+
+    assert set(graph.subjects()) == {
+        URIRef("http://example.com#other"),
+        concept,
+    }
+
+
+def test_iter_statements(
+    monkeypatch: pytest.MonkeyPatch, user_pkg: PKG
+) -> None:
+    """Tests iterating over statements by pages."""
+    owner = TripleElement("I", URI("http://example.com/testuser"))
+    statements = [
+        PKGData(
+            id=uuid.uuid4(),
+            statement=f"I like {i}.",
+            triple=Triple(owner, TripleElement("like", "like"), None),
+        )
+        for i in range(5)
+    ]
+    user_pkg.add_statements(statements)
+    ids = sorted(str(s.id) for s in statements)
+    query = PKGData(
+        id=uuid.uuid1(),
+        statement="What do I like?",
+        triple=Triple(subject=owner),
+    )
+
+    assert [str(s.id) for s in user_pkg.iter_statements(query)] == ids
+    # The statements are retrieved by pages with SPARQL.
+    monkeypatch.setattr("pkg_api.pkg.STATEMENT_PAGE_SIZE", 2)
+    assert [str(s.id) for s in user_pkg.iter_statements(query)] == ids
+    assert [
+        str(s.id) for s in user_pkg.iter_statements(query, limit=3, offset=1)
+    ] == ids[1:4]
+    page = list(user_pkg.iter_statements(query, limit=2, offset=1))
+    assert [str(s.id) for s in page] == ids[1:3]
+    # The cursor is stable even if statements are removed.
+    user_pkg.remove_statement_by_id(page[0].id)
+    page = list(user_pkg.iter_statements(query, limit=2, cursor=page[-1].id))
+    assert [str(s.id) for s in page] == ids[3:5]
+
+    with pytest.raises(ValueError):
+        next(user_pkg.iter_statements(query, limit=-1))
+
+
+def test_get_statement_by_id(
+    user_pkg: PKG,
+    statement_with_concept: PKGData,
+    retrieved_statement_with_concept: PKGData,
+) -> None:
+    """Tests getting a statement given its ID."""
+    user_pkg.add_statement(statement_with_concept)
+
+    assert (
+        user_pkg.get_statement_by_id(statement_with_concept.id)
+        == retrieved_statement_with_concept
+    )
+    assert user_pkg.get_statement_by_id(uuid.uuid1()) is None
+
+
+def test_remove_statement_by_id(
+    user_pkg: PKG, statement: PKGData, statement_with_concept: PKGData
+) -> None:
+    """Tests removing a statement and its preference given its ID."""
+    user_pkg.add_statement(statement)
+    user_pkg.add_statement(statement_with_concept)
+    user_pkg._connector.execute_sparql_update(
+        utils.get_query_for_add_preference(statement_with_concept)
+    )
+    expected_pkg = PKG(
+        URI("http://example.com/testuser"),
+        RDFStore.MEMORY,
+        "tests/data/RDFStore",
+    )
+    expected_pkg.add_statement(statement)
+
+    user_pkg.remove_statement_by_id(uuid.uuid1())
+    user_pkg.remove_statement_by_id(statement_with_concept.id)
+
+    assert user_pkg.get_statement_by_id(statement_with_concept.id) is None
+    assert isomorphic(
+        user_pkg._connector._graph, expected_pkg._connector._graph
+    )
+
+
+def test_update_preference(user_pkg: PKG, statement: PKGData) -> None:
+    """Tests updating the weight of the preference derived from a statement."""
+    user_pkg.add_statement(statement)
+    assert not user_pkg.update_preference(statement.id, 0.5)
+
+    statement.preference = Preference(statement.triple.object, 1.0)
+    user_pkg._connector.execute_sparql_update(
+        utils.get_query_for_add_preference(statement)
+    )
+    assert user_pkg.get_owner_preference(statement.triple.object.value) == 1.0
+    graph = user_pkg._connector._graph
+    subjects = set(graph.subjects())
+
+    assert user_pkg.update_preference(statement.id, -0.5)
+    assert user_pkg.get_owner_preference(statement.triple.object.value) == -0.5
+    assert set(graph.subjects()) == subjects
+    # The weight is stored as the SPARQL updates store it.
+    statement.preference.weight = -0.5
+    expected_pkg = PKG(
+        URI("http://example.com/testuser"),
+        RDFStore.MEMORY,
+        "tests/data/RDFStore",
+    )
+    expected_pkg.add_statement(statement)
+    expected_pkg._connector.execute_sparql_update(
+        utils.get_query_for_add_preference(statement)
+    )
+    assert isomorphic(graph, expected_pkg._connector._graph)
+
+
+@pytest.mark.parametrize(
+    "write_engine", [WriteEngine.SPARQL, WriteEngine.DIRECT]
+)
+def test_content_addressed_concepts(
+    statement_with_concept: PKGData,
+    retrieved_statement_with_concept: PKGData,
+    write_engine: WriteEngine,
+) -> None:
+    """Tests that identical concepts are shared until no longer referred to."""
+    pkg = PKG(
+        URI("http://example.com/testuser"),
+        RDFStore.MEMORY,
+        "tests/data/RDFStore",
+        write_engine=write_engine,
+        concept_nodes=ConceptNodes.CONTENT_ADDRESSED,
+    )
+    other_statement = dataclasses.replace(
+        statement_with_concept,
+        id=uuid.uuid1(),
+        statement="I really like movies directed by Steven Spielberg.",
+    )
+    pkg.add_statement(statement_with_concept)
+    pkg.add_statement(other_statement)
+    graph = pkg._connector._graph
+    concepts = set(graph.subjects(RDF.type, SKOS.Concept))
+
+    # The predicate and object concepts are shared by both statements.
+    assert len(concepts) == 2
+    # Concepts are not returned as URIs, and the shared concept has a single
+    # preference.
+    assert pkg.get_owner_preferences(URI(str(SKOS.Concept))) == {}
+    assert (
+        pkg.get_owner_preference(statement_with_concept.triple.object.value)
+        == 1.0
+    )
+    assert (
+        pkg.get_statement_by_id(statement_with_concept.id)
+        == retrieved_statement_with_concept
+    )
+
+    pkg.remove_statement_by_id(statement_with_concept.id)
+    assert set(graph.subjects(RDF.type, SKOS.Concept)) == concepts
+    assert pkg.get_statement_by_id(other_statement.id) is not None
+
+    pkg.remove_statement_by_id(other_statement.id)
+    assert len(graph) == 0
+
+
+def test_batch(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: str,
+    statement: PKGData,
+    statement_with_concept: PKGData,
+) -> None:
+    """Tests that the changes of a batch are applied and saved at once."""
+    user_pkg = PKG(
+        URI("http://example.com/testuser"),
+        RDFStore.MEMORY,
+        f"{tmp_path}/testuser",
+    )
+    graph = user_pkg._connector._graph
+    update = graph.update
+    serialize = graph.serialize
+    updates = []
+    saves = []
+
+    def mock_update(query: str, **kwargs: Any) -> None:
+        """Mock function for the update of the graph."""
+        updates.append(query)
+        update(query, **kwargs)
+
+    def mock_serialize(*args: Any, **kwargs: Any) -> Any:
+        """Mock function for the serialization of the graph."""
+        saves.append(args)
+        return serialize(*args, **kwargs)
+
+    monkeypatch.setattr(graph, "update", mock_update)
+    monkeypatch.setattr(graph, "serialize", mock_serialize)
+
+    with user_pkg.batch():
+        user_pkg.add_statement(statement)
+        user_pkg.add_statement(statement_with_concept)
+        user_pkg.save()
+
+    assert len(updates) == 1
+    assert len(saves) == 1
+    assert len(user_pkg.get_statements(statement)) == 1
+    assert len(user_pkg.get_statements(statement_with_concept)) == 1
+
+
+def test_batch_rollback(user_pkg: PKG, statement: PKGData) -> None:
+    """Tests that the changes of a failed batch are rolled back."""
+    statement.preference = Preference(statement.triple.object, 1.0)
+    object = statement.triple.object.value
+    size = len(user_pkg._connector._graph)
+    assert user_pkg.get_owner_preference(object) is None
+
+    with pytest.raises(ValueError):
+        with user_pkg.batch():
+            user_pkg.add_statement(statement)
+            assert user_pkg.get_owner_preference(object) == 1.0
+            raise ValueError()
+
+    assert len(user_pkg._connector._graph) == size
+    assert user_pkg.get_owner_preference(object) is None
+
+
+def test_sqlite_store(
+    tmp_path: str,
+    statement_with_concept: PKGData,
+    retrieved_statement_with_concept: PKGData,
+) -> None:
+    """Tests adding, getting, and removing statements stored in SQLite."""
+    owner_uri = URI("http://example.com/testuser")
+    pkg = PKG(owner_uri, RDFStore.SQLITE, f"{tmp_path}/testuser")
+    pkg.add_statement(statement_with_concept)
+    pkg.close()
+
+    pkg = PKG(owner_uri, RDFStore.SQLITE, f"{tmp_path}/testuser")
+    assert pkg.get_statements(statement_with_concept) == [
+        retrieved_statement_with_concept
+    ]
+    pkg.remove_statement(statement_with_concept)
+    assert len(pkg.get_statements(statement_with_concept)) == 0
+    pkg.close()
+
+
+def test_get_statements_with_uri_condition(
+    user_pkg: PKG,
+    statement: PKGData,
+    statement_with_concept: PKGData,
+) -> None:
+    """Tests getting statements conditioned on URIs and literals."""
+    user_pkg.add_statement(statement)
+    user_pkg.add_statement(statement_with_concept)
+
+    statements = user_pkg.get_statements(
+        PKGData(
+            id=uuid.uuid1(),
+            statement="Where do I live?",
+            triple=Triple(
+                subject=TripleElement("I", URI("http://example.com/testuser")),
+                predicate=TripleElement("live", "live"),
+            ),
+        )
+    )
+    assert [s.id for s in statements] == [statement.id]
+
+
+def test_get_preference(user_pkg: PKG, statement: PKGData) -> None:
+    """Tests getting the preference of the owner for an URI."""
+    statement.preference = Preference(statement.triple.object, 1.0)
+    user_pkg.add_statement(statement)
+    user_pkg._connector.execute_sparql_update(
+        utils.get_query_for_add_preference(statement)
+    )
+
+    assert user_pkg.get_owner_preference(statement.triple.object.value) == 1.0
+    assert user_pkg.get_owner_preference(URI("http://example.com/x")) is None
+
+
+def test_add_statements(
+    tmp_path: str,
+    monkeypatch: pytest.MonkeyPatch,
+    statement: PKGData,
+    statement_with_concept: PKGData,
+) -> None:
+    """Tests that statements added in batches match one-by-one additions."""
+    statements = [statement, statement_with_concept] + [
+        PKGData(id=uuid.uuid1(), statement=f"Statement {i}.") for i in range(3)
+    ]
+    owner_uri = URI("http://example.com/testuser")
+    expected_pkg = PKG(owner_uri, RDFStore.MEMORY, f"{tmp_path}/expected")
+    for pkg_data in statements:
+        expected_pkg.add_statement(pkg_data)
+
+    pkg = PKG(owner_uri, RDFStore.MEMORY, f"{tmp_path}/testuser")
+    execute_sparql_update = pkg._connector.execute_sparql_update
+    updates = []
+
+    def mock_execute_sparql_update(query: str) -> None:
+        """Mock function for execute_sparql_update."""
+        updates.append(query)
+        execute_sparql_update(query)
+
+    monkeypatch.setattr(
+        pkg._connector, "execute_sparql_update", mock_execute_sparql_update
+    )
+    pkg.add_statements(iter(statements), batch_size=2)
+
+    assert len(updates) == 3
+    assert isomorphic(pkg._connector._graph, expected_pkg._connector._graph)
+
+
+def test_add_statements_invalid_batch_size(user_pkg: PKG) -> None:
+    """Tests that statements cannot be added in empty batches."""
+    with pytest.raises(ValueError):
+        user_pkg.add_statements([], batch_size=0)
+
+
+def test_direct_write_engine(
+    tmp_path: str, statement: PKGData, statement_with_concept: PKGData
+) -> None:
+    """Tests that the direct write engine matches the SPARQL one."""
+    owner_uri = URI("http://example.com/testuser")
+    expected_pkg = PKG(owner_uri, RDFStore.MEMORY, f"{tmp_path}/expected")
+    expected_pkg.add_statements([statement, statement_with_concept])
+
+    pkg = PKG(
+        owner_uri,
+        RDFStore.MEMORY,
+        f"{tmp_path}/testuser",
+        write_engine=WriteEngine.DIRECT,
+    )
+    pkg.add_statement(statement)
+    pkg.add_statements([statement_with_concept])
+
+    assert isomorphic(pkg._connector._graph, expected_pkg._connector._graph)
+    assert pkg.get_statements(statement) == expected_pkg.get_statements(
+        statement
+    )
+
+
+def test_get_preferences(user_pkg: PKG, statement: PKGData) -> None:
+    """Tests getting the preferences of the owner for a class."""
+    statement.preference = Preference(statement.triple.object, 1.0)
+    user_pkg.add_statement(statement)
+    user_pkg._connector.execute_sparql_update(
+        utils.get_query_for_add_preference(statement)
+    )
+    city = URI("https://schema.org/City")
+
+    assert user_pkg.get_owner_preferences(city) == {}
+
+    # The index is kept up to date after it is built.
+    user_pkg._connector.execute_sparql_update(
+        f"INSERT DATA {{ <{statement.triple.object.value}> a <{city}> }}"
+    )
+
+    assert user_pkg.get_owner_preferences(city) == {
+        statement.triple.object.value: 1.0
+    }
+    assert user_pkg.get_preferences(URI("http://example.com/x"), city) == {}
+
+
+@pytest.mark.parametrize(
+    "write_engine", [WriteEngine.SPARQL, WriteEngine.DIRECT]
+)
+def test_replace_preference(tmp_path: str, write_engine: WriteEngine) -> None:
+    """Tests that the latest preference for a topic replaces the others."""
+    owner_uri = URI("http://example.com/testuser")
+    pizza = URI("http://dbpedia.org/resource/Pizza")
+    pkg = PKG(
+        owner_uri,
+        RDFStore.MEMORY,
+        f"{tmp_path}/testuser",
+        write_engine=write_engine,
+    )
+
+    def get_statement(predicate: str, weight: float) -> PKGData:
+        """Returns a statement of the owner with a preference for pizza."""
+        _object = TripleElement("pizza", pizza)
+        return PKGData(
+            id=uuid.uuid1(),
+            statement=f"I {predicate} pizza.",
+            triple=Triple(
+                TripleElement("I", owner_uri),
+                TripleElement(predicate, predicate),
+                _object,
+            ),
+            preference=Preference(_object, weight),
+        )
+
+    pkg.add_statement(get_statement("like", 0.5))
+    pkg.add_statement(get_statement("love", 1.0))
+
+    assert pkg.get_owner_preference(pizza) == 1.0
+
+    pkg.add_statements(
+        [get_statement("dislike", -1.0), get_statement("like", 0.5)]
+    )
+
+    assert pkg.get_owner_preference(pizza) == 0.5
+
+    # Within a batch, the replacement is buffered with the addition.
+    with pkg.batch():
+        pkg.add_statement(get_statement("love", 1.0))
+        assert pkg._connector._pending_updates
+
+    assert pkg.get_owner_preference(pizza) == 1.0
+    graph = pkg._connector._graph
+    assert len(list(graph.subjects(RDF.type, RDF.Statement))) == 5
+    assert len(list(graph.objects(URIRef(owner_uri), None))) == 1
+    assert len(list(graph.subject_objects(WO.weight_value))) == 1
+
+
+def test_visualize_graph(
+    tmp_path: str, monkeypatch: pytest.MonkeyPatch, statement: PKGData
+) -> None:
+    """Tests that images are only rendered if the graph visualized changed."""
+    rendered = []
+
+    def mock_render_graph(graph: Any, path: str, image_format: Any) -> str:
+        """Mock function writing an empty image."""
+        rendered.append(path)
+        open(path, "wb").close()
+        return path
+
+    monkeypatch.setattr("pkg_api.pkg.render_graph", mock_render_graph)
+    pkg = PKG(
+        URI("http://example.com#testuser"),
+        RDFStore.MEMORY,
+        f"{tmp_path}/testuser",
+        visualization_path=str(tmp_path),
+    )
+    pkg.add_statement(statement)
+    statement_uri = URI(str(triple_builder.get_statement_node(statement)))
+
+    path = pkg.visualize_graph()
+    assert path == f"{tmp_path}/testuser.png"
+    assert pkg.visualize_graph() == path
+    focus_path = pkg.visualize_graph(
+        statement_uri, depth=1, image_format=ImageFormat.SVG
+    )
+    assert focus_path.endswith(".svg") and focus_path != path
+    assert rendered == [path, focus_path]
+
+    # Changes outside of the neighborhood of the focus node are not rendered.
+    pkg._connector.execute_sparql_update("INSERT DATA { ex:s ex:p ex:o . }")
+    pkg.visualize_graph(statement_uri, depth=1, image_format=ImageFormat.SVG)
+    assert rendered == [path, focus_path]
+    pkg.visualize_graph()
+    assert rendered == [path, focus_path, path]
+
+
+def test_submit_visualization(
+    tmp_path: str, monkeypatch: pytest.MonkeyPatch, statement: PKGData
+) -> None:
+    """Tests that identical renders in the background are coalesced."""
+    rendering = threading.Event()
+    rendered = []
+
+    def mock_render(data: str, path: str, image_format: Any) -> str:
+        """Mock function writing an empty image once allowed to."""
+        rendering.wait()
+        rendered.append(path)
+        open(path, "wb").close()
+        return path
+
+    monkeypatch.setattr("pkg_api.pkg.render_serialized_graph", mock_render)
+    pkg = PKG(
+        URI("http://example.com#testuser"),
+        RDFStore.MEMORY,
+        f"{tmp_path}/testuser",
+        visualization_path=str(tmp_path),
+    )
+    pkg.add_statement(statement)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future = pkg.submit_visualization(executor)
+        assert pkg.submit_visualization(executor) is future
+        focus_future = pkg.submit_visualization(executor, focus=pkg.owner_uri)
+        assert focus_future is not future
+        rendering.set()
+    path = future.result()
+    assert sorted(rendered) == sorted([path, focus_future.result()])
+
+    # The image is up to date, it is not rendered again.
+    executor = MagicMock()
+    other_future = pkg.submit_visualization(executor)
+    assert other_future.done() and other_future.result() == path
+    executor.submit.assert_not_called()
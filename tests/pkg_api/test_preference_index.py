@@ -0,0 +1,164 @@
+"""Tests for the preference index."""
+
+import uuid
+
+import pytest
+from rdflib import RDF, Namespace, URIRef
+
+from pkg_api.connector import Connector, RDFStore
+from pkg_api.core.namespaces import PKGPrefixes
+from pkg_api.core.pkg_types import (
+    URI,
+    PKGData,
+    Preference,
+    Triple,
+    TripleElement,
+)
+from pkg_api.preference_index import PreferenceIndex
+from pkg_api.triple_builder import get_triples_for_add_statement
+
+OWNER = URIRef("http://example.com/testuser")
+CITY = URIRef("https://schema.org/City")
+MOVIE = URIRef("https://schema.org/Movie")
+STAVANGER = URIRef("https://dbpedia.org/page/Stavanger")
+OSLO = URIRef("https://dbpedia.org/page/Oslo")
+JAWS = URIRef("https://dbpedia.org/page/Jaws_(film)")
+
+_PKG = Namespace(PKGPrefixes.PKG.value)
+_WO = Namespace(PKGPrefixes.WO.value)
+
+
+def _get_statement(topic: URIRef, weight: float) -> PKGData:
+    """Returns a statement of the owner with a preference for a topic."""
+    _object = TripleElement("", URI(str(topic)))
+    return PKGData(
+        id=uuid.uuid1(),
+        statement=f"I like {topic}.",
+        triple=Triple(
+            TripleElement("I", URI(str(OWNER))),
+            TripleElement("like", "like"),
+            _object,
+        ),
+        preference=Preference(_object, weight),
+    )
+
+
+@pytest.fixture
+def connector(tmp_path: str) -> Connector:
+    """Returns a connector to a PKG with typed topics."""
+    connector = Connector(
+        URI(str(OWNER)), RDFStore.MEMORY, f"{tmp_path}/testuser"
+    )
+    connector.add_triples(
+        [(STAVANGER, RDF.type, CITY), (OSLO, RDF.type, CITY)]
+        + get_triples_for_add_statement(
+            _get_statement(STAVANGER, 1.0), include_preference=True
+        )
+    )
+    return connector
+
+
+@pytest.fixture
+def index(connector: Connector) -> PreferenceIndex:
+    """Returns a preference index kept up to date with the connector."""
+    index = PreferenceIndex(connector._graph)
+    connector.add_change_listener(index.apply_changes)
+    return index
+
+
+def test_build(index: PreferenceIndex) -> None:
+    """Tests that the preferences in the graph are indexed."""
+    assert index.get_weight(OWNER, STAVANGER) == 1.0
+    assert index.get_weight(OWNER, OSLO) is None
+    assert index.get_weights_by_class(OWNER, CITY) == {STAVANGER: 1.0}
+    assert index.get_weights_by_class(OWNER, MOVIE) == {}
+
+
+def test_add_preferences(connector: Connector, index: PreferenceIndex) -> None:
+    """Tests that added preferences are indexed."""
+    connector.add_triples(
+        get_triples_for_add_statement(
+            _get_statement(OSLO, -1.0), include_preference=True
+        )
+        + get_triples_for_add_statement(
+            _get_statement(JAWS, 1.0), include_preference=True
+        )
+    )
+
+    assert index.get_weight(OWNER, OSLO) == -1.0
+    assert index.get_weights_by_class(OWNER, CITY) == {
+        STAVANGER: 1.0,
+        OSLO: -1.0,
+    }
+    assert index.get_weights_by_class(OWNER, MOVIE) == {}
+
+    connector.add_triples([(JAWS, RDF.type, MOVIE)])
+
+    assert index.get_weights_by_class(OWNER, MOVIE) == {JAWS: 1.0}
+
+
+def test_update_weight(connector: Connector, index: PreferenceIndex) -> None:
+    """Tests that weights changed with SPARQL are reindexed."""
+    connector.execute_sparql_update(
+        """
+        DELETE { ?weight wo:weight_value ?value }
+        INSERT { ?weight wo:weight_value "-0.5"^^xsd:decimal }
+        WHERE { ?weight wo:weight_value ?value }
+        """
+    )
+
+    assert index.get_weight(OWNER, STAVANGER) == -0.5
+
+
+def test_remove_preference(
+    connector: Connector, index: PreferenceIndex
+) -> None:
+    """Tests that incomplete preferences and classes are unindexed."""
+    connector.execute_sparql_update("DELETE WHERE { ?weight wo:scale ?scale }")
+
+    assert index.get_weight(OWNER, STAVANGER) is None
+    assert index.get_weights_by_class(OWNER, CITY) == {}
+
+    connector.add_triples(
+        [
+            (weight, _WO.scale, _PKG.StandardScale)
+            for weight in connector._graph.subjects(_WO.weight_value, None)
+        ]
+    )
+
+    assert index.get_weight(OWNER, STAVANGER) == 1.0
+
+    connector.execute_sparql_update("DELETE WHERE { ?topic a ?class }")
+
+    assert index.get_weight(OWNER, STAVANGER) == 1.0
+    assert index.get_weights_by_class(OWNER, CITY) == {}
+
+
+def test_multiple_preferences(
+    connector: Connector, index: PreferenceIndex
+) -> None:
+    """Tests that multiple preferences for a topic are reported."""
+    connector.add_triples(
+        get_triples_for_add_statement(
+            _get_statement(STAVANGER, -1.0), include_preference=True
+        )
+    )
+
+    with pytest.raises(Exception):
+        index.get_weight(OWNER, STAVANGER)
+
+
+def test_multiple_preferences_by_class(
+    connector: Connector, index: PreferenceIndex
+) -> None:
+    """Tests that topics with multiple preferences are skipped by class."""
+    connector.add_triples(
+        get_triples_for_add_statement(
+            _get_statement(STAVANGER, -1.0), include_preference=True
+        )
+        + get_triples_for_add_statement(
+            _get_statement(OSLO, 1.0), include_preference=True
+        )
+    )
+
+    assert index.get_weights_by_class(OWNER, CITY) == {OSLO: 1.0}
@@ -0,0 +1,96 @@
+"""Tests for the cache of query results."""
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+
+from pkg_api.query_cache import QueryResultCache
+
+EX = "http://example.com/"
+
+
+@pytest.fixture
+def graph() -> Graph:
+    """Returns a graph with a few triples."""
+    graph = Graph()
+    for i in range(10):
+        graph.add((URIRef(f"{EX}s{i}"), URIRef(f"{EX}p"), Literal(i)))
+    return graph
+
+
+def test_get_and_put(graph: Graph) -> None:
+    """Tests that a cached result is returned for the same generation."""
+    cache = QueryResultCache(max_size=10**6)
+    key = QueryResultCache.key("SELECT ?s WHERE { ?s ?p ?o . }")
+    assert cache.get(key, 0) is None
+
+    result = graph.query("SELECT ?s WHERE { ?s ?p ?o . }")
+    cache.put(key, result, 0)
+    cached = cache.get(key, 0)
+    assert cached is result
+    # The materialized result can be iterated over several times.
+    assert len(list(cached)) == len(list(cached)) == 10
+    assert cache.info().hits == 1
+    assert cache.info().misses == 1
+
+
+def test_generation_invalidation(graph: Graph) -> None:
+    """Tests that results computed on another generation are discarded."""
+    cache = QueryResultCache(max_size=10**6)
+    key = QueryResultCache.key("ASK { ?s ?p 1 . }")
+    cache.put(key, graph.query("ASK { ?s ?p 1 . }"), 0)
+
+    assert cache.get(key, 1) is None
+    assert cache.info().entries == 0
+    assert cache.info().size == 0
+
+
+def test_bindings_in_key(graph: Graph) -> None:
+    """Tests that results are cached per bindings."""
+    cache = QueryResultCache(max_size=10**6)
+    query = "SELECT ?o WHERE { ?s ?p ?o . }"
+    key_s0 = QueryResultCache.key(query, {"s": URIRef(f"{EX}s0")})
+    key_s1 = QueryResultCache.key(query, {"s": URIRef(f"{EX}s1")})
+    cache.put(
+        key_s0, graph.query(query, initBindings={"s": URIRef(f"{EX}s0")}), 0
+    )
+
+    assert cache.get(key_s1, 0) is None
+    assert [row.o for row in cache.get(key_s0, 0)] == [Literal(0)]
+
+
+def test_lru_eviction(graph: Graph) -> None:
+    """Tests that least recently used results are evicted beyond budget."""
+    queries = [f"SELECT ?s WHERE {{ ?s ?p {i} . }}" for i in range(3)]
+    keys = [QueryResultCache.key(query) for query in queries]
+    probe = QueryResultCache(max_size=10**6)
+    probe.put(keys[0], graph.query(queries[0]), 0)
+    entry_size = probe.info().size
+
+    cache = QueryResultCache(max_size=2 * entry_size)
+    cache.put(keys[0], graph.query(queries[0]), 0)
+    cache.put(keys[1], graph.query(queries[1]), 0)
+    # The first query becomes the most recently used one.
+    assert cache.get(keys[0], 0) is not None
+    cache.put(keys[2], graph.query(queries[2]), 0)
+
+    assert cache.info().entries == 2
+    assert cache.get(keys[1], 0) is None
+    assert cache.get(keys[0], 0) is not None
+    assert cache.info().size <= cache.info().max_size
+
+
+def test_not_cached(graph: Graph) -> None:
+    """Tests that graph results and results beyond budget are not cached."""
+    cache = QueryResultCache(max_size=300)
+    construct = "CONSTRUCT WHERE { ?s ?p ?o . }"
+    cache.put(QueryResultCache.key(construct), graph.query(construct), 0)
+    select = "SELECT * WHERE { ?s ?p ?o . }"
+    cache.put(QueryResultCache.key(select), graph.query(select), 0)
+
+    assert cache.info().entries == 0
+
+
+def test_invalid_size() -> None:
+    """Tests that the cache cannot be created without budget."""
+    with pytest.raises(ValueError):
+        QueryResultCache(max_size=0)
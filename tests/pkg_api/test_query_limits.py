@@ -0,0 +1,152 @@
+"""Tests for the limits on SPARQL queries."""
+
+import threading
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.plugins.sparql import prepareQuery
+
+from pkg_api.query_limits import (
+    QueryRejectedError,
+    QueryTimeoutError,
+    QueryType,
+    check_query,
+    execute_query_with_timeout,
+    get_query_type,
+    is_update,
+    limit_query,
+)
+
+EX = "http://example.com/"
+
+
+@pytest.fixture
+def graph() -> Graph:
+    """Returns a graph with five triples."""
+    graph = Graph()
+    for i in range(5):
+        graph.parse(data=f"<{EX}s> <{EX}p> {i} .", format="turtle")
+    return graph
+
+
+@pytest.mark.parametrize(
+    "query,query_type",
+    [
+        ('SELECT ?s WHERE { ?s ?p "ASK" . }', QueryType.SELECT),
+        ('ASK { ?s ?p "SELECT" . }', QueryType.ASK),
+        ("CONSTRUCT WHERE { ?s ?p ?o . }", QueryType.CONSTRUCT),
+        (f"DESCRIBE <{EX}s>", QueryType.DESCRIBE),
+    ],
+)
+def test_get_query_type(query: str, query_type: QueryType) -> None:
+    """Tests that the type of a query is read from its algebra."""
+    assert get_query_type(prepareQuery(query)) == query_type
+
+
+def test_is_update() -> None:
+    """Tests the detection of SPARQL updates."""
+    assert is_update(f"INSERT DATA {{ <{EX}s> <{EX}p> 1 . }}")
+    assert not is_update("SELECT ?s WHERE { ?s ?p ?o . }")
+    assert not is_update("INSERT")
+
+
+@pytest.mark.parametrize(
+    "query,limit,num_rows",
+    [
+        ("SELECT ?o WHERE { ?s ?p ?o . }", 3, 3),
+        ("SELECT ?o WHERE { ?s ?p ?o . } LIMIT 2", 3, 2),
+        ("SELECT ?o WHERE { ?s ?p ?o . } LIMIT 4", 3, 3),
+        ("SELECT ?o WHERE { ?s ?p ?o . } OFFSET 3", 3, 2),
+        ("SELECT DISTINCT ?o WHERE { ?s ?p ?o . } ORDER BY ?o", 10, 5),
+    ],
+)
+def test_limit_query(
+    graph: Graph, query: str, limit: int, num_rows: int
+) -> None:
+    """Tests that the number of rows is capped by the limit."""
+    prepared_query = prepareQuery(query)
+    assert len(graph.query(limit_query(prepared_query, limit))) == num_rows
+    # The original query is not modified.
+    assert len(graph.query(prepared_query)) >= num_rows
+
+
+def test_limit_query_invalid() -> None:
+    """Tests that only SELECT queries can be limited, by a positive limit."""
+    with pytest.raises(ValueError):
+        limit_query(prepareQuery("ASK { ?s ?p ?o . }"), 1)
+    with pytest.raises(ValueError):
+        limit_query(prepareQuery("SELECT ?s WHERE { ?s ?p ?o . }"), 0)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * WHERE { ?a ?p ?b . ?c ?q ?d . }",
+        "SELECT * WHERE { { ?a ?p ?b . } { ?c ?q ?d . } }",
+        "SELECT * WHERE { ?a ?p ?b . OPTIONAL { ?c ?q ?d . } }",
+        "SELECT * WHERE { ?a ?p ?b . MINUS { ?c ?q ?d . } }",
+        f"SELECT * WHERE {{ ?a <{EX}p>+ ?b . }}",
+        f"SELECT * WHERE {{ ?a <{EX}q>/<{EX}p>* ?b . }}",
+        "SELECT * WHERE { ?a ?p ?b . FILTER EXISTS { ?c ?q ?d . ?e ?r ?f } }",
+    ],
+)
+def test_check_query_rejected(query: str) -> None:
+    """Tests that queries with unbounded joins are rejected."""
+    with pytest.raises(QueryRejectedError):
+        check_query(prepareQuery(query))
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * WHERE { ?a ?p ?b . ?b ?q ?d . }",
+        "SELECT * WHERE { ?a ?p [ ?q ?d ] . }",
+        f"SELECT * WHERE {{ ?a ?p ?b . <{EX}s> <{EX}p> 1 . }}",
+        "SELECT * WHERE { ?a ?p ?b . OPTIONAL { ?b ?q ?d . } }",
+        "SELECT * WHERE { ?a ?p ?b . VALUES ?c { 1 2 } }",
+        f"SELECT * WHERE {{ <{EX}s> <{EX}p>* ?b . }}",
+    ],
+)
+def test_check_query_accepted(query: str) -> None:
+    """Tests that queries with bounded joins are accepted."""
+    check_query(prepareQuery(query))
+
+
+def test_execute_query_with_timeout(graph: Graph) -> None:
+    """Tests that queries are evaluated within the timeout."""
+    result = execute_query_with_timeout(
+        graph, "SELECT ?o WHERE { ?s ?p ?o . }", None, timeout=10.0
+    )
+    assert len(result) == 5
+
+
+def test_execute_query_timeout(graph: Graph) -> None:
+    """Tests that queries running past the timeout are cancelled."""
+    for i in range(100):
+        graph.add((URIRef(f"{EX}s{i}"), URIRef(f"{EX}p"), Literal(i)))
+    query = "SELECT * WHERE { ?a ?p ?b . ?c ?q ?d . ?e ?r ?f . ?g ?s ?h . }"
+    with pytest.raises(QueryTimeoutError):
+        execute_query_with_timeout(graph, query, None, timeout=0.1)
+    # The worker stops at the next triple it reads.
+    for thread in threading.enumerate():
+        if thread.name == "sparql-query":
+            thread.join(timeout=10.0)
+            assert not thread.is_alive()
+
+
+def test_execute_query_no_thread_available(
+    monkeypatch: pytest.MonkeyPatch, graph: Graph
+) -> None:
+    """Tests that queries time out if all the worker threads are busy."""
+    query_threads = threading.BoundedSemaphore(1)
+    monkeypatch.setattr("pkg_api.query_limits._query_threads", query_threads)
+    query = "SELECT ?o WHERE { ?s ?p ?o . }"
+    query_threads.acquire()
+
+    with pytest.raises(QueryTimeoutError):
+        execute_query_with_timeout(graph, query, None, timeout=0.1)
+
+    query_threads.release()
+    assert len(execute_query_with_timeout(graph, query, None, 10.0)) == 5
+    # The slot is released by the worker.
+    assert query_threads.acquire(timeout=10.0)
@@ -0,0 +1,127 @@
+"""Tests for the statement decoder."""
+
+import dataclasses
+import logging
+import uuid
+
+import pytest
+from rdflib import RDF, BNode, Graph, Literal, URIRef
+
+from pkg_api.core.namespaces import PKGPrefixes
+from pkg_api.core.pkg_types import (
+    URI,
+    Concept,
+    PKGData,
+    Preference,
+    Triple,
+    TripleElement,
+)
+from pkg_api.statement_decoder import StatementDecoder
+from pkg_api.triple_builder import (
+    get_statement_node,
+    get_triples_for_add_statement,
+)
+
+
+@pytest.fixture
+def statement() -> PKGData:
+    """Returns a statement with concepts."""
+    _object = TripleElement(
+        "movies directed by Steven Spielberg",
+        Concept(
+            description="movies directed by Steven Spielberg",
+            related_entities=[URI("https://dbpedia.org/page/Steven_Spielberg")],
+            broader_entities=[URI("https://schema.org/Movie")],
+        ),
+    )
+    return PKGData(
+        id=uuid.UUID("{f47ac10b-58cc-4372-a567-0e02b2c3d479}"),
+        statement="I like movies directed by Steven Spielberg.",
+        triple=Triple(
+            TripleElement("", URI("http://example.com/testuser")),
+            TripleElement("like", Concept(description="like")),
+            _object,
+        ),
+        preference=Preference(_object, 1.0),
+        logging_data={
+            "authoredBy": URI("http://example.com/testuser"),
+            "authoredOn": "2024-02-05T13:54:32",
+        },
+    )
+
+
+def test_decode_statement(statement: PKGData) -> None:
+    """Tests that a statement is decoded from its triples."""
+    graph = Graph()
+    graph.addN(
+        (s, p, o, graph)
+        for s, p, o in get_triples_for_add_statement(
+            statement, include_preference=True
+        )
+    )
+
+    (decoded_statement,) = StatementDecoder(graph).decode_statements(
+        [get_statement_node(statement)]
+    )
+
+    # Preferences are not decoded.
+    statement.preference = None
+    assert decoded_statement == statement
+
+
+def test_decode_content_addressed_concepts(statement: PKGData) -> None:
+    """Tests that concepts named by their IRI are decoded as concepts."""
+    graph = Graph()
+    graph.addN(
+        (s, p, o, graph)
+        for s, p, o in get_triples_for_add_statement(
+            statement, content_addressed_concepts=True
+        )
+    )
+
+    assert StatementDecoder(graph).decode_statement(
+        get_statement_node(statement)
+    ) == dataclasses.replace(statement, preference=None)
+
+
+def test_decode_unsupported_property(
+    statement: PKGData, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Tests that unsupported properties are skipped with a warning."""
+    graph = Graph()
+    node = get_statement_node(statement)
+    concept = BNode()
+    graph.add((node, RDF.type, RDF.Statement))
+    graph.add(
+        (
+            node,
+            URIRef("http://purl.org/dc/elements/1.1/description"),
+            Literal("x"),
+        )
+    )
+    graph.add(
+        (node, URIRef(f"{PKGPrefixes.EX.value}unsupported"), Literal("y"))
+    )
+    graph.add((node, RDF.object, concept))
+    graph.add((concept, RDF.type, URIRef(f"{PKGPrefixes.SKOS.value}Concept")))
+
+    with caplog.at_level(logging.WARNING):
+        decoded_statement = StatementDecoder(graph).decode_statement(node)
+
+    assert decoded_statement.statement == "x"
+    assert decoded_statement.triple == Triple()
+    assert [record.getMessage() for record in caplog.records] == [
+        f"Statement parsing - Property {PKGPrefixes.EX.value}unsupported not "
+        "supported.",
+        "Concept parsing failed, not description found.",
+    ]
+
+
+def test_decode_statement_without_description() -> None:
+    """Tests that nodes without a description are not decoded."""
+    assert (
+        StatementDecoder(Graph()).decode_statement(
+            URIRef(f"{PKGPrefixes.EX.value}{uuid.uuid1()}")
+        )
+        is None
+    )
@@ -0,0 +1,202 @@
+"""Tests that the direct triples match the ones added with SPARQL."""
+
+import os
+import uuid
+
+import pytest
+from rdflib import BNode
+from rdflib.compare import isomorphic
+
+from pkg_api import utils
+from pkg_api.connector import Connector, RDFStore
+from pkg_api.core.pkg_types import (
+    URI,
+    Concept,
+    PKGData,
+    Preference,
+    Triple,
+    TripleElement,
+)
+from pkg_api.triple_builder import get_triples_for_add_statement
+
+OWNER_URI = URI("http://example.com/testuser")
+
+_OBJECT = TripleElement(
+    'movies  directed by "Steven"\nSpielberg',
+    Concept(
+        description='movies  directed by "Steven"\nSpielberg',
+        related_entities=[
+            URI("https://dbpedia.org/page/Steven_Spielberg"),
+            URI("https://schema.org/director"),
+        ],
+        broader_entities=[URI("https://schema.org/Movie")],
+        narrower_entities=[URI("https://schema.org/Action")],
+    ),
+)
+
+STATEMENTS = [
+    PKGData(
+        id=uuid.UUID("{abcac10b-58cc-4372-a567-0e02b2c3d479}"),
+        statement="I live in Stavanger.",
+        triple=Triple(
+            TripleElement("I", OWNER_URI),
+            TripleElement("live", "live"),
+            TripleElement(
+                "Stavanger", URI("https://dbpedia.org/page/Stavanger")
+            ),
+        ),
+        logging_data={
+            "authoredBy": OWNER_URI,
+            "authoredOn": "2024-02-05T13:54:32",
+        },
+    ),
+    PKGData(
+        id=uuid.UUID("{f47ac10b-58cc-4372-a567-0e02b2c3d479}"),
+        statement='I like "movies"  directed by\tSteven Spielberg.',
+        triple=Triple(
+            TripleElement("I", OWNER_URI),
+            TripleElement("like", Concept(description="like")),
+            _OBJECT,
+        ),
+        preference=Preference(_OBJECT, -1.0),
+        logging_data={
+            "createdBy": URI("http://example.com/annotator"),
+            "createdOn": "2024-01-26T11:41:00",
+        },
+    ),
+    PKGData(
+        id=uuid.UUID("{0f4c6b66-c5a4-11ee-99e8-a662d3a1cf88}"),
+        statement="Nothing annotated.",
+    ),
+    PKGData(
+        id=uuid.UUID("{1f4c6b66-c5a4-11ee-99e8-a662d3a1cf88}"),
+        statement="Only an object.",
+        triple=Triple(object=TripleElement("cats", "cats")),
+        preference=Preference(TripleElement("cats", "cats"), 1.0),
+    ),
+]
+
+
+@pytest.fixture
+def sparql_connector(tmp_path: str) -> Connector:
+    """Returns a connector to write statements with SPARQL."""
+    return Connector(OWNER_URI, RDFStore.MEMORY, os.path.join(tmp_path, "a"))
+
+
+@pytest.fixture
+def direct_connector(tmp_path: str) -> Connector:
+    """Returns a connector to write statements directly."""
+    return Connector(OWNER_URI, RDFStore.MEMORY, os.path.join(tmp_path, "b"))
+
+
+@pytest.mark.parametrize("pkg_data", STATEMENTS)
+def test_statement_equivalence(
+    sparql_connector: Connector,
+    direct_connector: Connector,
+    pkg_data: PKGData,
+) -> None:
+    """Tests that a statement is added identically with both paths."""
+    sparql_connector.execute_sparql_update(
+        utils.get_query_for_add_statement(pkg_data)
+    )
+    direct_connector.add_triples(get_triples_for_add_statement(pkg_data))
+
+    assert len(direct_connector._graph) > 0
+    assert isomorphic(sparql_connector._graph, direct_connector._graph)
+
+
+@pytest.mark.parametrize("pkg_data", STATEMENTS)
+def test_preference_equivalence(
+    sparql_connector: Connector,
+    direct_connector: Connector,
+    pkg_data: PKGData,
+) -> None:
+    """Tests that a statement and its preference are added identically."""
+    sparql_connector.execute_sparql_update(
+        utils.get_query_for_add_statement(pkg_data)
+    )
+    preference_query = utils.get_query_for_add_preference(pkg_data)
+    if preference_query:
+        sparql_connector.execute_sparql_update(preference_query)
+    direct_connector.add_triples(
+        get_triples_for_add_statement(pkg_data, include_preference=True)
+    )
+
+    assert isomorphic(sparql_connector._graph, direct_connector._graph)
+
+
+@pytest.mark.parametrize("pkg_data", STATEMENTS)
+def test_single_update_preference_equivalence(
+    sparql_connector: Connector,
+    direct_connector: Connector,
+    pkg_data: PKGData,
+) -> None:
+    """Tests adding a statement and its preference at once with both paths."""
+    sparql_connector.execute_sparql_update(
+        utils.get_query_for_add_statement(pkg_data, include_preference=True)
+    )
+    direct_connector.add_triples(
+        get_triples_for_add_statement(pkg_data, include_preference=True)
+    )
+
+    assert isomorphic(sparql_connector._graph, direct_connector._graph)
+
+
+def test_all_statements_equivalence(
+    sparql_connector: Connector, direct_connector: Connector
+) -> None:
+    """Tests that concepts of different statements are kept apart."""
+    sparql_connector.execute_sparql_update(
+        utils.get_query_for_add_statements(STATEMENTS)
+    )
+    direct_connector.add_triples(
+        triple
+        for pkg_data in STATEMENTS
+        for triple in get_triples_for_add_statement(pkg_data)
+    )
+
+    assert isomorphic(sparql_connector._graph, direct_connector._graph)
+
+
+def test_all_statements_preference_equivalence(
+    sparql_connector: Connector, direct_connector: Connector
+) -> None:
+    """Tests that concepts are kept apart when preferences are included."""
+    sparql_connector.execute_sparql_update(
+        utils.get_query_for_add_statements(STATEMENTS, include_preference=True)
+    )
+    direct_connector.add_triples(
+        triple
+        for pkg_data in STATEMENTS
+        for triple in get_triples_for_add_statement(
+            pkg_data, include_preference=True
+        )
+    )
+
+    assert isomorphic(sparql_connector._graph, direct_connector._graph)
+
+
+def test_content_addressed_concepts_equivalence(
+    sparql_connector: Connector, direct_connector: Connector
+) -> None:
+    """Tests that content-addressed concepts are named identically."""
+    sparql_connector.execute_sparql_update(
+        utils.get_query_for_add_statements(
+            STATEMENTS, include_preference=True, content_addressed_concepts=True
+        )
+    )
+    direct_connector.add_triples(
+        triple
+        for pkg_data in STATEMENTS
+        for triple in get_triples_for_add_statement(
+            pkg_data, include_preference=True, content_addressed_concepts=True
+        )
+    )
+
+    # The graphs have no blank nodes, hence they are equal.
+    assert set(sparql_connector._graph) == set(direct_connector._graph)
+    assert not any(
+        isinstance(term, BNode)
+        for triple in direct_connector._graph
+        for term in triple
+    )
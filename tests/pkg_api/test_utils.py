@@ -5,6 +5,7 @@ import uuid
 from typing import Optional, Union
 
 import pytest
+from rdflib import Literal, URIRef
 
 from pkg_api import utils
 from pkg_api.core.pkg_types import (
@@ -199,6 +200,48 @@ def test_get_query_for_add_statement(
     )
 
 
+def test_get_query_for_add_statement_with_preference(
+    pkg_data_example: PKGData,
+) -> None:
+    """Tests _get_query_for_add_statement method including the preference.
+
+    Args:
+        pkg_data_example: PKG data example.
+    """
+    sparql_query = """
+        INSERT {
+            ex:abcac10b-58cc-4372-a567-0e02b2c3d479 a rdf:Statement ;
+            dc:description "I dislike all movies with the actor Tom Cruise." ;
+            rdf:subject <http://example.com/my/I> ;
+            rdf:predicate _:concept_predicate ;
+            rdf:object _:concept_object ;
+            pav:authoredOn "2024-26-01T11:41:00"^^xsd:dateTime ;
+            pav:createdBy <http://example.com/my/I> ;
+            pav:authoredBy <http://example.com/my/I> .
+            _:concept_predicate a skos:Concept ; dc:description "dislike" .
+            _:concept_object a skos:Concept ;
+            dc:description "all movies with the actor Tom Cruise" ;
+            skos:related <https://schema.org/actor>,
+            <http://dbpedia.org/resource/Tom_Cruise> ;
+            skos:broader <https://schema.org/Movie> ;
+            skos:narrower <https://schema.org/Action> .
+            <http://example.com/my/I> wi:preference
+                ex:abcac10b-58cc-4372-a567-0e02b2c3d479-preference .
+            ex:abcac10b-58cc-4372-a567-0e02b2c3d479-preference
+                pav:derivedFrom ex:abcac10b-58cc-4372-a567-0e02b2c3d479 ;
+                wi:topic _:concept_object ;
+                wo:weight ex:abcac10b-58cc-4372-a567-0e02b2c3d479-weight .
+            ex:abcac10b-58cc-4372-a567-0e02b2c3d479-weight
+                wo:weight_value "-1.0"^^xsd:decimal ;
+                wo:scale pkg:StandardScale .
+        }
+        WHERE {}
+    """
+    assert utils.get_query_for_add_statement(
+        pkg_data_example, include_preference=True
+    ) == strip_string(sparql_query)
+
+
 def test_get_query_for_add_preference(
     pkg_data_example: PKGData,
 ) -> None:
@@ -209,13 +252,15 @@ def test_get_query_for_add_preference(
     """
     sparql_query = """
         INSERT {
-            ?subject wi:preference [
+            ?subject wi:preference
+                ex:abcac10b-58cc-4372-a567-0e02b2c3d479-preference .
+            ex:abcac10b-58cc-4372-a567-0e02b2c3d479-preference
                 pav:derivedFrom ?statement ;
-                wi:topic ?object ; wo:weight [
-                    wo:weight_value "-1.0"^^xsd:decimal;
-                    wo:scale pkg:StandardScale
-                ]
-            ] .
+                wi:topic ?object ;
+                wo:weight ex:abcac10b-58cc-4372-a567-0e02b2c3d479-weight .
+            ex:abcac10b-58cc-4372-a567-0e02b2c3d479-weight
+                wo:weight_value "-1.0"^^xsd:decimal;
+                wo:scale pkg:StandardScale .
         }
         WHERE {
             ex:abcac10b-58cc-4372-a567-0e02b2c3d479 a rdf:Statement ;
@@ -366,3 +411,169 @@ def test_get_query_for_remove_preference(
     assert utils.get_query_for_remove_preference(
         pkg_data_example
     ) == strip_string(sparql_query)
+
+
+def test_get_query_for_replace_preference(pkg_data_example: PKGData) -> None:
+    """Tests get_query_for_replace_preference method."""
+    preference_node_id = utils.get_preference_node_id(pkg_data_example)
+
+    sparql_query = f"""
+        DELETE {{
+            ?subject wi:preference ?preference .
+            ?preference ?p ?o .
+            ?weight_node ?weight_p ?weight_o .
+        }}
+        WHERE {{
+            ?subject wi:preference {preference_node_id}, ?preference .
+            {preference_node_id} wi:topic ?topic .
+            ?preference wi:topic ?topic ; ?p ?o .
+            FILTER (?preference != {preference_node_id})
+            OPTIONAL {{
+                ?preference wo:weight ?weight_node .
+                ?weight_node ?weight_p ?weight_o .
+            }}
+        }}
+    """
+    assert utils.get_query_for_replace_preference(
+        pkg_data_example
+    ) == strip_string(sparql_query)
+    pkg_data_example.preference = None
+    assert utils.get_query_for_replace_preference(pkg_data_example) == ""
+
+
+def test_prepare_query_is_cached() -> None:
+    """Tests that a query is parsed and compiled only once."""
+    query = "SELECT ?statement WHERE { ?statement a rdf:Statement . }"
+    assert utils.prepare_query(query) is utils.prepare_query(query)
+
+
+def test_get_prepared_query_for_conditional_get_statements() -> None:
+    """Tests that URIs and literals are bound to the prepared query."""
+    triple = Triple(
+        subject=TripleElement("I", URI("http://example.com/my/I")),
+        predicate=TripleElement("live", "live"),
+    )
+    query, bindings = utils.get_prepared_query_for_conditional_get_statements(
+        triple
+    )
+    assert query is utils.prepare_query(
+        "SELECT ?statement WHERE { ?statement rdf:subject ?subject . "
+        "?statement rdf:predicate ?predicate . }"
+    )
+    assert bindings == {
+        "subject": URIRef("http://example.com/my/I"),
+        "predicate": Literal("live"),
+    }
+
+
+def test_get_prepared_query_for_conditional_get_statements_concept(
+    pkg_data_example: PKGData,
+) -> None:
+    """Tests that conditions on concepts fall back to the regular query."""
+    assert utils.get_prepared_query_for_conditional_get_statements(
+        pkg_data_example.triple
+    ) == (
+        utils.get_query_for_conditional_get_statements(pkg_data_example.triple),
+        {},
+    )
+
+
+def test_get_prepared_query_for_get_statements_page() -> None:
+    """Tests that pages of statements are ordered and limited by the query."""
+    pkg_data = PKGData(
+        id=uuid.uuid1(),
+        statement="Where do I live?",
+        triple=Triple(subject=TripleElement("I", URI("http://example.com/I"))),
+    )
+    cursor = URIRef("http://example.com#statement")
+    query, bindings = utils.get_prepared_query_for_get_statements_page(
+        pkg_data, True, 10, cursor=cursor
+    )
+    other_cursor = URIRef("http://example.com#other")
+    assert (
+        query
+        is utils.get_prepared_query_for_get_statements_page(
+            pkg_data, True, 10, cursor=other_cursor
+        )[0]
+    )
+    assert bindings == {
+        "subject": URIRef("http://example.com/I"),
+        "cursor": cursor,
+    }
+
+    query, _ = utils.get_prepared_query_for_get_statements_page(
+        pkg_data, True, 10, offset=20
+    )
+    assert isinstance(query, str)
+    assert query.endswith("ORDER BY STR(?statement) LIMIT 10 OFFSET 20")
+
+
+def test_get_query_for_add_statements(pkg_data_example: PKGData) -> None:
+    """Tests get_query_for_add_statements method."""
+    other_pkg_data = PKGData(
+        id=uuid.UUID("{f47ac10b-58cc-4372-a567-0e02b2c3d479}"),
+        statement="I like movies.",
+    )
+    assert utils.get_query_for_add_statements(
+        [pkg_data_example, other_pkg_data]
+    ) == (
+        f"{utils.get_query_for_add_statement(pkg_data_example)} ; "
+        f"{utils.get_query_for_add_statement(other_pkg_data)}"
+    )
+
+
+def test_get_concept_digest() -> None:
+    """Tests that concepts with the same content have the same digest."""
+    concept = Concept(
+        description="movies  with\nTom Cruise",
+        related_entities=[
+            URI("https://schema.org/actor"),
+            URI("http://dbpedia.org/resource/Tom_Cruise"),
+        ],
+    )
+    same_concept = Concept(
+        description="movies with Tom Cruise",
+        related_entities=[
+            URI("http://dbpedia.org/resource/Tom_Cruise"),
+            URI("https://schema.org/actor"),
+        ],
+    )
+    other_concept = Concept(
+        description="movies with Tom Cruise",
+        broader_entities=[
+            URI("http://dbpedia.org/resource/Tom_Cruise"),
+            URI("https://schema.org/actor"),
+        ],
+    )
+
+    assert utils.get_concept_digest(concept) == utils.get_concept_digest(
+        same_concept
+    )
+    assert utils.get_concept_digest(concept) != utils.get_concept_digest(
+        other_concept
+    )
+    assert utils.get_concept_node_id(concept) == (
+        f"ex:concept-{utils.get_concept_digest(concept)}"
+    )
+
+
+def test_get_query_for_add_statement_content_addressed(
+    pkg_data_example: PKGData,
+) -> None:
+    """Tests adding a statement with content-addressed concepts."""
+    predicate_id = utils.get_concept_node_id(
+        pkg_data_example.triple.predicate.value
+    )
+    object_id = utils.get_concept_node_id(pkg_data_example.triple.object.value)
+
+    query = utils.get_query_for_add_statement(
+        pkg_data_example, content_addressed_concepts=True
+    )
+
+    assert query.startswith("INSERT DATA {")
+    assert f"rdf:predicate {predicate_id} ;" in query
+    assert f"rdf:object {object_id} ;" in query
+    assert f'{predicate_id} a skos:Concept ; dc:description "dislike" .' in (
+        query
+    )
+    assert "[" not in query
@@ -0,0 +1,58 @@
+"""Tests for the visualization of PKGs."""
+
+from typing import List
+
+import pytest
+from rdflib import RDF, Graph, Literal, Namespace
+
+from pkg_api.visualization import get_content_digest, get_neighborhood
+
+EX = Namespace("http://example.com#")
+
+
+@pytest.fixture
+def graph() -> Graph:
+    """Returns a chain of nodes a -> b -> c -> d with a label on a."""
+    graph = Graph()
+    graph.add((EX.a, RDF.value, Literal("a")))
+    for s, o in [(EX.a, EX.b), (EX.b, EX.c), (EX.c, EX.d)]:
+        graph.add((s, EX.next, o))
+    return graph
+
+
+def _get_nodes(graph: Graph) -> List[str]:
+    """Returns the names of the nodes of a graph, in order."""
+    nodes = {term for s, _, o in graph for term in (s, o)}
+    return sorted(str(node)[len(EX) :] for node in nodes if node in EX)
+
+
+def test_get_neighborhood(graph: Graph) -> None:
+    """Tests that the neighborhood is limited by the depth and the cap."""
+    assert _get_nodes(get_neighborhood(graph, EX.b, depth=1)) == [
+        "a",
+        "b",
+        "c",
+    ]
+    neighborhood = get_neighborhood(graph, EX.b, depth=1, max_nodes=2)
+    # The subjects of the focus node are visited after its objects.
+    assert _get_nodes(neighborhood) == ["b", "c"]
+    assert (EX.a, RDF.value, Literal("a")) in get_neighborhood(graph, EX.a, 0)
+    assert len(get_neighborhood(graph, EX.a, 0)) == 1
+
+    assert _get_nodes(get_neighborhood(graph, max_nodes=3)) == ["a", "b", "c"]
+
+    with pytest.raises(ValueError):
+        get_neighborhood(graph, EX.a, depth=-1)
+    with pytest.raises(ValueError):
+        get_neighborhood(graph, max_nodes=0)
+
+
+def test_get_content_digest(graph: Graph) -> None:
+    """Tests that the digest only depends on the triples."""
+    other_graph = Graph()
+    for triple in reversed(list(graph)):
+        other_graph.add(triple)
+
+    assert get_content_digest(graph) == get_content_digest(other_graph)
+    other_graph.add((EX.d, EX.next, EX.e))
+    assert get_content_digest(graph) != get_content_digest(other_graph)